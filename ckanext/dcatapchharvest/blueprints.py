@@ -0,0 +1,35 @@
+import hmac
+
+import ckan.plugins.toolkit as tk
+from flask import Blueprint, make_response, request
+
+from ckanext.dcatapchharvest import metrics as harvest_metrics
+
+metrics = Blueprint("dcatapch_metrics", __name__)
+
+
+@metrics.route("/dcatapch/metrics")
+def read_metrics():
+    """Returns the metrics of all processes in the Prometheus text format.
+    Only available if a metrics directory is configured, to sysadmins and to
+    clients that send the configured metrics token as bearer token.
+    """
+    directory = tk.config.get(harvest_metrics.METRICS_DIR_CONFIG)
+    if not directory:
+        return tk.abort(404)
+    if not _may_read_metrics():
+        return tk.abort(403)
+
+    response = make_response(harvest_metrics.registry.to_text(directory))
+    response.headers["Content-Type"] = "text/plain; version=0.0.4; charset=utf-8"
+    return response
+
+
+def _may_read_metrics():
+    token = tk.config.get(harvest_metrics.METRICS_TOKEN_CONFIG)
+    authorization = request.headers.get("Authorization", "")
+    if token and hmac.compare_digest(
+        authorization.encode("utf-8"), f"Bearer {token}".encode("utf-8")
+    ):
+        return True
+    return bool(getattr(tk.current_user, "sysadmin", False))
@@ -0,0 +1,213 @@
+"""Streaming export of the whole catalog.
+
+RDFSerializer.serialize_catalog builds the graph of all datasets before it
+serializes it, so its memory use grows with the size of the catalog. The
+CatalogWriter writes the triples of each dataset to the output as soon as they
+are built and then removes them from the graph, so memory use stays constant.
+
+To export the catalog with several processes, each worker writes a chunk of
+the datasets to a file with write_chunk, and the files are then appended to
+the output in the order of the chunks.
+"""
+
+import gc
+import logging
+import re
+
+import ckan.plugins.toolkit as tk
+from rdflib import ConjunctiveGraph
+from rdflib.namespace import RDF, RDFS
+
+from ckanext.dcat.processors import RDFSerializer
+from ckanext.dcat.profiles import DCAT
+from ckanext.dcat.utils import DCAT_EXPOSE_SUBCATALOGS
+from ckanext.dcatapchharvest.profiles import namespaces
+
+log = logging.getLogger(__name__)
+
+FORMATS = ["ttl", "nt", "xml"]
+DEFAULT_PROFILES = ["swiss_dcat_ap"]
+DEFAULT_PAGE_SIZE = 100
+DEFAULT_CHUNK_SIZE = 200
+
+# The prefixes declared once at the start of the output
+PREFIXES = dict(sorted(dict(namespaces, rdf=RDF, rdfs=RDFS).items()))
+
+TURTLE_HEADER_LINES = [
+    f"@prefix {prefix}: <{namespace}> .\n" for prefix, namespace in PREFIXES.items()
+]
+XML_NAMESPACE_PATTERN = re.compile(r'xmlns:([\w.-]+)="([^"]*)"')
+
+
+class CatalogWriter(object):
+    """Writes a catalog to a text stream in Turtle, N-Triples or RDF/XML, one
+    dataset at a time:
+
+        writer = CatalogWriter(output, "ttl")
+        writer.write_catalog(dataset_dicts)
+
+    All prefixes of PREFIXES are declared at the start of the output. The
+    serializers of rdflib declare the prefixes of any other namespaces for
+    each dataset again.
+
+    The triples of each dataset are removed from the graph once they are
+    written. The rdflib memory store keeps some empty index entries for
+    removed triples, so a new graph is started every `datasets_per_graph`
+    datasets, and the old one is freed with a full garbage collection.
+
+    The datasets are linked to the catalog with dcat:dataset. The source
+    catalogs of ckanext-dcat (ckanext.dcat.expose_subcatalogs) are not
+    exported.
+    """
+
+    datasets_per_graph = 500
+
+    def __init__(self, output, rdf_format="ttl", profiles=None):
+        if rdf_format not in FORMATS:
+            raise ValueError(f"Unknown format {rdf_format}, use one of {FORMATS}")
+        self.output = output
+        self.rdf_format = rdf_format
+        self.profiles = profiles or DEFAULT_PROFILES
+        self.serializer = RDFSerializer(profiles=self.profiles)
+        self.catalog_ref = None
+        self.dataset_count = 0
+        self._new_graph()
+
+    def write_catalog(self, dataset_dicts, catalog_dict=None):
+        self.write_header()
+        self.write_catalog_triples(catalog_dict)
+        for dataset_dict in dataset_dicts:
+            self.write_dataset(dataset_dict)
+        self.write_footer()
+
+    def write_catalog_triples(self, catalog_dict=None):
+        """Writes the triples of the catalog itself. The datasets written
+        afterwards are linked to it.
+        """
+        if tk.asbool(tk.config.get(DCAT_EXPOSE_SUBCATALOGS)):
+            log.warning(
+                "The source catalogs of the datasets are not exported, "
+                "the datasets are linked to the catalog itself"
+            )
+        self.catalog_ref = self.serializer.graph_from_catalog(catalog_dict)
+        self._flush()
+
+    def write_dataset(self, dataset_dict):
+        """Writes the triples of the dataset and removes them from the
+        graph.
+        """
+        dataset_ref = self.serializer.graph_from_dataset(dataset_dict)
+        if self.catalog_ref is not None:
+            self.serializer.g.add((self.catalog_ref, DCAT.dataset, dataset_ref))
+        self._flush()
+        self.dataset_count += 1
+        if self.dataset_count % self.datasets_per_graph == 0:
+            self._new_graph()
+
+    def write_header(self):
+        if self.rdf_format == "ttl":
+            self.output.write("".join(TURTLE_HEADER_LINES) + "\n")
+        elif self.rdf_format == "xml":
+            self.output.write('<?xml version="1.0" encoding="utf-8"?>\n<rdf:RDF\n')
+            self.output.write(
+                "".join(
+                    f'   xmlns:{prefix}="{namespace}"\n'
+                    for prefix, namespace in PREFIXES.items()
+                )
+            )
+            self.output.write(">\n")
+
+    def write_footer(self):
+        if self.rdf_format == "xml":
+            self.output.write("</rdf:RDF>\n")
+
+    def _new_graph(self):
+        if self.dataset_count:
+            # rdflib graphs contain reference cycles, and the old graphs end up
+            # in the oldest generation of the garbage collector, which rarely
+            # runs. Without a full collection, memory use grows with the number
+            # of datasets (see test_constant_memory).
+            self.serializer.g = None
+            gc.collect()
+        self.serializer.g = ConjunctiveGraph()
+        for prefix, namespace in PREFIXES.items():
+            self.serializer.g.bind(prefix, namespace, replace=True)
+
+    def _flush(self):
+        g = self.serializer.g
+        if self.rdf_format == "nt":
+            self.output.write(g.serialize(format="nt"))
+        elif self.rdf_format == "ttl":
+            self.output.write(_turtle_body(g.serialize(format="turtle")))
+        else:
+            self.output.write(_xml_body(g.serialize(format="xml")))
+        g.remove((None, None, None))
+
+
+def _turtle_body(turtle):
+    """Removes the prefixes that are declared in the header. Turtle allows
+    prefixes to be declared anywhere, so the other ones are kept.
+    """
+    return "".join(
+        line
+        for line in turtle.splitlines(keepends=True)
+        if line not in TURTLE_HEADER_LINES
+    )
+
+
+def _xml_body(xml):
+    """Returns the elements inside rdf:RDF. Namespaces that are not declared
+    in the header are declared on every top-level element instead.
+    """
+    root_start = xml.index("<rdf:RDF")
+    root_end = xml.index(">", root_start) + 1
+    body = xml[root_end : xml.rindex("</rdf:RDF>")]
+    extra_namespaces = " ".join(
+        f'xmlns:{prefix}="{namespace}"'
+        for prefix, namespace in XML_NAMESPACE_PATTERN.findall(xml[root_start:root_end])
+        if str(PREFIXES.get(prefix)) != namespace
+    )
+    if extra_namespaces:
+        body = body.replace(
+            "\n  <rdf:Description ", f"\n  <rdf:Description {extra_namespaces} "
+        )
+    return body.lstrip("\n")
+
+
+def write_chunk(path, dataset_dicts, rdf_format, profiles, catalog_ref):
+    """Writes the triples of the datasets to a file that is appended to the
+    output of a parallel export, without the header and footer. The datasets
+    are linked to the catalog with the given reference. Returns the path and
+    the number of datasets.
+
+    rdflib labels blank nodes with random UUIDs, so the blank nodes of chunks
+    that are written by different processes do not have the same labels.
+    """
+    with open(path, "w", encoding="utf-8") as f:
+        writer = CatalogWriter(f, rdf_format, profiles)
+        writer.catalog_ref = catalog_ref
+        for dataset_dict in dataset_dicts:
+            writer.write_dataset(dataset_dict)
+    return path, writer.dataset_count
+
+
+def iter_datasets(page_size=DEFAULT_PAGE_SIZE):
+    """Yields all public datasets, one page of package_search results at a
+    time.
+    """
+    start = 0
+    while True:
+        result = tk.get_action("package_search")(
+            {"ignore_auth": True},
+            {
+                "q": "*:*",
+                "sort": "name asc",
+                "rows": page_size,
+                "start": start,
+                "include_private": False,
+            },
+        )
+        yield from result["results"]
+        start += page_size
+        if start >= result["count"] or not result["results"]:
+            return
@@ -0,0 +1,313 @@
+import itertools
+import json
+import multiprocessing
+import os
+import shutil
+import sys
+import tempfile
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import ckan.model as model
+import ckan.plugins as p
+import ckan.plugins.toolkit as tk
+import click
+import rdflib
+
+from ckanext.dcat.exceptions import RDFProfileException
+from ckanext.dcat.processors import RDFParser
+from ckanext.dcatapchharvest import catalog_export
+from ckanext.dcatapchharvest import metrics as harvest_metrics
+from ckanext.dcatapchharvest.harvesters import SwissDCATRDFHarvester
+from ckanext.harvest.interfaces import IHarvester
+from ckanext.harvest.model import HarvestSource
+
+DEFAULT_PROFILES = ["swiss_dcat_ap"]
+
+
+def get_commands():
+    return [dcatapchharvest]
+
+
+@click.group()
+def dcatapchharvest():
+    """DCAT-AP Switzerland harvester commands."""
+    pass
+
+
+@dcatapchharvest.command("dry-run")
+@click.argument("id", metavar="SOURCE_ID_OR_NAME")
+def dry_run(id):
+    """Harvests a source without writing anything to the database and prints
+    the number of new, changed, unchanged and deleted datasets as JSON.
+    """
+    source_dataset = model.Package.get(id)
+    harvest_source = HarvestSource.get(source_dataset.id) if source_dataset else None
+    if harvest_source is None:
+        raise click.ClickException(f"Harvest source {id} not found")
+
+    harvester = _get_harvester(harvest_source.type)
+    if harvester is None:
+        raise click.ClickException(
+            f"Harvest source {id} does not use a DCAT-AP Switzerland harvester"
+        )
+
+    report = harvester.dry_run(harvest_source)
+    click.echo(json.dumps(report.as_dict(), indent=2))
+
+
+@dcatapchharvest.command()
+@click.option(
+    "-o",
+    "--output",
+    type=click.File("w"),
+    default="-",
+    help="File to write the metrics to, defaults to stdout.",
+)
+def metrics(output):
+    """Prints the harvester and profile metrics of all processes in the
+    Prometheus text format, e.g. for the textfile collector of the node
+    exporter. Needs ckanext.dcat_ch_rdf_harvester.metrics_dir to be set.
+    """
+    directory = tk.config.get(harvest_metrics.METRICS_DIR_CONFIG)
+    if not directory:
+        raise click.ClickException(
+            f"{harvest_metrics.METRICS_DIR_CONFIG} is not configured"
+        )
+    output.write(harvest_metrics.registry.to_text(directory))
+
+
+@dcatapchharvest.command("export-catalog")
+@click.option(
+    "-o",
+    "--output",
+    type=click.File("w"),
+    default="-",
+    help="File to write the catalog to, defaults to stdout.",
+)
+@click.option(
+    "-f",
+    "--format",
+    "rdf_format",
+    type=click.Choice(catalog_export.FORMATS),
+    default="ttl",
+    show_default=True,
+)
+@click.option(
+    "--page-size",
+    type=click.IntRange(min=1),
+    default=catalog_export.DEFAULT_PAGE_SIZE,
+    show_default=True,
+    help="Number of datasets fetched from the search index at a time.",
+)
+@click.option(
+    "-p",
+    "--profile",
+    "profiles",
+    multiple=True,
+    default=catalog_export.DEFAULT_PROFILES,
+    show_default=True,
+    help="RDF profile used for serializing, can be given more than once.",
+)
+@click.option(
+    "-j",
+    "--jobs",
+    type=click.IntRange(min=1),
+    default=1,
+    show_default=True,
+    help="Number of processes that serialize the datasets.",
+)
+@click.option(
+    "--chunk-size",
+    type=click.IntRange(min=1),
+    default=catalog_export.DEFAULT_CHUNK_SIZE,
+    show_default=True,
+    help="Number of datasets serialized by a process at a time.",
+)
+def export_catalog(output, rdf_format, page_size, profiles, jobs, chunk_size):
+    """Exports all public datasets in the DCAT-AP Switzerland format. The
+    triples of each dataset are written as soon as they are built, so memory
+    use does not grow with the size of the catalog.
+
+    With more than one job, the datasets are split into chunks that worker
+    processes serialize to temporary files. The files are appended to the
+    output in the order of the datasets, and at most two chunks per worker
+    are in progress at any time.
+    """
+    try:
+        writer = catalog_export.CatalogWriter(output, rdf_format, list(profiles))
+    except RDFProfileException as e:
+        raise click.BadParameter(str(e), param_hint="--profile")
+
+    dataset_dicts = catalog_export.iter_datasets(page_size)
+    if jobs == 1:
+        writer.write_catalog(dataset_dicts)
+        dataset_count = writer.dataset_count
+    else:
+        dataset_count = _export_catalog_in_parallel(
+            writer, dataset_dicts, jobs, chunk_size
+        )
+    click.echo(f"Exported {dataset_count} datasets", err=True)
+
+
+def _export_catalog_in_parallel(writer, dataset_dicts, jobs, chunk_size):
+    writer.write_header()
+    writer.write_catalog_triples()
+    dataset_count = 0
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        tasks = (
+            (
+                os.path.join(tmp_dir, f"{i}.{writer.rdf_format}"),
+                chunk,
+                writer.rdf_format,
+                writer.profiles,
+                writer.catalog_ref,
+            )
+            for i, chunk in enumerate(_chunks(dataset_dicts, chunk_size))
+        )
+        # The workers are forked, so that they have the config and the app
+        # context of this process
+        with ProcessPoolExecutor(
+            max_workers=jobs, mp_context=multiprocessing.get_context("fork")
+        ) as executor:
+            results = _bounded_map(
+                executor, catalog_export.write_chunk, tasks, 2 * jobs
+            )
+            for output_path, count in results:
+                with open(output_path, encoding="utf-8") as f:
+                    shutil.copyfileobj(f, writer.output)
+                os.remove(output_path)
+                dataset_count += count
+    writer.write_footer()
+    return dataset_count
+
+
+def _chunks(items, size):
+    items = iter(items)
+    while True:
+        chunk = list(itertools.islice(items, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _get_harvester(source_type):
+    for harvester in p.PluginImplementations(IHarvester):
+        if (
+            isinstance(harvester, SwissDCATRDFHarvester)
+            and harvester.info()["name"] == source_type
+        ):
+            return harvester
+    return None
+
+
+@click.command()
+@click.argument(
+    "files", nargs=-1, required=True, type=click.Path(exists=True, dir_okay=False)
+)
+@click.option(
+    "-o",
+    "--output",
+    type=click.File("w"),
+    default="-",
+    help="File to write the datasets to, defaults to stdout.",
+)
+@click.option(
+    "-f",
+    "--format",
+    "rdf_format",
+    help="RDF format of the files, guessed from the file extension by default.",
+)
+@click.option(
+    "-p",
+    "--profile",
+    "profiles",
+    multiple=True,
+    default=DEFAULT_PROFILES,
+    show_default=True,
+    help="RDF profile used for parsing, can be given more than once.",
+)
+@click.option(
+    "-j",
+    "--jobs",
+    type=click.IntRange(min=1),
+    default=os.cpu_count(),
+    show_default=True,
+    help="Number of files parsed in parallel.",
+)
+def rdf_to_jsonl(files, output, rdf_format, profiles, jobs):
+    """Converts DCAT-AP Switzerland RDF files to CKAN datasets, written as one
+    JSON dict per line in the order of the files. Does not need a running CKAN.
+
+    Every file is parsed in a worker process that writes its datasets to a
+    temporary file, and at most two files per worker are in progress at any
+    time, so memory use does not grow with the number of files.
+    """
+    try:
+        RDFParser(profiles=list(profiles))
+    except RDFProfileException as e:
+        raise click.BadParameter(str(e), param_hint="--profile")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        tasks = [
+            (path, rdf_format, list(profiles), os.path.join(tmp_dir, f"{i}.jsonl"))
+            for i, path in enumerate(files)
+        ]
+        if jobs == 1:
+            results = (_convert_file(*task) for task in tasks)
+            failed = _write_results(results, output)
+        else:
+            with ProcessPoolExecutor(max_workers=jobs) as executor:
+                results = _bounded_map(executor, _convert_file, tasks, 2 * jobs)
+                failed = _write_results(results, output)
+
+    if failed:
+        sys.exit(1)
+
+
+def _bounded_map(executor, fn, tasks, max_pending):
+    """Like executor.map, but only submits a task once fewer than max_pending
+    results are waiting to be consumed.
+    """
+    pending = deque()
+    for task in tasks:
+        if len(pending) >= max_pending:
+            yield pending.popleft().result()
+        pending.append(executor.submit(fn, *task))
+    while pending:
+        yield pending.popleft().result()
+
+
+def _write_results(results, output):
+    failed = 0
+    for path, output_path, count, error in results:
+        if error:
+            click.echo(f"Error when converting {path}: {error}", err=True)
+            failed += 1
+            continue
+        with open(output_path, encoding="utf-8") as f:
+            shutil.copyfileobj(f, output)
+        os.remove(output_path)
+        click.echo(f"Converted {count} datasets from {path}", err=True)
+    return failed
+
+
+def _convert_file(path, rdf_format, profiles, output_path):
+    """Parses one RDF file and writes its datasets to output_path. Returns the
+    path, the output path, the number of datasets and an error message. Any
+    error is only reported for this file, so the other files are converted.
+    """
+    rdf_format = rdf_format or rdflib.util.guess_format(path)
+    parser = RDFParser(profiles=profiles)
+    try:
+        with open(path, encoding="utf-8") as f:
+            parser.parse(f.read(), _format=rdf_format)
+        count = 0
+        with open(output_path, "w", encoding="utf-8") as f:
+            for dataset in parser.datasets():
+                f.write(json.dumps(dataset, default=str))
+                f.write("\n")
+                count += 1
+    except Exception as e:
+        return path, output_path, 0, str(e) or repr(e)
+    return path, output_path, count, None
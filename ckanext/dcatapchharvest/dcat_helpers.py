@@ -1,6 +1,9 @@
+import functools
+import hashlib
 import json
 import logging
 import os
+import re
 import xml.etree.ElementTree as ET
 from urllib.parse import urlparse
 
@@ -9,6 +12,8 @@ from ckantoolkit import config
 from rdflib import Graph, URIRef
 from rdflib.namespace import RDF, SKOS, Namespace
 
+import ckanext.dcatapchharvest.metrics as metrics
+
 log = logging.getLogger(__name__)
 
 DCT = Namespace("http://purl.org/dc/terms/")
@@ -47,8 +52,55 @@ theme_namespaces = {
     "rdf": RDF,
 }
 
+TEST_ENV_URLS_CONFIG = "ckanext.dcat_ch_rdf_harvester.test_env_urls"
+
 __location__ = os.path.realpath(os.path.join(os.getcwd(), os.path.dirname(__file__)))
 
+VOCABULARY_FILES = [
+    "formats.xml",
+    "frequency.ttl",
+    "iana_media_types.xml",
+    "language.xml",
+    "license.ttl",
+    "themes.ttl",
+]
+
+
+@functools.lru_cache(maxsize=None)
+def vocabulary_version():
+    """Returns a hash of the vocabulary files, which changes whenever one of
+    the vocabularies is updated.
+    """
+    sha1 = hashlib.sha1()
+    for file_name in VOCABULARY_FILES:
+        with open(os.path.join(__location__, file_name), "rb") as f:
+            sha1.update(f.read())
+    return sha1.hexdigest()
+
+
+# The number of URIs whose conversion to an IRI is cached in each process
+URI_TO_IRI_CACHE_SIZE = 20000
+
+
+@functools.lru_cache(maxsize=URI_TO_IRI_CACHE_SIZE)
+def _convert_uri_to_iri(uri):
+    """Returns the IRI of the URI and None, or None and the reason why the URI
+    is invalid. Both are cached, as the same landing pages and download URLs
+    are serialized again and again, and iribaker is slow.
+    """
+    result = urlparse(uri)
+    if not result.scheme or not result.netloc or result.netloc == "-":
+        metrics.IRI_CONVERSIONS.inc(result="invalid")
+        return None, "Provided URI does not have a valid schema or netloc"
+
+    try:
+        iri = iribaker.to_iri(uri)
+    except Exception as e:
+        metrics.IRI_CONVERSIONS.inc(result="invalid")
+        return None, f"Provided URI can't be converted to IRI: {e}"
+    metrics.IRI_CONVERSIONS.inc(result="valid")
+    return iri, None
+
 
 def uri_to_iri(uri):
     """
@@ -59,15 +111,31 @@ def uri_to_iri(uri):
     if not uri:
         raise ValueError("Provided URI is empty or None")
 
-    result = urlparse(uri)
-    if not result.scheme or not result.netloc or result.netloc == "-":
-        raise ValueError("Provided URI does not have a valid schema or netloc")
+    iri, error = _convert_uri_to_iri(uri)
+    if error:
+        raise ValueError(error)
+    return iri
 
-    try:
-        iri = iribaker.to_iri(uri)
-        return iri
-    except Exception as e:
-        raise ValueError(f"Provided URI can't be converted to IRI: {e}")
+
+class FunctionCacheStats:
+    """The hits and misses of a function cached with functools.lru_cache."""
+
+    def __init__(self, cached_function):
+        self._cached_function = cached_function
+
+    @property
+    def hits(self):
+        return self._cached_function.cache_info().hits
+
+    @property
+    def misses(self):
+        return self._cached_function.cache_info().misses
+
+    def clear(self):
+        self._cached_function.cache_clear()
+
+
+iri_conversions = FunctionCacheStats(_convert_uri_to_iri)
 
 
 def get_langs():
@@ -99,12 +167,8 @@ def dataset_uri(dataset_dict, dataset_ref=None):
             if extra["key"] == "uri" and extra["value"] != "None":
                 uri = extra["value"]
                 break
-    test_env_url_string = config.get("ckanext.dcat_ch_rdf_harvester.test_env_urls", "")
-    if len(test_env_url_string) > 0:
-        for test_url in test_env_url_string.split(","):
-            if test_url in uri:
-                uri = ""
-                break
+    if is_test_env_uri(uri):
+        uri = ""
     if not uri:
         uri = get_permalink(dataset_dict.get("identifier"))
 
@@ -116,6 +180,23 @@ def get_permalink(identifier):
     return f"{site_url}/perma/{identifier}"
 
 
+@functools.lru_cache(maxsize=1)
+def _test_env_url_pattern(test_env_urls):
+    """Returns a regex that finds any of the comma-separated test environment
+    URLs, or None if there are none. It is compiled again only when the
+    config option changes.
+    """
+    if not test_env_urls:
+        return None
+    return re.compile("|".join(re.escape(url) for url in test_env_urls.split(",")))
+
+
+def is_test_env_uri(uri):
+    """Returns True if the URI contains the URL of a test environment."""
+    pattern = _test_env_url_pattern(config.get(TEST_ENV_URLS_CONFIG, ""))
+    return bool(uri and pattern and pattern.search(uri))
+
+
 def resource_uri(resource_dict, distribution=None):
     """
     Returns a URI for the resource
@@ -133,21 +214,14 @@ def resource_uri(resource_dict, distribution=None):
     uri = str(distribution) if isinstance(distribution, URIRef) else ""
     if not uri:
         uri = resource_dict.get("uri", "")
-    if uri:
-        test_env_url_string = config.get(
-            "ckanext.dcat_ch_rdf_harvester.test_env_urls", ""
-        )
-        if len(test_env_url_string) > 0:
-            for test_url in test_env_url_string.split(","):
-                if test_url in uri:
-                    uri = ""
-                    break
+    if is_test_env_uri(uri):
+        uri = ""
     if not uri or uri == "None":
         site_url = config.get("ckan.site_url")
         dataset_id = resource_dict.get("package_id")
         resource_id = resource_dict.get("id")
         if dataset_id and resource_id:
-            uri = f"{site_url.rstrip('/')}/dataset/{dataset_id}/resource/{resource_dict['id']}"
+            uri = f"{site_url.rstrip('/')}/dataset/{dataset_id}/resource/{resource_id}"
     return uri
 
 
@@ -165,9 +239,33 @@ def get_frequency_values():
     return frequency_mapping
 
 
+class LookupStats:
+    """Counts how many lookups of harvested values in the vocabularies found a
+    match (hits) and how many did not (misses).
+    """
+
+    def __init__(self, counter=None):
+        self.hits = 0
+        self.misses = 0
+        self._counter = counter
+
+    def record(self, found):
+        if found:
+            self.hits += 1
+        else:
+            self.misses += 1
+        if self._counter:
+            self._counter.inc(result="hit" if found else "miss")
+        return found
+
+
+vocabulary_lookups = LookupStats(metrics.VOCABULARY_LOOKUPS)
+
+
 class LicenseHandler:
     def __init__(self):
         self._license_cache = None
+        self._license_refs_cache = None
 
     def _bind_namespaces(self, graph):
         for prefix, namespace in list(license_namespaces.items()):
@@ -241,6 +339,36 @@ class LicenseHandler:
                 raise RuntimeError(f"Failed to load license values: {e}")
         return self._license_cache
 
+    def get_license_refs_by_homepage_uri(self):
+        """Returns a dict that maps the license homepage URIs, which are stored
+        in the license and rights fields of resources, to the URIRef of the
+        license. The license is looked up by the homepage URI, or else by the
+        name of the license with that homepage.
+        """
+        if self._license_refs_cache is None:
+            (
+                license_homepages_literal_vocabulary,
+                license_ref_literal_vocabulary,
+                license_homepage_ref_vocabulary,
+            ) = self._get_license_values()
+            refs_by_name = {}
+            for ref, name in license_ref_literal_vocabulary.items():
+                refs_by_name.setdefault(name, ref)
+
+            license_refs = {}
+            for homepage_uri in set(license_homepages_literal_vocabulary) | set(
+                license_homepage_ref_vocabulary
+            ):
+                ref = license_homepage_ref_vocabulary.get(homepage_uri)
+                if ref is None:
+                    ref = refs_by_name.get(
+                        license_homepages_literal_vocabulary.get(homepage_uri)
+                    )
+                if ref is not None:
+                    license_refs[homepage_uri] = URIRef(ref)
+            self._license_refs_cache = license_refs
+        return self._license_refs_cache
+
     def get_license_ref_uri_by_name(self, vocabulary_name):
         _, license_ref_literal_vocabulary, _ = self._get_license_values()
         return next(
@@ -344,18 +472,17 @@ def get_format_values():
         format_values[format_extension] = format_uri_ref
 
     # Add special cases that aren't so easy to map.
-    format_values.update(
-        {
-            "api": "http://publications.europa.eu/resource/authority/file-type/REST",
-            "esri_ascii_grid": "http://publications.europa.eu/resource/authority/file-type/GRID_ASCII",
-            "sparql": "http://publications.europa.eu/resource/authority/file-type/SPARQLQ",
-            "wcs": "http://publications.europa.eu/resource/authority/file-type/WCS_SRVC",
-            "wfs": "http://publications.europa.eu/resource/authority/file-type/WFS_SRVC",
-            "wms": "http://publications.europa.eu/resource/authority/file-type/WMS_SRVC",
-            "wmts": "http://publications.europa.eu/resource/authority/file-type/WMTS_SRVC",
-            "worldfile": "http://publications.europa.eu/resource/authority/file-type/WORLD",
-        }
-    )
+    special_cases = {
+        "api": "http://publications.europa.eu/resource/authority/file-type/REST",
+        "esri_ascii_grid": "http://publications.europa.eu/resource/authority/file-type/GRID_ASCII",
+        "sparql": "http://publications.europa.eu/resource/authority/file-type/SPARQLQ",
+        "wcs": "http://publications.europa.eu/resource/authority/file-type/WCS_SRVC",
+        "wfs": "http://publications.europa.eu/resource/authority/file-type/WFS_SRVC",
+        "wms": "http://publications.europa.eu/resource/authority/file-type/WMS_SRVC",
+        "wmts": "http://publications.europa.eu/resource/authority/file-type/WMTS_SRVC",
+        "worldfile": "http://publications.europa.eu/resource/authority/file-type/WORLD",
+    }
+    format_values.update((key, URIRef(uri)) for key, uri in special_cases.items())
 
     return format_values
 
@@ -385,7 +512,7 @@ def get_iana_media_type_values():
             else:
                 uri_suffix = registry_type + "/" + name
 
-            media_type_values[registry_type + "/" + name] = (
+            media_type_values[registry_type + "/" + name] = URIRef(
                 f"{media_types_namespaces['ns']}/media-types/{uri_suffix}"
             )
 
@@ -395,8 +522,8 @@ def get_iana_media_type_values():
 def get_language_uri_map():
     """
     Parses language.xml and builds a mapping:
-    { 'de': 'http://publications.europa.eu/resource/authority/language/DEU',
-    'en': 'http://publications.europa.eu/resource/authority/language/ENG',
+    { 'de': URIRef('http://publications.europa.eu/resource/authority/language/DEU'),
+    'en': URIRef('http://publications.europa.eu/resource/authority/language/ENG'),
     ...}
     """
     xml_file = os.path.join(__location__, "language.xml")
@@ -415,6 +542,6 @@ def get_language_uri_map():
         notation = desc.find("skos:notation", ns)
         if uri and notation is not None:
             lang_code = notation.text.strip().lower()
-            lang_map[lang_code] = uri
+            lang_map[lang_code] = URIRef(uri)
 
     return lang_map
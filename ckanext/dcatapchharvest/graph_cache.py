@@ -0,0 +1,292 @@
+"""A cache of the triples that a profile creates for a dataset, so the RDF
+endpoints and catalog exports do not build the graph of an unchanged dataset
+again.
+
+The triples are keyed by the profile, the package id, its `metadata_modified`
+date, its groups, the version of the vocabularies and the config options that
+change the dataset and resource URIs. The cache is disabled by default. Set
+`ckanext.dcat_ch_rdf_harvester.graph_cache` to `memory` to keep the triples in
+each process, or to `disk` to share them between processes as pickle files in
+`ckanext.dcat_ch_rdf_harvester.graph_cache_dir`. Parsing the triples from
+N-Triples would take longer than building them again.
+"""
+
+import functools
+import hashlib
+import json
+import logging
+import os
+import pickle
+import tempfile
+import threading
+from collections import OrderedDict
+
+import ckan.plugins.toolkit as tk
+from rdflib import BNode
+
+from ckanext.dcatapchharvest import dcat_helpers as dh
+from ckanext.dcatapchharvest import metrics
+from ckanext.dcatapchharvest.triple_batch import TripleBatch
+
+log = logging.getLogger(__name__)
+
+BACKEND_CONFIG = "ckanext.dcat_ch_rdf_harvester.graph_cache"
+MAX_SIZE_CONFIG = "ckanext.dcat_ch_rdf_harvester.graph_cache_max_size"
+DIR_CONFIG = "ckanext.dcat_ch_rdf_harvester.graph_cache_dir"
+DEFAULT_MAX_SIZE = 100 * 1024 * 1024
+# Estimated memory used by a triple in addition to the length of its terms
+TRIPLE_OVERHEAD = 200
+
+# Increase this whenever a change to a profile changes its output, so that
+# cached triples of the old version are not used anymore
+CACHE_VERSION = 1
+
+
+def _estimated_size(triples):
+    return sum(len(s) + len(p) + len(o) + TRIPLE_OVERHEAD for s, p, o in triples)
+
+
+class MemoryGraphCache(object):
+    """Keeps the triples in memory and evicts the least recently used entries
+    once they take up an estimated max_size bytes.
+    """
+
+    def __init__(self, max_size=DEFAULT_MAX_SIZE):
+        self.max_size = max_size
+        self.size = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            self._entries.move_to_end(key)
+            return entry[0]
+
+    def set(self, key, triples):
+        size = _estimated_size(triples)
+        if size > self.max_size:
+            return
+        with self._lock:
+            if key in self._entries:
+                self.size -= self._entries.pop(key)[1]
+            self._entries[key] = (tuple(triples), size)
+            self.size += size
+            while self.size > self.max_size:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self.size -= evicted_size
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
+
+
+class DiskGraphCache(object):
+    """Keeps the pickled triples in files in the given directory, which can
+    be shared by several processes. Only CKAN may be able to write to the
+    directory, as loading a pickle file can run any code. The modification time of a file is
+    updated whenever it is read, and the least recently used files are deleted
+    once the files take up more than max_size bytes.
+    """
+
+    def __init__(self, directory, max_size=DEFAULT_MAX_SIZE):
+        self.directory = directory
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+        self.size = sum(size for _, _, size in self._files())
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.pickle")
+
+    def _files(self):
+        files = []
+        with os.scandir(self.directory) as entries:
+            for entry in entries:
+                if not entry.name.endswith(".pickle"):
+                    continue
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    # Deleted by another process
+                    continue
+                files.append((stat.st_mtime, entry.path, stat.st_size))
+        return files
+
+    def get(self, key):
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        try:
+            return pickle.loads(data)
+        except (pickle.UnpicklingError, EOFError, AttributeError, ImportError) as e:
+            # A truncated file or one written by another version of the code
+            log.warning(f"Deleting unreadable graph cache file {path}: {e!r}")
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            return None
+
+    def set(self, key, triples):
+        data = pickle.dumps(tuple(triples), protocol=pickle.HIGHEST_PROTOCOL)
+        if len(data) > self.max_size:
+            return
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, self._path(key))
+        with self._lock:
+            self.size += len(data)
+            if self.size > self.max_size:
+                self._evict()
+
+    def _evict(self):
+        """Deletes the least recently used files until the files take up at
+        most 90% of max_size. Recounts the size of all files, as other
+        processes add and delete files too.
+        """
+        files = sorted(self._files())
+        self.size = sum(size for _, _, size in files)
+        for _, path, size in files:
+            if self.size <= 0.9 * self.max_size:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            self.size -= size
+
+    def clear(self):
+        with self._lock:
+            for _, path, _ in self._files():
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+            self.size = 0
+
+
+_cache = None
+_cache_settings = None
+
+
+def get_graph_cache():
+    """Returns the configured graph cache, or None if it is disabled."""
+    global _cache, _cache_settings
+
+    settings = (
+        tk.config.get(BACKEND_CONFIG) or "",
+        int(tk.config.get(MAX_SIZE_CONFIG) or DEFAULT_MAX_SIZE),
+        tk.config.get(DIR_CONFIG) or "",
+    )
+    if settings == _cache_settings:
+        return _cache
+
+    backend, max_size, directory = settings
+    if not backend:
+        _cache = None
+    elif backend == "memory":
+        _cache = MemoryGraphCache(max_size)
+    elif backend == "disk":
+        if not directory:
+            raise ValueError(f"{DIR_CONFIG} is required by the disk graph cache")
+        _cache = DiskGraphCache(directory, max_size)
+    else:
+        raise ValueError(f"Unknown {BACKEND_CONFIG} backend: {backend}")
+    _cache_settings = settings
+    return _cache
+
+
+def graph_cache_key(profile_name, dataset_dict, dataset_ref):
+    """Returns the cache key of the triples of a dataset, or None if the
+    dataset has not been saved yet.
+    """
+    if not dataset_dict.get("id") or not dataset_dict.get("metadata_modified"):
+        return None
+    key = [
+        CACHE_VERSION,
+        profile_name,
+        dh.vocabulary_version(),
+        dataset_dict["id"],
+        dataset_dict["metadata_modified"],
+        # Adding a dataset to a group does not change metadata_modified
+        sorted(group.get("name", "") for group in dataset_dict.get("groups") or []),
+        str(dataset_ref or ""),
+        tk.config.get("ckan.site_url", ""),
+        tk.config.get(dh.TEST_ENV_URLS_CONFIG, ""),
+    ]
+    return hashlib.sha256(json.dumps(key).encode("utf-8")).hexdigest()
+
+
+def _default_graph(g):
+    """Returns the graph that Graph.add adds triples to, which is the default
+    context of a ConjunctiveGraph.
+    """
+    return getattr(g, "default_context", g)
+
+
+def _new_blank_nodes(triples):
+    """Replaces the blank nodes in the triples by new ones, so that the
+    triples of a dataset that is added to a graph twice stay apart.
+    """
+    blank_nodes = {}
+
+    def replace(node):
+        if isinstance(node, BNode):
+            return blank_nodes.setdefault(node, BNode())
+        return node
+
+    return [(replace(s), p, replace(o)) for s, p, o in triples]
+
+
+def cached_graph(profile_name):
+    """Decorator for the graph_from_dataset method of a profile that caches
+    the triples added to the graph. On a cache hit, the cached triples are
+    added to the graph instead of calling the method. The method must bind
+    its namespaces with the _bind_namespaces method of the profile, and must
+    not read triples from the graph. On a cache miss, the triples are collected
+    in a TripleBatch, so they are added to the graph in one batch as well.
+    """
+
+    def decorator(graph_from_dataset):
+        @functools.wraps(graph_from_dataset)
+        def wrapper(self, dataset_dict, dataset_ref):
+            cache = get_graph_cache()
+            key = cache and graph_cache_key(profile_name, dataset_dict, dataset_ref)
+            if not key:
+                return graph_from_dataset(self, dataset_dict, dataset_ref)
+
+            self._bind_namespaces()
+
+            triples = cache.get(key)
+            if triples is not None:
+                metrics.GRAPH_CACHE_LOOKUPS.inc(result="hit")
+                default_graph = _default_graph(self.g)
+                default_graph.addN(
+                    (s, p, o, default_graph) for s, p, o in _new_blank_nodes(triples)
+                )
+                return None
+
+            metrics.GRAPH_CACHE_LOOKUPS.inc(result="miss")
+            batch = TripleBatch(self.g)
+            self.g = batch
+            try:
+                result = graph_from_dataset(self, dataset_dict, dataset_ref)
+            finally:
+                self.g = batch.graph
+            triples = list(batch.triples)
+            batch.flush()
+            cache.set(key, triples)
+            return result
+
+        return wrapper
+
+    return decorator
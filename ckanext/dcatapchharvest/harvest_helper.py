@@ -1,43 +1,354 @@
+import fnmatch
+import functools
+import heapq
+import json
 import logging
+import re
+import time
+import uuid
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime
 
 import ckan.model as model
 import ckan.plugins.toolkit as tk
 from dateutil.parser import ParserError
 from dateutil.parser import parse as dateutil_parse
 from dateutil.tz import tz
+from sqlalchemy import func
+from sqlalchemy import inspect as sa_inspect
+
+from ckanext.activity.model import Activity
+from ckanext.harvest.model import HarvestLog, HarvestObject
 
 log = logging.getLogger(__name__)
 
 NOTIFICATION_USER = "harvest-notification"
 DEFAULT_TIMEZONE = tz.gettz("Europe/Zurich")
+PATTERN_PREFIX = "glob:"
+WILDCARD_CHARACTERS = "*?["
+DATETIME_CACHE_SIZE = 10000
+GUID_CHUNK_SIZE = 500
+SNAPSHOT_CHUNK_SIZE = 500
+ACTIVITY_BATCH_SIZE = 100
+SLOWEST_DATASETS_COUNT = 10
 
+_ISO_DATE_PATTERN = re.compile(r"\d{4}-\d{2}-\d{2}")
 
-def map_resources_to_ids(pkg_dict, package_id):
-    existing_package = tk.get_action("package_show")({}, {"id": package_id})
-    existing_resources = existing_package.get("resources")
-    existing_resources_mapping = {
-        r["id"]: _get_resource_id_string(r) for r in existing_resources
-    }
-    for resource in pkg_dict.get("resources"):
-        resource_id_dict = _get_resource_id_string(resource)
-        id_to_reuse = [
-            k
-            for k, v in list(existing_resources_mapping.items())
-            if v == resource_id_dict
+
+class OrganizationCache:
+    """Caches organization lookups for the duration of a harvest job.
+
+    A harvest source almost always uses only one or two organizations, so
+    the organization of every harvested dataset is only read once from the
+    database. Organizations that do not exist are cached as well.
+    """
+
+    def __init__(self):
+        self._ids_by_name = {}
+        self._names_by_id = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get_id_by_name(self, org_name):
+        """Returns the id of the organization with the given name, or None if
+        it does not exist.
+        """
+        if org_name in self._ids_by_name:
+            self.hits += 1
+        else:
+            self.misses += 1
+            org = model.Group.by_name(org_name)
+            self._ids_by_name[org_name] = org.id if org else None
+        return self._ids_by_name[org_name]
+
+    def get_name_by_id(self, org_id):
+        """Returns the name of the organization with the given id, or None if
+        it does not exist.
+
+        This only reads the organization row instead of running the full
+        organization_show action, which may include datasets and members.
+        """
+        if org_id in self._names_by_id:
+            self.hits += 1
+        else:
+            self.misses += 1
+            org = model.Group.get(org_id)
+            self._names_by_id[org_id] = (
+                org.name if org and org.is_organization else None
+            )
+        return self._names_by_id[org_id]
+
+    def stats(self):
+        return f"{self.hits} hits, {self.misses} misses"
+
+
+class JobGuidLookup:
+    """Resolves the guids of the harvest objects of one harvest job to the
+    ids of the existing datasets, one chunk of objects at a time.
+
+    When a guid is looked up that is not in the current chunk, the guids of
+    the next `chunk_size` objects of the job that are still waiting to be
+    fetched are resolved with `resolve`, which maps a list of guids to the
+    package id rows of each guid. The snapshots of the existing datasets of
+    the chunk are loaded at the same time, and each one is removed once it
+    has been used. Only the current chunk is kept, so memory use does not
+    grow with the size of the job.
+    """
+
+    def __init__(self, job_id, resolve, chunk_size=GUID_CHUNK_SIZE):
+        self.job_id = job_id
+        self.chunk_size = chunk_size
+        self.chunks_loaded = 0
+        self._resolve = resolve
+        self._chunk_guids = set()
+        self._rows = {}
+        self._snapshots = {}
+
+    def get(self, guid):
+        """Returns the package id rows of the guid, or None if no dataset
+        existed when its chunk was resolved.
+        """
+        if guid not in self._chunk_guids:
+            self._load_chunk(guid)
+        return self._rows.get(guid)
+
+    def _load_chunk(self, guid):
+        guids = [guid] + [
+            waiting_guid
+            for (waiting_guid,) in model.Session.query(HarvestObject.guid)
+            .filter(HarvestObject.harvest_job_id == self.job_id)
+            .filter(HarvestObject.state == "WAITING")
+            .filter(HarvestObject.guid.isnot(None))
+            .filter(HarvestObject.guid != guid)
+            .order_by(HarvestObject.gathered)
+            .limit(self.chunk_size - 1)
         ]
-        if id_to_reuse:
-            id_to_reuse = id_to_reuse[0]
-            resource["id"] = id_to_reuse
-            del existing_resources_mapping[id_to_reuse]
+        self._chunk_guids = set(guids)
+        self._rows = {
+            chunk_guid: rows
+            for chunk_guid, rows in self._resolve(guids).items()
+            if rows
+        }
+        self._snapshots = load_package_snapshots(
+            rows[0][0] for rows in self._rows.values()
+        )
+        self.chunks_loaded += 1
+
+    def pop_snapshot(self, package_id):
+        """Returns the snapshot of the package if it was loaded with the
+        current chunk and has not been used yet, otherwise None.
+        """
+        return self._snapshots.pop(package_id, None)
+
+
+class ValueMatcher:
+    """Matches values against a list of exact values and shell-style patterns
+    (values that start with `glob:`, see fnmatch). Only patterns are read as
+    patterns, as license URLs and identifiers may contain wildcard characters
+    like `?`. Patterns that only end with a * are matched as prefixes.
+    """
+
+    def __init__(self, values):
+        self._values = set()
+        prefixes = []
+        patterns = []
+        for value in values:
+            if not value.startswith(PATTERN_PREFIX):
+                self._values.add(value)
+                continue
+            pattern = value[len(PATTERN_PREFIX) :]
+            if pattern.endswith("*") and not any(
+                char in pattern[:-1] for char in WILDCARD_CHARACTERS
+            ):
+                prefixes.append(pattern[:-1])
+            else:
+                patterns.append(fnmatch.translate(pattern))
+        self._prefixes = tuple(prefixes)
+        self._pattern = re.compile("|".join(patterns)) if patterns else None
+
+    def __bool__(self):
+        return bool(self._values or self._prefixes or self._pattern)
+
+    def matches(self, value):
+        if not value:
+            return False
+        return (
+            value in self._values
+            or (self._prefixes and value.startswith(self._prefixes))
+            or (self._pattern is not None and self._pattern.match(value) is not None)
+        )
+
+
+class ExclusionFilter:
+    """Decides which datasets of a harvest source are not harvested.
+
+    The filter is compiled once per harvest job from the
+    `excluded_dataset_identifiers` and `excluded_license` lists in the source
+    config, and counts the datasets it excluded.
+    """
+
+    def __init__(self, excluded_identifiers=None, excluded_licenses=None):
+        self._identifiers = ValueMatcher(excluded_identifiers or [])
+        self._licenses = ValueMatcher(excluded_licenses or [])
+        self.excluded_by_identifier = 0
+        self.excluded_by_license = 0
+
+    @classmethod
+    def from_source_config(cls, source_config):
+        try:
+            source_config_obj = json.loads(source_config) if source_config else {}
+        except ValueError:
+            source_config_obj = {}
+        return cls(
+            source_config_obj.get("excluded_dataset_identifiers"),
+            source_config_obj.get("excluded_license"),
+        )
+
+    def __bool__(self):
+        return bool(self._identifiers or self._licenses)
+
+    def is_excluded(self, identifier, licenses):
+        if self._identifiers.matches(identifier):
+            self.excluded_by_identifier += 1
+            return True
+        if any(self._licenses.matches(license) for license in licenses):
+            self.excluded_by_license += 1
+            return True
+        return False
+
+    def stats(self):
+        return (
+            f"{self.excluded_by_identifier} excluded by identifier, "
+            f"{self.excluded_by_license} excluded by license"
+        )
+
+
+def map_resources_to_ids(pkg_dict, package_id, existing_package=None):
+    """Reuses the resource ids of the existing package with the given id and
+    returns its snapshot (see load_package_snapshots). The snapshot is only
+    read from the database if it is not given.
+    """
+    if existing_package is None:
+        existing_package = load_package_snapshots([package_id]).get(package_id)
+    if existing_package is None:
+        raise tk.ObjectNotFound(f"Package {package_id} not found")
+    reuse_resource_ids(pkg_dict.get("resources"), existing_package.get("resources"))
     return existing_package
 
 
-def create_activity(package_id, message):
-    notification_user = tk.get_action("user_show")(
-        {"ignore_auth": True}, {"id": NOTIFICATION_USER}
-    )
+def load_package_snapshots(package_ids):
+    """Reads the fields of existing packages that are needed to reuse resource
+    ids and to detect changes, straight from the model tables.
+
+    Returns a dict mapping the id of every package found to a dict with the
+    package `id`, `url` and `modified`, and its active `resources` in their
+    original order, each with its `id`, `url`, `download_url` and `modified`.
+    This is much cheaper than package_show, which validates and dictizes the
+    whole package.
+    """
+    package_ids = list(dict.fromkeys(package_ids))
+    snapshots = {}
+
+    for start in range(0, len(package_ids), SNAPSHOT_CHUNK_SIZE):
+        chunk = package_ids[start : start + SNAPSHOT_CHUNK_SIZE]
+        for package_id, url, modified in _query_package_fields(chunk):
+            snapshots[package_id] = {
+                "id": package_id,
+                "url": url,
+                "modified": modified,
+                "resources": [],
+            }
+
+        resource_rows = (
+            model.Session.query(
+                model.Resource.package_id,
+                model.Resource.id,
+                model.Resource.url,
+                model.Resource.extras,
+            )
+            .filter(model.Resource.package_id.in_(chunk))
+            .filter(model.Resource.state == "active")
+            .order_by(model.Resource.package_id, model.Resource.position)
+        )
+        for package_id, resource_id, url, extras in resource_rows:
+            if package_id not in snapshots:
+                continue
+            extras = extras or {}
+            snapshots[package_id]["resources"].append(
+                {
+                    "id": resource_id,
+                    "url": url,
+                    "download_url": extras.get("download_url"),
+                    "modified": extras.get("modified"),
+                }
+            )
+
+    return snapshots
+
+
+def _query_package_fields(package_ids):
+    if tk.check_ckan_version(max_version="2.11.99"):
+        modified_extras = (
+            model.Session.query(model.PackageExtra.package_id, model.PackageExtra.value)
+            .filter(model.PackageExtra.package_id.in_(package_ids))
+            .filter(model.PackageExtra.key == "modified")
+            .filter(model.PackageExtra.state == "active")
+        )
+        modified_by_package_id = dict(modified_extras)
+        rows = model.Session.query(model.Package.id, model.Package.url).filter(
+            model.Package.id.in_(package_ids)
+        )
+        return [
+            (package_id, url, modified_by_package_id.get(package_id))
+            for package_id, url in rows
+        ]
+
+    return model.Session.query(
+        model.Package.id,
+        model.Package.url,
+        model.Package.extras["modified"].astext,
+    ).filter(model.Package.id.in_(package_ids))
+
+
+def reuse_resource_ids(resources, existing_resources):
+    """Sets the id of an existing resource on every harvested resource that
+    has the same url. Each existing id is only reused once: harvested resources
+    with the same url get the ids of the existing resources with that url in
+    their original order.
+    """
+    existing_ids_by_url = {}
+    for existing_resource in existing_resources:
+        existing_ids_by_url.setdefault(
+            _get_resource_id_string(existing_resource), deque()
+        ).append(existing_resource["id"])
+
+    for resource in resources:
+        ids_to_reuse = existing_ids_by_url.get(_get_resource_id_string(resource))
+        if ids_to_reuse:
+            resource["id"] = ids_to_reuse.popleft()
+
+
+def get_notification_user_id():
+    """Returns the id of the user that creates the change activities, or None
+    if it does not exist.
+    """
+    notification_user = model.User.get(NOTIFICATION_USER)
+    return notification_user.id if notification_user else None
+
+
+def create_activity(package_id, message, user_id=None):
+    """Creates a change activity of the package, which is committed together
+    with the import of the harvest object. The notification user is looked
+    up unless its id is given.
+    """
+    if user_id is None:
+        notification_user = tk.get_action("user_show")(
+            {"ignore_auth": True}, {"id": NOTIFICATION_USER}
+        )
+        user_id = notification_user["id"]
     activity_dict = {
-        "user_id": notification_user["id"],
+        "user_id": user_id,
         "object_id": package_id,
         "activity_type": "changed package",
         "data": {"message": message},
@@ -52,46 +363,411 @@ def create_activity(package_id, message):
     tk.get_action("activity_create")(activity_create_context, activity_dict)
 
 
+class ActivityBatch:
+    """Collects the change activities of the imported datasets, so that they
+    are inserted into the database together instead of one by one.
+
+    Once the batch is full, its activities are added to the session while a
+    harvest object is imported and are committed with that object. If the
+    import of the object fails and the session is rolled back, only the
+    activities of the failed object are dropped; the others are added again
+    with the next batch.
+    """
+
+    def __init__(self, batch_size=ACTIVITY_BATCH_SIZE):
+        self.batch_size = batch_size
+        self._waiting = []
+        self._added = []
+
+    def __len__(self):
+        return len(self._waiting) + len(self._added)
+
+    def add(self, harvest_object_id, user_id, package_id, message):
+        """Collects the change activity of a package, and adds the batch to
+        the session if it is full.
+        """
+        activity = Activity(
+            user_id, package_id, "changed package", {"message": message}
+        )
+        self._waiting.append((harvest_object_id, activity))
+        if len(self._waiting) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        """Adds the waiting activities to the session, which inserts them
+        together on its next flush.
+        """
+        model.Session.add_all(activity for _, activity in self._waiting)
+        self._added.extend(self._waiting)
+        self._waiting = []
+
+    def settle(self, harvest_object_id, failed=False):
+        """Forgets the activities that have been committed after the import
+        of the harvest object. The activities that were rolled back wait for
+        the next batch, unless they belong to the object whose import failed.
+        """
+        added, self._added = self._added, []
+        for object_id, activity in added:
+            state = sa_inspect(activity)
+            if state.has_identity:
+                continue
+            if state.pending:
+                self._added.append((object_id, activity))
+            elif not (failed and object_id == harvest_object_id):
+                self._waiting.append((object_id, activity))
+        if failed:
+            self._waiting = [
+                (object_id, activity)
+                for object_id, activity in self._waiting
+                if object_id != harvest_object_id
+            ]
+
+    def write(self):
+        """Inserts and commits all collected activities, e.g. when no more
+        objects of the harvest job are left to import them with.
+        """
+        count = len(self)
+        self.flush()
+        try:
+            model.Session.commit()
+        except Exception as e:
+            model.Session.rollback()
+            log.error(f"Error when creating {count} change activities: {e}")
+        self._added = []
+        return count
+
+
+class DryRunJob:
+    """Stands in for a harvest job when a harvest source is harvested in
+    dry-run mode from the command line, so that nothing is written to the
+    database. Gather errors are collected instead of saved.
+    """
+
+    def __init__(self, source):
+        self.id = f"dry-run-{uuid.uuid4()}"
+        self.source = source
+        self.errors = []
+
+
+class StageTimings:
+    """Adds up the wall time spent in each stage of a harvest run."""
+
+    def __init__(self):
+        self.timings = {}
+
+    def add_time(self, stage, seconds):
+        self.timings[stage] = self.timings.get(stage, 0.0) + seconds
+
+    @contextmanager
+    def timer(self, stage):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_time(stage, time.perf_counter() - start)
+
+    def rounded_timings(self):
+        return {stage: round(seconds, 3) for stage, seconds in self.timings.items()}
+
+
+class DryRunReport(StageTimings):
+    """Counts what a harvest run would do to the existing datasets of a
+    harvest source, and how long each stage of the dry run took.
+    """
+
+    STATUSES = ["new", "changed", "unchanged", "deleted"]
+
+    def __init__(self):
+        super().__init__()
+        self.pages = 0
+        self.counts = {status: 0 for status in self.STATUSES}
+        self.errors = []
+
+    def count(self, status):
+        self.counts[status] += 1
+
+    def as_dict(self):
+        return {
+            "pages": self.pages,
+            "counts": dict(self.counts),
+            "timings": self.rounded_timings(),
+            "errors": list(self.errors),
+        }
+
+    def summary(self):
+        counts = ", ".join(
+            f"{self.counts[status]} {status}" for status in self.STATUSES
+        )
+        timings = ", ".join(
+            f"{stage} {seconds:.2f}s" for stage, seconds in self.timings.items()
+        )
+        return (
+            f"{self.pages} pages, {counts}, {len(self.errors)} errors "
+            f"(timings: {timings})"
+        )
+
+
+class HarvestJobReport(StageTimings):
+    """Collects performance metrics of the gather or the import stage of a
+    harvest job.
+
+    The gather stage runs in one process, which fills in the report while it
+    runs. Caches are tracked with track_cache: anything with `hits` and
+    `misses` counters, of which only the lookups made during the job are
+    reported. The report of the import stage is built from the harvest
+    objects with from_harvest_objects once the job has finished.
+    """
+
+    # report_status of the harvest objects, as set by ckanext-harvest
+    IMPORT_STATUSES = {
+        "added": "created",
+        "updated": "updated",
+        "not modified": "unchanged",
+        "deleted": "deleted",
+        "errored": "failed",
+    }
+
+    def __init__(self, job_id, stage):
+        super().__init__()
+        self.job_id = job_id
+        self.stage = stage
+        self.pages = 0
+        self.bytes_downloaded = 0
+        self.datasets = 0
+        self.created = 0
+        self.updated = 0
+        self.unchanged = 0
+        self.deleted = 0
+        self.failed = 0
+        self._caches = {}
+        self._slowest_datasets = []
+
+    @classmethod
+    def from_harvest_objects(cls, job_id):
+        """Builds the report of the import stage of a finished harvest job from
+        the report status and import times of its harvest objects.
+        """
+        report = cls(job_id, "import")
+        rows = (
+            model.Session.query(
+                HarvestObject.report_status,
+                func.count(HarvestObject.id),
+                func.min(HarvestObject.import_started),
+                func.max(HarvestObject.import_finished),
+            )
+            .filter(HarvestObject.harvest_job_id == job_id)
+            .group_by(HarvestObject.report_status)
+        )
+        import_started = []
+        import_finished = []
+        for status, count, started, finished in rows:
+            if status in cls.IMPORT_STATUSES:
+                field = cls.IMPORT_STATUSES[status]
+                setattr(report, field, getattr(report, field) + count)
+            if started:
+                import_started.append(started)
+            if finished:
+                import_finished.append(finished)
+        if import_started and import_finished:
+            seconds = (max(import_finished) - min(import_started)).total_seconds()
+            report.add_time("import", max(seconds, 0.0))
+        return report
+
+    def track_cache(self, name, cache):
+        self._caches[name] = (cache, cache.hits, cache.misses)
+
+    def add_dataset_parse_time(self, identifier, seconds):
+        self.datasets += 1
+        entry = (seconds, identifier or "")
+        if len(self._slowest_datasets) < SLOWEST_DATASETS_COUNT:
+            heapq.heappush(self._slowest_datasets, entry)
+        else:
+            heapq.heappushpop(self._slowest_datasets, entry)
+
+    def slowest_datasets(self):
+        return [
+            {"identifier": identifier, "parse_seconds": round(seconds, 4)}
+            for seconds, identifier in sorted(self._slowest_datasets, reverse=True)
+        ]
+
+    def cache_stats(self):
+        stats = {}
+        for name, (cache, hits_before, misses_before) in self._caches.items():
+            hits = cache.hits - hits_before
+            misses = cache.misses - misses_before
+            lookups = hits + misses
+            stats[name] = {
+                "hits": hits,
+                "misses": misses,
+                "hit_rate": round(hits / lookups, 3) if lookups else None,
+            }
+        return stats
+
+    def datasets_per_second(self):
+        seconds = self.timings.get(self.stage)
+        count = (
+            self.datasets
+            if self.stage == "gather"
+            else self.created + self.updated + self.unchanged
+        )
+        if not seconds:
+            return None
+        return round(count / seconds, 2)
+
+    def as_dict(self):
+        report = {
+            "job_id": self.job_id,
+            "stage": self.stage,
+            "timings": self.rounded_timings(),
+            "datasets_per_second": self.datasets_per_second(),
+            "caches": self.cache_stats(),
+        }
+        if self.stage == "gather":
+            report.update(
+                {
+                    "pages": self.pages,
+                    "bytes_downloaded": self.bytes_downloaded,
+                    "datasets": self.datasets,
+                    "slowest_datasets": self.slowest_datasets(),
+                }
+            )
+        else:
+            report.update(
+                {
+                    "created": self.created,
+                    "updated": self.updated,
+                    "unchanged": self.unchanged,
+                    "deleted": self.deleted,
+                    "failed": self.failed,
+                }
+            )
+        return report
+
+    def save(self):
+        """Writes the report to the log and to the harvest log table, where it
+        is listed by the harvest_log_list action.
+        """
+        message = (
+            f"Performance report of the {self.stage} stage of harvest job "
+            f"{self.job_id}: {json.dumps(self.as_dict())}"
+        )
+        log.info(message)
+        HarvestLog(level="INFO", content=message).save()
+
+
 def check_package_change(existing_pkg, dataset_dict):
-    # Check if the URL has changed
+    """Returns whether the harvested dataset differs from the existing package,
+    and a message listing all the changes.
+    """
+    changes = get_package_changes(existing_pkg, dataset_dict)
+    if changes:
+        return True, "; ".join(change["message"] for change in changes)
+    return False, None
+
+
+def get_package_changes(existing_pkg, dataset_dict):
+    """Compares the harvested dataset with the existing package and returns the
+    list of all changes found, as dicts with a `type` and a `message`.
+
+    Existing resources are indexed by their url once, so the comparison takes
+    linear time in the number of resources.
+    """
+    changes = []
+
     existing_pkg_url = existing_pkg.get("url", "")
     dataset_dict_url = dataset_dict.get("url", "")
     if existing_pkg_url != dataset_dict_url:
-        msg = "dataset url value changed from '{}' to '{}'".format(
-            existing_pkg_url, dataset_dict_url
+        changes.append(
+            _change(
+                "url",
+                f"dataset url value changed from '{existing_pkg_url}' "
+                f"to '{dataset_dict_url}'",
+            )
         )
-        return True, msg
     if _changes_in_date(existing_pkg.get("modified"), dataset_dict.get("modified")):
-        msg = f"dataset modified date changed: {dataset_dict.get('modified')}"
-        return True, msg
-    resources = dataset_dict.get("resources", [])
-    existing_resources = existing_pkg.get("resources", [])
-    resource_count_changed = len(existing_resources) != len(resources)
-    if resource_count_changed:
-        msg = f"resource count changed: {len(resources)}"
-        return True, msg
+        changes.append(
+            _change(
+                "modified",
+                f"dataset modified date changed: {dataset_dict.get('modified')}",
+            )
+        )
+
+    changes.extend(
+        _get_resource_changes(
+            existing_pkg.get("resources", []), dataset_dict.get("resources", [])
+        )
+    )
+    return changes
+
+
+def _get_resource_changes(existing_resources, resources):
+    changes = []
+    if len(existing_resources) != len(resources):
+        changes.append(
+            _change("resource_count", f"resource count changed: {len(resources)}")
+        )
+
+    existing_resources_by_url = {}
+    for existing_resource in existing_resources:
+        existing_resources_by_url.setdefault(
+            existing_resource.get("url"), deque()
+        ).append(existing_resource)
+
+    unmatched_resources = []
     for resource in resources:
-        matching_existing_resource_with_same_url = [
-            existing_resource
-            for existing_resource in existing_resources
-            if existing_resource.get("url") == resource.get("url")
-        ]
-        if not matching_existing_resource_with_same_url:
-            msg = f"resource access url changed: {resource.get('url')}"
-            return True, msg
-        matching_existing_resource = matching_existing_resource_with_same_url[0]
-        download_url_changed = matching_existing_resource.get(
-            "download_url"
-        ) != resource.get("download_url")
-        if download_url_changed:
-            msg = f"resource download url changed: {resource.get('download_url')}"
-            return True, msg
+        matching_existing_resources = existing_resources_by_url.get(resource.get("url"))
+        if not matching_existing_resources:
+            unmatched_resources.append(resource)
+            continue
+        existing_resource = matching_existing_resources.popleft()
+        if existing_resource.get("download_url") != resource.get("download_url"):
+            changes.append(
+                _change(
+                    "resource_download_url",
+                    f"resource download url changed: {resource.get('download_url')}",
+                )
+            )
         if _changes_in_date(
-            matching_existing_resource.get("modified"), resource.get("modified")
+            existing_resource.get("modified"), resource.get("modified")
         ):
-            msg = f"resource modified date changed: {resource.get('modified')}"
-            return True, msg
-    return False, None
+            changes.append(
+                _change(
+                    "resource_modified",
+                    f"resource modified date changed: {resource.get('modified')}",
+                )
+            )
+
+    unmatched_existing_resources = [
+        existing_resource
+        for matching_existing_resources in existing_resources_by_url.values()
+        for existing_resource in matching_existing_resources
+    ]
+    # A new resource that takes the place of an existing one has a new url,
+    # any others were added or removed
+    changed_count = min(len(unmatched_resources), len(unmatched_existing_resources))
+    for resource in unmatched_resources[:changed_count]:
+        changes.append(
+            _change(
+                "resource_url", f"resource access url changed: {resource.get('url')}"
+            )
+        )
+    for resource in unmatched_resources[changed_count:]:
+        changes.append(
+            _change("resource_added", f"resource added: {resource.get('url')}")
+        )
+    for existing_resource in unmatched_existing_resources[changed_count:]:
+        changes.append(
+            _change(
+                "resource_removed",
+                f"resource removed: {existing_resource.get('url')}",
+            )
+        )
+
+    return changes
+
+
+def _change(change_type, message):
+    return {"type": change_type, "message": message}
 
 
 def _get_resource_id_string(resource):
@@ -103,25 +779,48 @@ def _changes_in_date(existing_datetime, new_datetime):
         return False
     if not existing_datetime or not new_datetime:
         return True
+    # The values are nearly always ISO strings that were cleaned by the same
+    # profile, so most of them do not need to be parsed at all
+    if existing_datetime == new_datetime:
+        return False
 
-    try:
-        existing = dateutil_parse(existing_datetime)
-        if existing.tzinfo is None:
-            existing = existing.replace(tzinfo=DEFAULT_TIMEZONE)
-            log.debug(
-                f"Datetime {existing_datetime} has no time zone info: "
-                f"assuming Europe/Zurich"
-            )
-        new = dateutil_parse(new_datetime)
-        if new.tzinfo is None:
-            new = new.replace(tzinfo=DEFAULT_TIMEZONE)
-            log.debug(
-                f"Datetime {new_datetime} has no time zone info: assuming Europe/Zurich"
-            )
-    except (ParserError, OverflowError) as e:
-        log.info(f"Error when parsing dates {existing_datetime}, {new_datetime}: {e}")
+    existing = _parse_datetime(existing_datetime)
+    new = _parse_datetime(new_datetime)
+    if existing is None or new is None:
         return False
 
     if new == existing:
         return False
     return True
+
+
+@functools.lru_cache(maxsize=DATETIME_CACHE_SIZE)
+def _parse_datetime(value):
+    """Parses a datetime string, assuming Europe/Zurich if it has no time zone
+    info. Returns None if the value can't be parsed.
+
+    ISO strings are parsed with datetime.fromisoformat, dateutil is only used
+    for other formats. Parsed values are cached until clear_datetime_cache is
+    called at the start of the next harvest job.
+    """
+    parsed = None
+    if _ISO_DATE_PATTERN.match(value):
+        try:
+            parsed = datetime.fromisoformat(value)
+        except ValueError:
+            pass
+    if parsed is None:
+        try:
+            parsed = dateutil_parse(value)
+        except (ParserError, OverflowError) as e:
+            log.info(f"Error when parsing date {value}: {e}")
+            return None
+
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=DEFAULT_TIMEZONE)
+        log.debug(f"Datetime {value} has no time zone info: assuming Europe/Zurich")
+    return parsed
+
+
+def clear_datetime_cache():
+    _parse_datetime.cache_clear()
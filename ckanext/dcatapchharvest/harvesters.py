@@ -1,5 +1,8 @@
+import hashlib
 import json
 import logging
+import time
+from collections import OrderedDict
 
 import ckan.model as model
 import ckan.plugins as p
@@ -7,22 +10,52 @@ import ckan.plugins.toolkit as tk
 
 from ckanext.dcat.harvesters.rdf import DCATRDFHarvester
 from ckanext.dcat.interfaces import IDCATRDFHarvester
-from ckanext.dcatapchharvest.dcat_helpers import get_pagination
+from ckanext.dcat.processors import RDFParser, RDFParserException
+from ckanext.dcatapchharvest import dcat_helpers as dh
+from ckanext.dcatapchharvest import metrics
 from ckanext.dcatapchharvest.harvest_helper import (
+    NOTIFICATION_USER,
+    ActivityBatch,
+    DryRunJob,
+    DryRunReport,
+    ExclusionFilter,
+    HarvestJobReport,
+    JobGuidLookup,
+    OrganizationCache,
     check_package_change,
-    create_activity,
+    clear_datetime_cache,
+    get_notification_user_id,
+    load_package_snapshots,
     map_resources_to_ids,
 )
+from ckanext.harvest.model import HarvestJob, HarvestObject, HarvestSource
 
 log = logging.getLogger(__name__)
 
+GUID_LOOKUP_CHUNK_SIZE = 500
+# The guid lookups of this many harvest jobs are kept by each fetch worker
+MAX_IMPORT_JOBS = 4
+
 
 class SwissDCATRDFHarvester(DCATRDFHarvester):
     p.implements(IDCATRDFHarvester, inherit=True)
+    p.implements(p.IActions, inherit=True)
 
     harvest_job = None
     current_page_url = None
 
+    _import_job_id = None
+    _guid_lookups = None
+    _organization_cache = None
+    _exclusion_filter = None
+    _exclusion_filter_job_id = None
+    _excluded_guids = None
+    _job_report = None
+    _notification_user_id = None
+    _activity_batch = None
+    _download_started = None
+    _parse_started = None
+
     def info(self):
         return {
             "name": "dcat_ch_rdf",
@@ -60,12 +93,282 @@ class SwissDCATRDFHarvester(DCATRDFHarvester):
             if not all(isinstance(item, str) for item in excluded_license):
                 raise ValueError("excluded_license must be " "a list of strings")
 
+        if "dry_run" in source_config_obj:
+            if not isinstance(source_config_obj["dry_run"], bool):
+                raise ValueError("dry_run must be a boolean")
+
         return source_config
 
+    def gather_stage(self, harvest_job):
+        if _is_dry_run(harvest_job.source.config):
+            self.dry_run(harvest_job.source, harvest_job)
+            return []
+
+        self._organization_cache = OrganizationCache()
+        self._exclusion_filter = ExclusionFilter.from_source_config(
+            harvest_job.source.config
+        )
+        self._exclusion_filter_job_id = harvest_job.id
+        self._excluded_guids = set()
+        self._job_report = HarvestJobReport(harvest_job.id, "gather")
+        self._job_report.track_cache("organizations", self._organization_cache)
+        self._job_report.track_cache("vocabularies", dh.vocabulary_lookups)
+
+        harvester_name = self.info()["name"]
+        metrics.HARVEST_JOBS_IN_PROGRESS.inc(harvester=harvester_name)
+        try:
+            with self._job_report.timer("gather"):
+                object_ids = super(SwissDCATRDFHarvester, self).gather_stage(
+                    harvest_job
+                )
+        finally:
+            metrics.HARVEST_JOBS_IN_PROGRESS.dec(harvester=harvester_name)
+        metrics.HARVEST_DATASETS.inc(
+            self._job_report.datasets, harvester=harvester_name
+        )
+
+        log.info(
+            f"Organization lookups of harvest job {harvest_job.id}: "
+            f"{self._organization_cache.stats()}"
+        )
+        log.info(
+            f"Excluded datasets of harvest job {harvest_job.id}: "
+            f"{self._exclusion_filter.stats()}"
+        )
+        self._save_job_report(self._job_report)
+        metrics.registry.maybe_persist(force=True)
+        return object_ids
+
+    def dry_run(self, harvest_source, harvest_job=None):
+        """Downloads and parses the harvest source, applies the exclusions and
+        compares the harvested datasets with the existing ones, without writing
+        any harvest objects, datasets or activities.
+
+        Returns a DryRunReport with the number of new, changed, unchanged and
+        deleted datasets and the time spent in each stage. Without a harvest
+        job, gather errors are only added to the report.
+        """
+        job = harvest_job or DryRunJob(harvest_source)
+        report = DryRunReport()
+        self._organization_cache = OrganizationCache()
+        self._exclusion_filter = ExclusionFilter.from_source_config(
+            harvest_source.config
+        )
+        self._exclusion_filter_job_id = job.id
+        self._excluded_guids = set()
+
+        datasets_by_guid = {}
+        for parser in self._dry_run_pages(job, report):
+            with report.timer("gather"):
+                datasets_by_guid.update(self._dry_run_guids(parser, job))
+
+        with report.timer("diff"):
+            self._dry_run_diff(datasets_by_guid, harvest_source, report)
+
+        if isinstance(job, DryRunJob):
+            report.errors.extend(job.errors)
+        log.info(f"Dry run of harvest source {harvest_source.id}: {report.summary()}")
+        return report
+
+    def _dry_run_pages(self, harvest_job, report):
+        """Yields the parser of every page of the harvest source, running the
+        same hooks as the gather stage.
+        """
+        rdf_format = None
+        if harvest_job.source.config:
+            rdf_format = json.loads(harvest_job.source.config).get("rdf_format")
+        next_page_url = harvest_job.source.url
+        last_content_hash = None
+
+        while next_page_url:
+            with report.timer("download"):
+                content, rdf_format = self._dry_run_download(
+                    next_page_url, harvest_job, rdf_format
+                )
+            if not content:
+                return
+
+            content_hash = hashlib.md5(content.encode("utf8")).digest()
+            if content_hash == last_content_hash:
+                log.warning("Remote content was the same for the next page, skipping")
+                return
+            last_content_hash = content_hash
+            report.pages += 1
+
+            with report.timer("parse"):
+                parser = self._dry_run_parse(content, rdf_format, harvest_job)
+            if not parser:
+                return
+
+            yield parser
+            next_page_url = parser.next_page()
+
+    def _dry_run_download(self, url, harvest_job, rdf_format):
+        """Downloads a page with the hooks of the gather stage. Returns the
+        content, which is empty if the harvest stops, and the RDF format.
+        """
+        for harvester in p.PluginImplementations(IDCATRDFHarvester):
+            url, errors = harvester.before_download(url, harvest_job)
+            self._save_gather_errors(errors, harvest_job)
+            if not url:
+                return None, rdf_format
+        content, rdf_format = self._get_content_and_type(
+            url, harvest_job, 1, content_type=rdf_format
+        )
+        for harvester in p.PluginImplementations(IDCATRDFHarvester):
+            content, errors = harvester.after_download(content, harvest_job)
+            self._save_gather_errors(errors, harvest_job)
+        return content, rdf_format
+
+    def _dry_run_parse(self, content, rdf_format, harvest_job):
+        """Parses a page with the hooks of the gather stage. Returns the
+        parser, or None if the harvest stops.
+        """
+        parser = RDFParser()
+        try:
+            parser.parse(content, _format=rdf_format)
+        except RDFParserException as e:
+            self._save_gather_error(f"Error parsing the RDF file: {e}", harvest_job)
+            return None
+        for harvester in p.PluginImplementations(IDCATRDFHarvester):
+            parser, errors = harvester.after_parsing(parser, harvest_job)
+            self._save_gather_errors(errors, harvest_job)
+        return parser
+
+    def _dry_run_guids(self, parser, harvest_job):
+        source_dataset = model.Package.get(harvest_job.source.id)
+        datasets_by_guid = {}
+        for dataset in parser.datasets():
+            if not dataset.get("owner_org") and source_dataset.owner_org:
+                dataset["owner_org"] = source_dataset.owner_org
+            try:
+                guid = self._get_guid(dataset, source_url=source_dataset.url)
+            except Exception as e:
+                self._save_gather_error(
+                    f"Error when processing dataset: {e}", harvest_job
+                )
+                continue
+            if not guid:
+                self._save_gather_error(
+                    f"Could not get a unique identifier for dataset: {dataset}",
+                    harvest_job,
+                )
+                continue
+            datasets_by_guid[guid] = dataset
+        return datasets_by_guid
+
+    def _dry_run_diff(self, datasets_by_guid, harvest_source, report):
+        guid_lookup = self._read_datasets_from_db_bulk(list(datasets_by_guid))
+        package_ids_by_guid = {
+            guid: rows[0][0] for guid, rows in guid_lookup.items() if rows
+        }
+        snapshots = load_package_snapshots(list(package_ids_by_guid.values()))
+
+        for guid, dataset in datasets_by_guid.items():
+            snapshot = snapshots.get(package_ids_by_guid.get(guid))
+            if snapshot is None:
+                report.count("new")
+            elif check_package_change(snapshot, dataset)[0]:
+                report.count("changed")
+            else:
+                report.count("unchanged")
+
+        current_guids = (
+            model.Session.query(HarvestObject.guid)
+            .filter(HarvestObject.current == True)  # noqa: E712
+            .filter(HarvestObject.harvest_source_id == harvest_source.id)
+        )
+        for (guid,) in current_guids:
+            if guid not in datasets_by_guid and guid not in self._excluded_guids:
+                report.count("deleted")
+
+    def _save_gather_errors(self, messages, harvest_job):
+        for message in messages:
+            self._save_gather_error(message, harvest_job)
+
+    def _save_gather_error(self, message, job):
+        if isinstance(job, DryRunJob):
+            log.error(f"Dry run of harvest source {job.source.id}: {message}")
+            job.errors.append(message)
+            return
+        metrics.HARVEST_ERRORS.inc(harvester=self.info()["name"], stage="gather")
+        super(SwissDCATRDFHarvester, self)._save_gather_error(message, job)
+
+    def _get_job_report(self, harvest_job):
+        """Returns the report of the gather stage if it belongs to the given
+        job. The hooks of all DCAT RDF harvesters are called for every job.
+        """
+        if self._job_report and self._job_report.job_id == harvest_job.id:
+            return self._job_report
+        return None
+
+    def _save_job_report(self, report):
+        try:
+            report.save()
+        except Exception as e:
+            log.exception(f"Error when saving the report of harvest job: {e}")
+            model.Session.rollback()
+
+    # IActions
+
+    def get_actions(self):
+        harvester = self
+
+        @tk.chained_action
+        def harvest_jobs_run(original_action, context, data_dict):
+            return harvester._harvest_jobs_run(original_action, context, data_dict)
+
+        return {"harvest_jobs_run": harvest_jobs_run}
+
+    def _harvest_jobs_run(self, original_action, context, data_dict):
+        """Runs the harvest_jobs_run action, which marks the running jobs whose
+        objects have all been imported as finished, and saves the import report
+        of each job of this harvester that it finished. The report is built
+        from the harvest objects, so it covers the objects of all workers.
+        """
+        running_job_ids = self._running_job_ids(data_dict.get("source_id"))
+        try:
+            return original_action(context, data_dict)
+        finally:
+            if running_job_ids:
+                self._save_import_reports(running_job_ids)
+
+    def _running_job_ids(self, source_id=None):
+        query = (
+            model.Session.query(HarvestJob.id)
+            .join(HarvestSource, HarvestJob.source_id == HarvestSource.id)
+            .filter(HarvestJob.status == "Running")
+            .filter(HarvestSource.type == self.info()["name"])
+        )
+        if source_id:
+            query = query.filter(HarvestSource.id == source_id)
+        return [job_id for (job_id,) in query]
+
+    def _save_import_reports(self, job_ids):
+        try:
+            finished_job_ids = [
+                job_id
+                for (job_id,) in model.Session.query(HarvestJob.id)
+                .filter(HarvestJob.id.in_(job_ids))
+                .filter(HarvestJob.status == "Finished")
+            ]
+            for job_id in finished_job_ids:
+                HarvestJobReport.from_harvest_objects(job_id).save()
+        except Exception as e:
+            log.exception(f"Error when saving the import reports of harvest jobs: {e}")
+            model.Session.rollback()
+
+    def _get_organization_cache(self):
+        if self._organization_cache is None:
+            self._organization_cache = OrganizationCache()
+        return self._organization_cache
+
     def before_download(self, url, harvest_job):
         # save the harvest_job on the instance
         self.harvest_job = harvest_job
         self.current_page_url = url
+        if self._get_job_report(harvest_job):
+            self._download_started = time.perf_counter()
 
         # fix broken URL for City of Zurich
         url = url.replace("ogd.global.szh.loc", "data.stadt-zuerich.ch")
@@ -93,8 +396,8 @@ class SwissDCATRDFHarvester(DCATRDFHarvester):
             try:
                 if "@" in guid:
                     org_name = guid.split("@")[-1]  # get last element
-                    org = model.Group.by_name(org_name)
-                    if not org:
+                    org_id = self._get_organization_cache().get_id_by_name(org_name)
+                    if not org_id:
                         error_msg = (
                             f"The organization in the dataset identifier "
                             f"({org_name}) does not not exist. "
@@ -103,10 +406,10 @@ class SwissDCATRDFHarvester(DCATRDFHarvester):
                         self._save_gather_error(error_msg, self.harvest_job)
                         return None
 
-                    if org.id != dataset_dict["owner_org"]:
+                    if org_id != dataset_dict["owner_org"]:
                         error_msg = (
                             f"The organization in the dataset identifier "
-                            f"({org.id}) does not match the organization in the "
+                            f"({org_id}) does not match the organization in the "
                             f"harvester config ({dataset_dict['owner_org']})"
                         )
                         log.error(error_msg)
@@ -144,30 +447,93 @@ class SwissDCATRDFHarvester(DCATRDFHarvester):
             _derive_flat_title(title)
         )
 
-    def before_create(self, harvest_object, dataset_dict, temp_dict):
-        try:
-            source_config_obj = json.loads(harvest_object.job.source.config)
-            for excluded_dataset_identifier in source_config_obj.get(
-                "excluded_dataset_identifiers", []
-            ):
-                if excluded_dataset_identifier == dataset_dict.get("identifier"):
-                    dataset_dict.clear()
-            excluded_license = source_config_obj.get("excluded_license", [])
-            dataset_license = set(
-                [res.get("license") for res in dataset_dict.get("resources", [])]
-            )
-            if [license for license in dataset_license if license in excluded_license]:
-                dataset_dict.clear()
-        except ValueError:
-            pass
+    def _is_excluded(self, dataset_dict):
+        """Checks the dataset against the exclusions in the source config, so
+        that excluded datasets never become harvest objects. The guids of the
+        excluded datasets are kept, so that the datasets that were harvested
+        before they were excluded are not deleted.
+        """
+        identifier = self._get_exclusion_identifier(dataset_dict)
+        licenses = {res.get("license") for res in dataset_dict.get("resources", [])}
+        if self._exclusion_filter.is_excluded(identifier, licenses):
+            metrics.HARVEST_EXCLUDED_DATASETS.inc(harvester=self.info()["name"])
+            log.info(f"Dataset {identifier} is excluded by the harvest source config")
+            guid = identifier or SwissDCATRDFHarvester._get_guid(self, dataset_dict)
+            if guid:
+                self._excluded_guids.add(guid)
+            return True
+        return False
+
+    def _get_exclusion_identifier(self, dataset_dict):
+        """Returns the identifier that the exclusions are matched against,
+        which is also the guid of the dataset.
+        """
+        return dataset_dict.get("identifier")
+
+    def _mark_datasets_for_deletion(self, guids_in_source, harvest_job):
+        """Keeps the datasets that are excluded from the harvest. They were
+        dropped in the gather stage, so their guids are not in the source.
+        """
+        if self._excluded_guids and self._exclusion_filter_job_id == harvest_job.id:
+            guids_in_source = list(guids_in_source) + list(self._excluded_guids)
+        return super(SwissDCATRDFHarvester, self)._mark_datasets_for_deletion(
+            guids_in_source, harvest_job
+        )
 
     def before_update(self, harvest_object, dataset_dict, temp_dict):
-        existing_pkg = map_resources_to_ids(dataset_dict, dataset_dict["name"])
+        existing_pkg = map_resources_to_ids(
+            dataset_dict,
+            dataset_dict["id"],
+            self._pop_package_snapshot(harvest_object, dataset_dict["id"]),
+        )
+        if not self._is_importing(harvest_object):
+            return
         package_changed, msg = check_package_change(existing_pkg, dataset_dict)
         if package_changed:
-            create_activity(package_id=dataset_dict["id"], message=msg)
+            self._create_change_activity(harvest_object, dataset_dict["id"], msg)
+        else:
+            metrics.HARVEST_UNCHANGED_DATASETS.inc(harvester=self.info()["name"])
+
+    def _pop_package_snapshot(self, harvest_object, package_id):
+        """Returns the snapshot of the package that was loaded with the chunk
+        of its harvest object, or None if the package has to be read again.
+        """
+        if not self._is_importing(harvest_object):
+            return None
+        guid_lookup = (self._guid_lookups or {}).get(self._import_job_id)
+        return guid_lookup.pop_snapshot(package_id) if guid_lookup else None
+
+    def _create_change_activity(self, harvest_object, package_id, message):
+        """Collects the change activity in the activity batch, which is added
+        to the import of a harvest object once it is full. The notification
+        user is looked up once per harvest job.
+        """
+        if not tk.config.get("ckan.activity_streams_enabled"):
+            return
+        if self._notification_user_id is None:
+            self._notification_user_id = get_notification_user_id()
+        if self._notification_user_id is None:
+            log.error(
+                f"User {NOTIFICATION_USER} not found, no change activity created "
+                f"for dataset {package_id}"
+            )
+            return
+        if self._activity_batch is None:
+            self._activity_batch = ActivityBatch()
+        self._activity_batch.add(
+            harvest_object.id, self._notification_user_id, package_id, message
+        )
 
     def after_download(self, content, harvest_job):
+        report = self._get_job_report(harvest_job)
+        if report and self._download_started:
+            self._parse_started = time.perf_counter()
+            report.add_time("download", self._parse_started - self._download_started)
+            report.pages += 1
+            metrics.HARVEST_PAGES.inc(harvester=self.info()["name"])
+            if content:
+                report.bytes_downloaded += len(content.encode("utf-8"))
+
         if not content:
             after_download_error_msg = (
                 f"The content of page-url {self.current_page_url} could not be read"
@@ -177,9 +543,13 @@ class SwissDCATRDFHarvester(DCATRDFHarvester):
         return content, []
 
     def after_parsing(self, rdf_parser, harvest_job):
+        report = self._get_job_report(harvest_job)
+        if report and self._parse_started:
+            report.add_time("parse", time.perf_counter() - self._parse_started)
+
         parsed_content = rdf_parser.datasets()
         dataset_identifiers = [dataset.get("identifier") for dataset in parsed_content]
-        pagination = get_pagination(rdf_parser.g)
+        pagination = dh.get_pagination(rdf_parser.g)
         log.debug(f"pagination-info: {pagination}")
         if not dataset_identifiers:
             after_parsing_error_msg = (
@@ -189,31 +559,196 @@ class SwissDCATRDFHarvester(DCATRDFHarvester):
             log.info(after_parsing_error_msg)
             return False, [after_parsing_error_msg]
         log.debug(f"datasets parsed: {','.join(dataset_identifiers)}")
+        if report:
+            rdf_parser = TimedRDFParser(rdf_parser, report.add_dataset_parse_time)
+        if self._exclusion_filter and self._exclusion_filter_job_id == harvest_job.id:
+            rdf_parser = ExcludingRDFParser(rdf_parser, self._is_excluded)
         return rdf_parser, []
 
+    def import_stage(self, harvest_object):
+        self._use_import_job(harvest_object.job)
+
+        result = super(SwissDCATRDFHarvester, self).import_stage(harvest_object)
+        if result is False:
+            harvester_name = self.info()["name"]
+            metrics.HARVEST_IMPORTED_DATASETS.inc(
+                harvester=harvester_name, result="failed"
+            )
+            metrics.HARVEST_ERRORS.inc(harvester=harvester_name, stage="import")
+        self._settle_activities(harvest_object, failed=result is False)
+        metrics.registry.maybe_persist()
+        return result
+
+    def _settle_activities(self, harvest_object, failed):
+        """Keeps track of the change activities that were committed with the
+        harvest object, and writes the remaining ones once no more objects of
+        the job are waiting, as this process will not import any of them.
+        """
+        if not self._activity_batch:
+            return
+        self._activity_batch.settle(harvest_object.id, failed=failed)
+        if self._activity_batch and self._is_job_import_done(harvest_object.job):
+            self._activity_batch.write()
+
+    def _is_job_import_done(self, harvest_job):
+        """Returns True if no objects of the harvest job are waiting to be
+        fetched and imported.
+        """
+        return not (
+            model.Session.query(HarvestObject.id)
+            .filter(HarvestObject.harvest_job_id == harvest_job.id)
+            .filter(HarvestObject.state.in_(["WAITING", "FETCH"]))
+            .first()
+        )
+
+    def _is_importing(self, harvest_object):
+        """Returns True if this harvester imports the given object. The hooks
+        of all DCAT RDF harvesters are called for every object.
+        """
+        return harvest_object.harvest_job_id == self._import_job_id
+
+    def after_create(self, harvest_object, dataset_dict, temp_dict):
+        if self._is_importing(harvest_object):
+            metrics.HARVEST_IMPORTED_DATASETS.inc(
+                harvester=self.info()["name"], result="created"
+            )
+        return None
+
+    def after_update(self, harvest_object, dataset_dict, temp_dict):
+        if self._is_importing(harvest_object):
+            metrics.HARVEST_IMPORTED_DATASETS.inc(
+                harvester=self.info()["name"], result="updated"
+            )
+        return None
+
+    def _use_import_job(self, harvest_job):
+        """Makes the harvest job of the object to import the current one. The
+        fetch workers get the objects of all jobs from the same queue, so the
+        guid lookups of the last MAX_IMPORT_JOBS jobs are kept.
+        """
+        if self._guid_lookups is None:
+            self._guid_lookups = OrderedDict()
+        if harvest_job.id in self._guid_lookups:
+            self._guid_lookups.move_to_end(harvest_job.id)
+        else:
+            self._start_import_job(harvest_job)
+        self._import_job_id = harvest_job.id
+
+    def _start_import_job(self, harvest_job):
+        """Resets the caches of the import stage for a new harvest job. The
+        guids of the objects of the job are resolved in chunks, so that
+        _read_datasets_from_db does not have to query the database for every
+        harvest object of an existing dataset. The snapshots of the existing
+        datasets of each chunk are loaded in bulk as well, for before_update.
+        """
+        self._guid_lookups[harvest_job.id] = JobGuidLookup(
+            harvest_job.id, self._read_datasets_from_db_bulk
+        )
+        while len(self._guid_lookups) > MAX_IMPORT_JOBS:
+            self._guid_lookups.popitem(last=False)
+        self._notification_user_id = None
+        clear_datetime_cache()
+
+    def _read_datasets_from_db_bulk(self, guids):
+        """Resolve many guids at once with chunked IN queries.
+
+        Returns a dict mapping every given guid to the list of matching
+        package id rows, in the same format as _read_datasets_from_db.
+        """
+        guids = list(dict.fromkeys(guid for guid in guids if guid))
+        result = {guid: [] for guid in guids}
+
+        for start in range(0, len(guids), GUID_LOOKUP_CHUNK_SIZE):
+            chunk = guids[start : start + GUID_LOOKUP_CHUNK_SIZE]
+            if tk.check_ckan_version(max_version="2.11.99"):
+                rows = (
+                    model.Session.query(model.PackageExtra.value, model.Package.id)
+                    .select_from(model.Package)
+                    .join(model.PackageExtra)
+                    .filter(model.PackageExtra.key == "identifier")
+                    .filter(model.PackageExtra.value.in_(chunk))
+                    .filter(model.Package.state == "active")
+                    .all()
+                )
+            else:
+                rows = (
+                    model.Session.query(
+                        model.Package.extras["identifier"].astext, model.Package.id
+                    )
+                    .filter(model.Package.extras["identifier"].astext.in_(chunk))
+                    .all()
+                )
+            for guid, package_id in rows:
+                result[guid].append((package_id,))
+
+        return result
+
     def _read_datasets_from_db(self, guid):
         """Overwritten from DCATHarvester as the guid disappears from package_extras
         when the dataset is updated outside the harvesting context.
 
         The guid is set to the identifier value, so we can search in this field instead.
+        The datasets that existed when the chunk of the guid was resolved are
+        looked up in the guid lookup of the current job. Any other guid is resolved
+        on its own, as another fetch worker may have created its dataset in the
+        meantime.
         """
-        if tk.check_ckan_version(max_version="2.11.99"):
-            datasets = (
-                model.Session.query(model.Package.id)
-                .join(model.PackageExtra)
-                .filter(model.PackageExtra.key == "identifier")
-                .filter(model.PackageExtra.value == guid)
-                .filter(model.Package.state == "active")
-                .all()
-            )
-        else:
-            datasets = (
-                model.Session.query(model.Package.id)
-                .filter(model.Package.extras["identifier"] == f'"{guid}"')
-                .all()
-            )
+        guid_lookup = (self._guid_lookups or {}).get(self._import_job_id)
+        rows = guid_lookup.get(guid) if guid_lookup else None
+        if rows:
+            return rows
+
+        return self._read_datasets_from_db_bulk([guid]).get(guid, [])
+
+
+def _is_dry_run(source_config):
+    if not source_config:
+        return False
+    return json.loads(source_config).get("dry_run") is True
+
+
+class ExcludingRDFParser:
+    """Wraps an RDFParser so that the datasets it returns skip the datasets
+    that are excluded from the harvest.
+    """
+
+    def __init__(self, rdf_parser, is_excluded):
+        self._rdf_parser = rdf_parser
+        self._is_excluded = is_excluded
+
+    def __getattr__(self, name):
+        return getattr(self._rdf_parser, name)
+
+    def datasets(self):
+        for dataset_dict in self._rdf_parser.datasets():
+            if not self._is_excluded(dataset_dict):
+                yield dataset_dict
 
-        return datasets
+
+class TimedRDFParser:
+    """Wraps an RDFParser to measure how long the profiles take to parse each
+    dataset it returns.
+    """
+
+    def __init__(self, rdf_parser, on_dataset):
+        self._rdf_parser = rdf_parser
+        self._on_dataset = on_dataset
+
+    def __getattr__(self, name):
+        return getattr(self._rdf_parser, name)
+
+    def datasets(self):
+        datasets = iter(self._rdf_parser.datasets())
+        while True:
+            start = time.perf_counter()
+            try:
+                dataset_dict = next(datasets)
+            except StopIteration:
+                return
+            self._on_dataset(
+                dataset_dict.get("identifier"), time.perf_counter() - start
+            )
+            yield dataset_dict
 
 
 def _derive_flat_title(title_dict):
@@ -242,19 +777,35 @@ class SwissDCATI14YRDFHarvester(SwissDCATRDFHarvester):
 
         return info
 
+    def _get_exclusion_identifier(self, dataset_dict):
+        """Excluded identifiers are configured in the form <id>@<slug>, which
+        _get_guid only sets after the exclusions have been applied.
+        """
+        identifier = dataset_dict.get("identifier")
+        if not identifier or "@" in identifier:
+            return identifier
+
+        owner_org = dataset_dict.get("owner_org")
+        if not owner_org and self.harvest_job:
+            source_dataset = model.Package.get(self.harvest_job.source.id)
+            owner_org = source_dataset.owner_org if source_dataset else None
+        org_name = (
+            self._get_organization_cache().get_name_by_id(owner_org)
+            if owner_org
+            else None
+        )
+        return f"{identifier}@{org_name}" if org_name else identifier
+
     def _get_guid(self, dataset_dict, source_url=None):
         guid = super(SwissDCATI14YRDFHarvester, self)._get_guid(
             dataset_dict, source_url
         )
 
         # get organization name
-        try:
-            dataset_organization = tk.get_action("organization_show")(
-                {}, {"id": dataset_dict["owner_org"]}
-            )
-            dataset_organization_name = dataset_organization["name"]
-
-        except tk.ObjectNotFound:
+        dataset_organization_name = self._get_organization_cache().get_name_by_id(
+            dataset_dict["owner_org"]
+        )
+        if not dataset_organization_name:
             raise ValueError("The selected organization was not found.")
 
         # identifier that has form of <id>,
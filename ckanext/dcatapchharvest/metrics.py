@@ -0,0 +1,485 @@
+"""A small metrics registry for the harvesters and RDF profiles, exported in
+the Prometheus text format.
+
+Every process keeps its metrics in memory. If
+`ckanext.dcat_ch_rdf_harvester.metrics_dir` is set, every process also writes
+its metrics to its own file in that directory from time to time, and the
+exported metrics are the sum over all files. This aggregates the metrics of
+all uwsgi and harvester worker processes, including the ones that have ended.
+
+The file of a process is named after its pid, start time and host, so a
+process that gets the pid of an ended process does not overwrite its file.
+When a process writes its file, the counters and histograms of ended
+processes on the same host are added to a single file and their gauges are
+dropped. Whether a process on another host has ended cannot be told, so the
+files of other hosts are left to the processes on those hosts. Collecting the metrics
+only reads the files.
+"""
+
+import fcntl
+import functools
+import json
+import logging
+import math
+import os
+import socket
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+
+import ckan.plugins.toolkit as tk
+
+log = logging.getLogger(__name__)
+
+METRICS_DIR_CONFIG = "ckanext.dcat_ch_rdf_harvester.metrics_dir"
+METRICS_TOKEN_CONFIG = "ckanext.dcat_ch_rdf_harvester.metrics_token"
+PERSIST_INTERVAL_SECONDS = 15
+ENDED_PROCESSES_FILE = "metrics-ended.json"
+LOCK_FILE = ".metrics.lock"
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class Metric:
+    type = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels):
+        if set(labels) != set(self.labelnames):
+            raise ValueError(
+                f"Metric {self.name} expects the labels {self.labelnames}, "
+                f"got {tuple(labels)}"
+            )
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def state(self):
+        """Returns the values of the metric in a form that can be written as
+        JSON and merged with the values of other processes.
+        """
+        with self._lock:
+            return [[list(key), value] for key, value in self._values.items()]
+
+
+class Counter(Metric):
+    type = "counter"
+
+    def inc(self, amount=1, **labels):
+        if amount < 0:
+            raise ValueError("Counters can only be increased")
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def get(self, **labels):
+        return self._values.get(self._key(labels), 0)
+
+
+class Gauge(Metric):
+    """A value that can go up and down. Values of several processes are added
+    up, so gauges should count things like jobs in progress.
+    """
+
+    type = "gauge"
+
+    def set(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount=1, **labels):
+        self.inc(-amount, **labels)
+
+    def get(self, **labels):
+        return self._values.get(self._key(labels), 0)
+
+
+class Histogram(Metric):
+    """Counts observations in buckets. The value for each set of labels is a
+    list of the (non-cumulative) bucket counts, followed by the sum and the
+    count of all observations.
+    """
+
+    type = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        index = len(self.buckets)
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                index = i
+                break
+        with self._lock:
+            values = self._values.setdefault(key, [0] * (len(self.buckets) + 3))
+            values[index] += 1
+            values[-2] += value
+            values[-1] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics = {}
+        self._last_persisted = 0.0
+        self._file_pid = None
+        self._file_name = None
+
+    def _register(self, metric):
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} is already registered")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name, documentation, labelnames=()):
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name, documentation, labelnames=()):
+        return self._register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def state(self):
+        return {name: metric.state() for name, metric in self._metrics.items()}
+
+    def persist(self, directory):
+        """Writes the metrics of this process to its own file in the given
+        directory, and merges the files of processes that have ended.
+        """
+        pid = os.getpid()
+        if self._file_pid != pid:
+            self._file_pid = pid
+            self._file_name = process_file_name(pid)
+        _write_state(directory, self._file_name, self.state())
+        with open(os.path.join(directory, LOCK_FILE), "w") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            self._merge_ended_processes(directory)
+        self._last_persisted = time.monotonic()
+
+    def maybe_persist(self, force=False):
+        """Writes the metrics of this process to the configured metrics
+        directory, at most every PERSIST_INTERVAL_SECONDS unless forced.
+        """
+        directory = tk.config.get(METRICS_DIR_CONFIG)
+        if not directory:
+            return
+        if (
+            not force
+            and time.monotonic() - self._last_persisted < PERSIST_INTERVAL_SECONDS
+        ):
+            return
+        try:
+            self.persist(directory)
+        except OSError as e:
+            log.warning(f"Could not write metrics to {directory}: {e}")
+
+    def collect(self, directory=None):
+        """Returns the state of all metrics, added up over all processes if a
+        metrics directory is given. The metrics of this process are taken from
+        memory. Nothing is written to the directory.
+        """
+        if not directory:
+            return self.state()
+
+        own_file_name = process_file_name(os.getpid())
+        merged = {name: {} for name in self._metrics}
+        for name, values in self.state().items():
+            _merge_values(merged[name], values)
+        with _shared_lock(directory):
+            for file_name in _metrics_files(directory):
+                if file_name == own_file_name:
+                    continue
+                state = _read_state(directory, file_name)
+                for name, values in state.items():
+                    if name in merged:
+                        _merge_values(merged[name], values)
+        return _as_state(merged)
+
+    def _merge_ended_processes(self, directory):
+        """Adds the counters and histograms in the files of ended processes to
+        ENDED_PROCESSES_FILE and removes their files. This keeps the number of
+        files bounded, and the gauges of processes that crashed in the middle
+        of a job are not exported forever. The lock file must be locked
+        exclusively.
+        """
+        ended_files = [
+            file_name
+            for file_name in _metrics_files(directory)
+            if file_name != ENDED_PROCESSES_FILE and _has_ended(file_name)
+        ]
+        if not ended_files:
+            return
+        merged = {}
+        for file_name in [ENDED_PROCESSES_FILE] + ended_files:
+            state = _read_state(directory, file_name)
+            for name, values in state.items():
+                metric = self._metrics.get(name)
+                if metric and metric.type != "gauge":
+                    _merge_values(merged.setdefault(name, {}), values)
+        _write_state(directory, ENDED_PROCESSES_FILE, _as_state(merged))
+        for file_name in ended_files:
+            os.remove(os.path.join(directory, file_name))
+
+    def to_text(self, directory=None):
+        """Returns the metrics in the Prometheus text exposition format."""
+        state = self.collect(directory)
+        lines = []
+        for name, metric in self._metrics.items():
+            lines.append(f"# HELP {name} {_escape_help(metric.documentation)}")
+            lines.append(f"# TYPE {name} {metric.type}")
+            for key, value in state.get(name, []):
+                labels = dict(zip(metric.labelnames, key))
+                if metric.type == "histogram":
+                    lines.extend(_histogram_lines(metric, labels, value))
+                else:
+                    lines.append(f"{name}{_format_labels(labels)} {_format(value)}")
+        return "\n".join(lines) + "\n"
+
+
+def process_file_name(pid):
+    """Returns the name of the metrics file of the process with the given pid
+    on this host. It contains the start time of the process, if it is known.
+    """
+    start_time = _process_start_time(pid)
+    host = socket.gethostname()
+    if start_time is None:
+        return f"metrics-{pid}@{host}.json"
+    return f"metrics-{pid}-{start_time}@{host}.json"
+
+
+def _process_start_time(pid):
+    """Returns the start time of the process in clock ticks after boot, or None
+    if the process is not running or there is no /proc file system.
+    """
+    try:
+        with open(f"/proc/{pid}/stat") as f:
+            stat = f.read()
+    except OSError:
+        return None
+    # The fields after the command name, which may contain spaces and
+    # parentheses, start with the third field. The start time is the 22nd.
+    return int(stat.rsplit(")", 1)[1].split()[19])
+
+
+def _has_ended(file_name):
+    """Returns True if the process on this host that wrote the metrics file has
+    ended, or its pid now belongs to another process. The processes of other
+    hosts are never considered to have ended.
+    """
+    process, _, host = file_name[len("metrics-") : -len(".json")].rpartition("@")
+    if host != socket.gethostname():
+        return False
+    pid, _, start_time = process.partition("-")
+    if not pid.isdigit():
+        return False
+    if start_time:
+        return start_time != str(_process_start_time(int(pid)))
+    try:
+        os.kill(int(pid), 0)
+    except ProcessLookupError:
+        return True
+    except PermissionError:
+        pass
+    return False
+
+
+@contextmanager
+def _shared_lock(directory):
+    """Locks the lock file of the directory for reading, so that the files of
+    ended processes are not read while they are merged. The lock file is
+    created by the processes that write their metrics.
+    """
+    try:
+        lock = open(os.path.join(directory, LOCK_FILE))
+    except FileNotFoundError:
+        yield
+        return
+    with lock:
+        fcntl.flock(lock, fcntl.LOCK_SH)
+        yield
+
+
+def _metrics_files(directory):
+    return [
+        file_name
+        for file_name in sorted(os.listdir(directory))
+        if file_name.startswith("metrics-") and file_name.endswith(".json")
+    ]
+
+
+def _read_state(directory, file_name):
+    try:
+        with open(os.path.join(directory, file_name)) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+    except (OSError, ValueError) as e:
+        log.warning(f"Could not read metrics file {file_name}: {e}")
+        return {}
+
+
+def _write_state(directory, file_name, state):
+    """Writes the state to the file. The file is replaced atomically, so
+    readers never see a partly written file.
+    """
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    with os.fdopen(fd, "w") as f:
+        json.dump(state, f)
+    os.replace(tmp_path, os.path.join(directory, file_name))
+
+
+def _as_state(merged):
+    return {
+        name: [[list(key), value] for key, value in values.items()]
+        for name, values in merged.items()
+    }
+
+
+def _merge_values(merged, values):
+    for key, value in values:
+        key = tuple(key)
+        if key not in merged:
+            merged[key] = value
+        elif isinstance(value, list):
+            merged[key] = [a + b for a, b in zip(merged[key], value)]
+        else:
+            merged[key] += value
+
+
+def _histogram_lines(metric, labels, value):
+    lines = []
+    cumulative = 0
+    for bound, count in zip(metric.buckets + (math.inf,), value[:-2]):
+        cumulative += count
+        bucket_labels = dict(labels, le="+Inf" if bound == math.inf else _format(bound))
+        lines.append(
+            f"{metric.name}_bucket{_format_labels(bucket_labels)} {cumulative}"
+        )
+    lines.append(f"{metric.name}_sum{_format_labels(labels)} {_format(value[-2])}")
+    lines.append(f"{metric.name}_count{_format_labels(labels)} {value[-1]}")
+    return lines
+
+
+def _format_labels(labels):
+    if not labels:
+        return ""
+    pairs = ",".join(
+        f'{name}="{_escape_label_value(value)}"' for name, value in labels.items()
+    )
+    return "{" + pairs + "}"
+
+
+def _escape_label_value(value):
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _escape_help(text):
+    return text.replace("\\", "\\\\").replace("\n", "\\n")
+
+
+def _format(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def timed(histogram, **labels):
+    """Decorator that observes the run time of the function in the given
+    histogram.
+    """
+
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with histogram.time(**labels):
+                result = func(*args, **kwargs)
+            registry.maybe_persist()
+            return result
+
+        return wrapper
+
+    return decorator
+
+
+registry = MetricsRegistry()
+
+HARVEST_PAGES = registry.counter(
+    "dcatapch_harvest_pages_total",
+    "Catalog pages downloaded by the gather stage.",
+    ["harvester"],
+)
+HARVEST_DATASETS = registry.counter(
+    "dcatapch_harvest_datasets_total",
+    "Datasets parsed by the gather stage.",
+    ["harvester"],
+)
+HARVEST_EXCLUDED_DATASETS = registry.counter(
+    "dcatapch_harvest_excluded_datasets_total",
+    "Datasets excluded by the harvest source config.",
+    ["harvester"],
+)
+HARVEST_IMPORTED_DATASETS = registry.counter(
+    "dcatapch_harvest_imported_datasets_total",
+    "Datasets processed by the import stage, by result (created, updated, failed).",
+    ["harvester", "result"],
+)
+HARVEST_UNCHANGED_DATASETS = registry.counter(
+    "dcatapch_harvest_unchanged_datasets_total",
+    "Updated datasets without changes to their url, modified date or resources.",
+    ["harvester"],
+)
+HARVEST_ERRORS = registry.counter(
+    "dcatapch_harvest_errors_total",
+    "Gather errors and failed imports.",
+    ["harvester", "stage"],
+)
+HARVEST_JOBS_IN_PROGRESS = registry.gauge(
+    "dcatapch_harvest_gather_jobs_in_progress",
+    "Harvest jobs in the gather stage.",
+    ["harvester"],
+)
+PROFILE_PARSE_SECONDS = registry.histogram(
+    "dcatapch_profile_parse_seconds",
+    "Time taken to parse one dataset from RDF.",
+    ["profile"],
+)
+PROFILE_SERIALIZE_SECONDS = registry.histogram(
+    "dcatapch_profile_serialize_seconds",
+    "Time taken to add the triples of one dataset to the graph.",
+    ["profile"],
+)
+VOCABULARY_LOOKUPS = registry.counter(
+    "dcatapch_vocabulary_lookups_total",
+    "Lookups of harvested values in the vocabularies, by result (hit, miss).",
+    ["result"],
+)
+GRAPH_CACHE_LOOKUPS = registry.counter(
+    "dcatapch_graph_cache_lookups_total",
+    "Lookups of the triples of a dataset in the graph cache, by result (hit, miss).",
+    ["result"],
+)
+IRI_CONVERSIONS = registry.counter(
+    "dcatapch_iri_conversions_total",
+    "URIs converted to IRIs that were not cached yet, by result (valid, invalid).",
+    ["result"],
+)
@@ -1,12 +1,15 @@
 import os
 
+import ckan.plugins as p
+
 from ckanext.dcat.plugins import DCATPlugin
+from ckanext.dcatapchharvest import blueprints, cli
 
 __location__ = os.path.realpath(os.path.join(os.getcwd(), os.path.dirname(__file__)))
 
 
 class OgdchDcatPlugin(DCATPlugin):
-    pass
+    p.implements(p.IClick)
 
     def after_show(self, context, data_dict):
         """
@@ -14,3 +17,11 @@ class OgdchDcatPlugin(DCATPlugin):
         destroyed our custom theme
         """
         pass
+
+    def get_blueprint(self):
+        return super(OgdchDcatPlugin, self).get_blueprint() + [blueprints.metrics]
+
+    # IClick
+
+    def get_commands(self):
+        return super(OgdchDcatPlugin, self).get_commands() + cli.get_commands()
@@ -1,6 +1,7 @@
 import json
 import logging
 import re
+import weakref
 from datetime import datetime, timedelta
 
 import isodate
@@ -10,7 +11,10 @@ from rdflib import BNode, Literal, URIRef
 from rdflib.namespace import RDF, RDFS, SKOS, Namespace
 
 import ckanext.dcatapchharvest.dcat_helpers as dh
+import ckanext.dcatapchharvest.metrics as metrics
 from ckanext.dcat.profiles import CleanedURIRef, RDFProfile, SchemaOrgProfile
+from ckanext.dcatapchharvest.graph_cache import cached_graph
+from ckanext.dcatapchharvest.triple_batch import batched_triples, graph_of
 
 log = logging.getLogger(__name__)
 license_handler = dh.LicenseHandler()
@@ -65,6 +69,48 @@ EUTHEMES_URI = "http://publications.europa.eu/resource/authority/data-theme/"
 
 slug_id_pattern = re.compile("[^/]+(?=/$|$)")
 
+# The predicate and the type of the license of each license property
+LICENSE_PROPERTIES = {
+    "rights": (DCT.rights, DCT.RightsStatement),
+    "license": (DCT.license, DCT.LicenseDocument),
+}
+
+# The vocabulary terms that the serializers add to the graph are built once,
+# so that every dataset uses the same URIRef objects
+COMPLETELY_IRREGULAR = URIRef("http://purl.org/cld/freq/completelyIrregular")
+exported_frequencies = {
+    str(ref): ref
+    for ref in valid_frequencies.values()
+    if ref is not None and ref != COMPLETELY_IRREGULAR
+}
+exported_frequencies.update((str(ref), ref) for ref in valid_frequencies)
+
+eu_theme_refs = {
+    ref[len(EUTHEMES_URI) :]: ref
+    for refs in eu_theme_mapping.values()
+    for ref in refs
+    if ref.startswith(EUTHEMES_URI)
+}
+
+# The graphs that each profile has bound its namespaces to, by id
+_graphs_with_namespaces = {
+    "swiss_dcat_ap": weakref.WeakValueDictionary(),
+    "swiss_schemaorg": weakref.WeakValueDictionary(),
+}
+
+
+def _needs_namespaces(g, profile_name):
+    """Returns True the first time it is called for a graph and profile.
+    Binding the namespaces once per graph instead of once per dataset saves
+    time when serializing a catalog.
+    """
+    g = graph_of(g)
+    graphs = _graphs_with_namespaces[profile_name]
+    if graphs.get(id(g)) is g:
+        return False
+    graphs[id(g)] = g
+    return True
+
 
 class MultiLangProfile(RDFProfile):
     def _add_multilang_value(
@@ -302,7 +348,9 @@ class SwissDCATAPProfile(MultiLangProfile):
             format_key = self._munge_format(format_value)
             media_type_key = self._munge_media_type(format_value)
 
-            if format_key in valid_formats or media_type_key in valid_media_types:
+            if dh.vocabulary_lookups.record(
+                format_key in valid_formats or media_type_key in valid_media_types
+            ):
                 return format_key
 
     def _get_iana_media_type(self, subject):
@@ -311,7 +359,7 @@ class SwissDCATAPProfile(MultiLangProfile):
             log.debug("The media type object is a dictionary type.")
         else:
             media_type_key = self._munge_media_type(media_type_value_raw)
-            if media_type_key in valid_media_types:
+            if dh.vocabulary_lookups.record(media_type_key in valid_media_types):
                 return media_type_key
 
     def _license_rights_homepage_uri(self, subject, predicate):
@@ -327,13 +375,17 @@ class SwissDCATAPProfile(MultiLangProfile):
             if isinstance(node, Literal):
                 uri = license_handler.get_license_homepage_uri_by_name(node)
                 if uri:
-                    return uri
+                    return dh.vocabulary_lookups.record(uri)
 
                 # Handle case where data provider gives the license URI as a Literal,
                 # not as the URIRef
-                return license_handler.get_license_homepage_uri_by_uri(node)
+                return dh.vocabulary_lookups.record(
+                    license_handler.get_license_homepage_uri_by_uri(node)
+                )
             if isinstance(node, URIRef):
-                return license_handler.get_license_homepage_uri_by_uri(node)
+                return dh.vocabulary_lookups.record(
+                    license_handler.get_license_homepage_uri_by_uri(node)
+                )
         return None
 
     def _keywords(self, subject):
@@ -497,11 +549,14 @@ class SwissDCATAPProfile(MultiLangProfile):
         for key, value in list(valid_frequencies.items()):
             if ogdch_value == value:
                 ogdch_value = key
+                dh.vocabulary_lookups.record(True)
                 return ogdch_value
             elif ogdch_value == key:
                 log.info("EU frequencies are already used.")
+                dh.vocabulary_lookups.record(True)
                 return ogdch_value
 
+        dh.vocabulary_lookups.record(False)
         log.info(
             f"There is no such frequency as '{ogdch_value}' in the official list of "
             f"frequencies"
@@ -567,12 +622,13 @@ class SwissDCATAPProfile(MultiLangProfile):
         languages = self._object_value_list(subject, DCT.language)
         for lang in languages:
             for code, uri in language_uri_map.items():
-                if lang == code or lang == uri:
+                if lang == code or lang == str(uri):
                     results.append(code)
                     break
 
         return results
 
+    @metrics.timed(metrics.PROFILE_PARSE_SECONDS, profile="swiss_dcat_ap")
     def parse_dataset(self, dataset_dict, dataset_ref):  # noqa C901
         # TODO: This method is too complex (flake8 says 30). Refactor it!
         log.debug(f"Parsing dataset '{dataset_ref!r}'")
@@ -789,6 +845,9 @@ class SwissDCATAPProfile(MultiLangProfile):
 
         return dataset_dict
 
+    @metrics.timed(metrics.PROFILE_SERIALIZE_SECONDS, profile="swiss_dcat_ap")
+    @cached_graph("swiss_dcat_ap")
+    @batched_triples
     def graph_from_dataset(self, dataset_dict, dataset_ref):  # noqa C901
         # TODO: This method is too complex (flake8 says 33). Refactor it!
 
@@ -799,8 +858,7 @@ class SwissDCATAPProfile(MultiLangProfile):
 
         g = self.g
 
-        for prefix, namespace in namespaces.items():
-            g.bind(prefix, namespace)
+        self._bind_namespaces()
 
         g.add((dataset_ref, RDF.type, DCAT.Dataset))
 
@@ -863,7 +921,7 @@ class SwissDCATAPProfile(MultiLangProfile):
         for lang in languages:
             uri = language_uri_map.get(lang, None)
             if uri:
-                g.add((dataset_ref, DCT.language, URIRef(uri)))
+                g.add((dataset_ref, DCT.language, uri))
             else:
                 log.debug(f"Language '{lang}' not found in language_uri_map")
 
@@ -966,7 +1024,9 @@ class SwissDCATAPProfile(MultiLangProfile):
         groups = self._get_dataset_value(dataset_dict, "groups", [])
         for group_name in groups:
             eu_theme_slug = group_name.get("name").upper()
-            eu_theme_ref = URIRef(EUTHEMES_URI + eu_theme_slug)
+            eu_theme_ref = eu_theme_refs.get(eu_theme_slug) or URIRef(
+                EUTHEMES_URI + eu_theme_slug
+            )
             g.add(
                 (
                     dataset_ref,
@@ -1010,7 +1070,7 @@ class SwissDCATAPProfile(MultiLangProfile):
         for lang in languages:
             uri = language_uri_map.get(lang)
             if uri:
-                g.add((distribution, DCT.language, URIRef(uri)))
+                g.add((distribution, DCT.language, uri))
 
         # Download URL & Access URL
         self._map_resource_urls(distribution, g, resource_dict)
@@ -1072,38 +1132,18 @@ class SwissDCATAPProfile(MultiLangProfile):
         elif download_url:
             g.add((distribution, DCAT.accessURL, URIRef(download_url)))
 
-    def _get_rights_and_license_uri(self, resource_dict, property="license"):
-        if property not in ["license", "rights"]:
-            raise ValueError("Property must be 'license' or 'rights'")
-
-        homepage_uri = resource_dict.get(property)
-        if not homepage_uri:
-            return None
-
-        uri = license_handler.get_license_ref_uri_by_homepage_uri(homepage_uri)
-        if uri is not None:
-            return URIRef(uri)
-
-        name = license_handler.get_license_name_by_homepage_uri(homepage_uri)
-        if name is not None:
-            uri = license_handler.get_license_ref_uri_by_name(name)
-            if uri is not None:
-                return URIRef(uri)
-
-        return None
-
     def _rights_and_license_to_graph(self, resource_dict, distribution):
         g = self.g
+        license_refs = license_handler.get_license_refs_by_homepage_uri()
 
-        rights_uri_ref = self._get_rights_and_license_uri(resource_dict, "rights")
-        if rights_uri_ref is not None:
-            g.add((rights_uri_ref, RDF.type, DCT.RightsStatement))
-            g.add((distribution, DCT.rights, rights_uri_ref))
-
-        license_uri_ref = self._get_rights_and_license_uri(resource_dict, "license")
-        if license_uri_ref is not None:
-            g.add((license_uri_ref, RDF.type, DCT.LicenseDocument))
-            g.add((distribution, DCT.license, license_uri_ref))
+        for property, (predicate, rdf_type) in LICENSE_PROPERTIES.items():
+            homepage_uri = resource_dict.get(property)
+            if not homepage_uri:
+                continue
+            license_ref = license_refs.get(str(homepage_uri))
+            if license_ref is not None:
+                g.add((license_ref, RDF.type, rdf_type))
+                g.add((distribution, predicate, license_ref))
 
     def _format_and_media_type_to_graph(self, resource_dict, distribution):
         g = self.g
@@ -1114,13 +1154,13 @@ class SwissDCATAPProfile(MultiLangProfile):
             format_key = self._munge_format(resource_dict.get("format"))
             media_type_key = self._munge_media_type(resource_dict.get("format"))
             if format_key in valid_formats:
-                g.add((distribution, DCT["format"], URIRef(valid_formats[format_key])))
+                g.add((distribution, DCT["format"], valid_formats[format_key]))
             elif media_type_key in valid_media_types:
                 g.add(
                     (
                         distribution,
                         DCT["format"],
-                        URIRef(valid_media_types[media_type_key]),
+                        valid_media_types[media_type_key],
                     )
                 )
 
@@ -1132,25 +1172,24 @@ class SwissDCATAPProfile(MultiLangProfile):
                     (
                         distribution,
                         DCAT.mediaType,
-                        URIRef(valid_media_types[media_type]),
+                        valid_media_types[media_type],
                     )
                 )
 
+    def _bind_namespaces(self):
+        if _needs_namespaces(self.g, "swiss_dcat_ap"):
+            for prefix, namespace in namespaces.items():
+                self.g.bind(prefix, namespace)
+
     def graph_from_catalog(self, catalog_dict, catalog_ref):
         g = self.g
+        self._bind_namespaces()
         g.add((catalog_ref, RDF.type, DCAT.Catalog))
 
     def _accrual_periodicity_to_graph(self, dataset_ref, accrual_periodicity):
-        g = self.g
-        old_valid_frequencies = [
-            i
-            for i in list(valid_frequencies.values())
-            if i != URIRef("http://purl.org/cld/freq/completelyIrregular")
-        ]
-        if URIRef(accrual_periodicity) in old_valid_frequencies + list(
-            valid_frequencies.keys()
-        ):
-            g.add((dataset_ref, DCT.accrualPeriodicity, URIRef(accrual_periodicity)))
+        accrual_periodicity_ref = exported_frequencies.get(accrual_periodicity)
+        if accrual_periodicity_ref is not None:
+            self.g.add((dataset_ref, DCT.accrualPeriodicity, accrual_periodicity_ref))
 
     def _publisher_to_graph(self, dataset_ref, dataset_dict):
         """Supporting both FOAF.Agent (with multilingual names)
@@ -1183,6 +1222,10 @@ class SwissDCATAPProfile(MultiLangProfile):
 
 
 class SwissSchemaOrgProfile(SchemaOrgProfile, MultiLangProfile):
+    def _bind_namespaces(self):
+        if _needs_namespaces(self.g, "swiss_schemaorg"):
+            super(SwissSchemaOrgProfile, self)._bind_namespaces()
+
     def _basic_fields_graph(self, dataset_ref, dataset_dict):
         items = [
             ("identifier", SCHEMA.identifier, None, Literal),
@@ -1283,11 +1326,9 @@ class SwissSchemaOrgProfile(SchemaOrgProfile, MultiLangProfile):
                 self._add_date_triple(dataset_ref, SCHEMA.temporalCoverage, end)
 
     def _tags_graph(self, dataset_ref, dataset_dict):
-        for tag in dataset_dict.get("keywords", []):
-            items = [
-                ("keywords", SCHEMA.keywords, None, Literal),
-            ]
-            self._add_multilang_triples_from_dict(dataset_dict, dataset_ref, items)
+        self._add_multilang_value(
+            dataset_ref, SCHEMA.keywords, "keywords", dataset_dict
+        )
 
     def _distribution_basic_fields_graph(self, distribution, resource_dict):
         items = [
@@ -1346,6 +1387,8 @@ class SwissSchemaOrgProfile(SchemaOrgProfile, MultiLangProfile):
 
         return g
 
+    @metrics.timed(metrics.PROFILE_SERIALIZE_SECONDS, profile="swiss_schemaorg")
+    @batched_triples
     def graph_from_dataset(self, dataset_dict, dataset_ref):
         dataset_uri = dh.dataset_uri(dataset_dict, dataset_ref)
         dataset_ref = URIRef(dataset_uri)
@@ -1387,7 +1430,7 @@ class SwissSchemaOrgProfile(SchemaOrgProfile, MultiLangProfile):
                 else:
                     uri = language_uri_map.get(lang, None)
                     if uri:
-                        g.add((distribution, DCT.language, URIRef(uri)))
+                        g.add((distribution, DCT.language, uri))
                     else:
                         log.debug(f"Language '{lang}' not found in language_uri_map")
 
@@ -1409,5 +1452,6 @@ class SwissSchemaOrgProfile(SchemaOrgProfile, MultiLangProfile):
 
         super(SwissSchemaOrgProfile, self).graph_from_dataset(dataset_dict, dataset_ref)
 
+    @metrics.timed(metrics.PROFILE_PARSE_SECONDS, profile="swiss_schemaorg")
     def parse_dataset(self, dataset_dict, dataset_ref):
         super(SwissSchemaOrgProfile, self).parse_dataset(dataset_dict, dataset_ref)
@@ -0,0 +1,67 @@
+import copy
+import json
+import os
+import time
+
+from rdflib import ConjunctiveGraph
+
+from ckanext.dcat.processors import RDFSerializer
+from ckanext.dcatapchharvest.profiles import namespaces
+from ckanext.dcatapchharvest.tests.benchmarks import benchmark
+
+pytestmark = benchmark
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), "..", "fixtures")
+DATASET_COUNT = 200
+
+# Generous upper bound: serializing a dataset of the fixture takes a few
+# milliseconds
+MAX_MS_PER_DATASET = 50
+
+
+def _datasets(count):
+    with open(os.path.join(FIXTURES_DIR, "dataset.json")) as f:
+        dataset = json.load(f)
+    datasets = []
+    for i in range(count):
+        dataset_dict = copy.deepcopy(dataset)
+        dataset_dict["id"] = f"dataset-{i}"
+        dataset_dict["name"] = f"dataset-{i}"
+        dataset_dict["identifier"] = f"dataset-{i}@bundesamt-fur-statistik-bfs"
+        datasets.append(dataset_dict)
+    return datasets
+
+
+def _binding_ms_per_dataset():
+    g = ConjunctiveGraph()
+    start = time.perf_counter()
+    for _ in range(DATASET_COUNT):
+        for prefix, namespace in namespaces.items():
+            g.bind(prefix, namespace)
+    return (time.perf_counter() - start) * 1000 / DATASET_COUNT
+
+
+class TestCatalogSerializationBenchmark(object):
+    def test_catalog_serialization(self):
+        datasets = _datasets(DATASET_COUNT)
+        serializer = RDFSerializer(profiles=["swiss_dcat_ap"])
+
+        start = time.perf_counter()
+        catalog_ref = serializer.graph_from_catalog({})
+        for dataset_dict in datasets:
+            serializer.graph_from_dataset(dataset_dict)
+        graph_ms = (time.perf_counter() - start) * 1000
+
+        start = time.perf_counter()
+        serializer.g.serialize(format="turtle")
+        serialize_ms = (time.perf_counter() - start) * 1000
+
+        print(
+            f"catalog serialization of {DATASET_COUNT} datasets: "
+            f"{graph_ms / DATASET_COUNT:.2f} ms per dataset to build the graph, "
+            f"{serialize_ms / DATASET_COUNT:.2f} ms per dataset to serialize it, "
+            f"binding the namespaces for every dataset would add "
+            f"{_binding_ms_per_dataset():.3f} ms per dataset"
+        )
+        assert catalog_ref
+        assert graph_ms / DATASET_COUNT < MAX_MS_PER_DATASET
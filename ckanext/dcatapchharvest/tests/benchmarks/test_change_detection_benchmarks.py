@@ -0,0 +1,130 @@
+import copy
+import json
+import os
+import time
+
+import pytest
+
+from ckanext.dcatapchharvest.harvest_helper import (
+    check_package_change,
+    clear_datetime_cache,
+    reuse_resource_ids,
+)
+from ckanext.dcatapchharvest.tests.benchmarks import benchmark
+
+pytestmark = benchmark
+
+BASELINE_FILE = os.path.join(
+    os.path.dirname(__file__), "change_detection_baseline.json"
+)
+# Set this environment variable to write the measured timings to the baseline
+# file instead of comparing them with it
+UPDATE_BASELINE_VARIABLE = "DCATAPCH_UPDATE_BENCHMARK_BASELINE"
+
+SIZES = [1, 100, 1000, 5000]
+PATTERNS = ["none", "date_only", "url_reorder", "additions"]
+REPEATS = 3
+
+# Timings vary a lot between machines, so a case only fails if it is much
+# slower than its baseline. This still catches a change from linear to
+# quadratic time.
+MAX_SLOWDOWN_FACTOR = 10
+MIN_ALLOWED_MS = 50
+
+_results = {}
+
+
+def _resource(i, modified="2024-01-01T00:00:00+01:00"):
+    return {
+        "url": f"http://example.org/dataset/resource-{i}",
+        "download_url": f"http://example.org/dataset/resource-{i}.csv",
+        "modified": modified,
+    }
+
+
+def _existing_package(size):
+    resources = []
+    for i in range(size):
+        resource = _resource(i)
+        resource["id"] = f"id-{i}"
+        resources.append(resource)
+    return {
+        "url": "http://example.org/dataset",
+        "modified": "2024-01-01T00:00:00+01:00",
+        "resources": resources,
+    }
+
+
+def _harvested_package(size, pattern):
+    resources = [_resource(i) for i in range(size)]
+    modified = "2024-01-01T00:00:00+01:00"
+    if pattern == "date_only":
+        modified = "2024-02-01T00:00:00+01:00"
+        resources = [_resource(i, modified=modified) for i in range(size)]
+    elif pattern == "url_reorder":
+        resources.reverse()
+    elif pattern == "additions":
+        resources.extend(_resource(size + i) for i in range(max(1, size // 10)))
+    return {
+        "url": "http://example.org/dataset",
+        "modified": modified,
+        "resources": resources,
+    }
+
+
+def _detect_changes(existing_pkg, dataset_dict):
+    reuse_resource_ids(dataset_dict["resources"], existing_pkg["resources"])
+    return check_package_change(existing_pkg, dataset_dict)
+
+
+def _measure(size, pattern):
+    """Returns the fastest of several runs in milliseconds, and the result of
+    the change detection.
+    """
+    existing_pkg = _existing_package(size)
+    harvested_pkg = _harvested_package(size, pattern)
+    timings = []
+    for _ in range(REPEATS):
+        dataset_dict = copy.deepcopy(harvested_pkg)
+        clear_datetime_cache()
+        start = time.perf_counter()
+        result = _detect_changes(existing_pkg, dataset_dict)
+        timings.append((time.perf_counter() - start) * 1000)
+    return min(timings), result
+
+
+def _load_baseline():
+    if not os.path.exists(BASELINE_FILE):
+        return {}
+    with open(BASELINE_FILE) as f:
+        return json.load(f)
+
+
+@pytest.fixture(scope="module", autouse=True)
+def baseline_file():
+    yield
+    if os.environ.get(UPDATE_BASELINE_VARIABLE):
+        with open(BASELINE_FILE, "w") as f:
+            json.dump(_results, f, indent=2, sort_keys=True)
+            f.write("\n")
+
+
+class TestChangeDetectionBenchmark(object):
+    @pytest.mark.parametrize("pattern", PATTERNS)
+    @pytest.mark.parametrize("size", SIZES)
+    def test_change_detection(self, size, pattern):
+        duration_ms, (package_changed, msg) = _measure(size, pattern)
+        case = f"{pattern}-{size}"
+        _results[case] = round(duration_ms, 3)
+        print(f"change detection {case}: {duration_ms:.3f} ms")
+
+        assert package_changed == (pattern in ["date_only", "additions"])
+        if pattern == "additions":
+            assert msg.startswith(
+                f"resource count changed: {size + max(1, size // 10)}"
+            )
+
+        baseline_ms = _load_baseline().get(case)
+        if baseline_ms is None or os.environ.get(UPDATE_BASELINE_VARIABLE):
+            return
+        assert duration_ms < max(baseline_ms * MAX_SLOWDOWN_FACTOR, MIN_ALLOWED_MS)
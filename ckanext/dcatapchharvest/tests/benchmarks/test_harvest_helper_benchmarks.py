@@ -0,0 +1,35 @@
+import time
+
+from ckanext.dcatapchharvest.harvest_helper import reuse_resource_ids
+from ckanext.dcatapchharvest.tests.benchmarks import benchmark
+
+pytestmark = benchmark
+
+# Generous upper bound: the quadratic implementation needed several seconds
+# for 5000 resources, the linear one needs a few milliseconds.
+MAX_SECONDS_5K_RESOURCES = 1.0
+
+
+def _resources(count, with_ids=False):
+    resources = []
+    for i in range(count):
+        resource = {"url": f"http://example.org/dataset/resource-{i}.csv"}
+        if with_ids:
+            resource["id"] = f"id-{i}"
+        resources.append(resource)
+    return resources
+
+
+class TestReuseResourceIdsBenchmark(object):
+    def test_reuse_resource_ids_5k_resources(self):
+        existing_resources = _resources(5000, with_ids=True)
+        resources = list(reversed(_resources(5000)))
+
+        start = time.perf_counter()
+        reuse_resource_ids(resources, existing_resources)
+        duration = time.perf_counter() - start
+
+        print(f"reuse_resource_ids with 5000 resources: {duration * 1000:.1f} ms")
+        assert resources[0]["id"] == "id-4999"
+        assert resources[-1]["id"] == "id-0"
+        assert duration < MAX_SECONDS_5K_RESOURCES
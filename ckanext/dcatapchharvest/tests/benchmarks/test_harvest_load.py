@@ -0,0 +1,132 @@
+import os
+import resource
+import time
+
+import ckan.model as model
+import ckan.plugins as p
+import pytest
+import requests
+
+from ckanext.dcat.processors import RDFParser
+from ckanext.dcatapchharvest.tests.benchmarks import benchmark
+from ckanext.dcatapchharvest.tests.catalog_server import (
+    CatalogServer,
+    SyntheticCatalog,
+)
+from ckanext.harvest.model import HarvestJob, HarvestObject, HarvestSource
+
+# The load test only runs if DCATAPCH_BENCHMARKS is set. The defaults keep it
+# fast, set these environment variables to run it at a realistic scale, e.g.
+# 120 pages of 100 datasets.
+PAGES = int(os.environ.get("DCATAPCH_LOAD_TEST_PAGES", 3))
+DATASETS_PER_PAGE = int(os.environ.get("DCATAPCH_LOAD_TEST_DATASETS_PER_PAGE", 20))
+LATENCY = float(os.environ.get("DCATAPCH_LOAD_TEST_LATENCY", 0))
+ORGANIZATION = "bundesamt-fur-statistik-bfs"
+
+
+def _peak_rss_mb():
+    # ru_maxrss is in kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _create_harvest_source(url):
+    org = model.Group(name=ORGANIZATION, is_organization=True, type="organization")
+    model.Session.add(org)
+    model.Session.flush()
+    source_dataset = model.Package(
+        name="load-test-source", type="harvest", url=url, owner_org=org.id
+    )
+    model.Session.add(source_dataset)
+    model.Session.flush()
+    harvest_source = HarvestSource(id=source_dataset.id, url=url, type="dcat_ch_rdf")
+    model.Session.add(harvest_source)
+    model.Session.commit()
+    return harvest_source
+
+
+@benchmark
+@pytest.mark.ckan_config("ckan.plugins", "harvest dcat_ch_rdf_harvester")
+class TestHarvestLoad(object):
+    @pytest.fixture(autouse=True)
+    def harvest_tables(self, with_plugins, clean_db, clean_index, migrate_db_for):
+        migrate_db_for("harvest")
+
+    def test_gather_and_import(self):
+        catalog = SyntheticCatalog(PAGES, DATASETS_PER_PAGE)
+        harvester = p.get_plugin("dcat_ch_rdf_harvester")
+
+        with CatalogServer(catalog, latency=LATENCY) as server:
+            harvest_job = HarvestJob(source=_create_harvest_source(server.url))
+            harvest_job.save()
+
+            start = time.perf_counter()
+            object_ids = harvester.gather_stage(harvest_job)
+            gather_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        imported = 0
+        for object_id in object_ids:
+            harvest_object = HarvestObject.get(object_id)
+            harvest_object.state = "IMPORT"
+            harvest_object.save()
+            if harvester.import_stage(harvest_object):
+                imported += 1
+        import_seconds = time.perf_counter() - start
+
+        print(
+            f"Harvested {catalog.dataset_count} datasets on {catalog.pages} pages "
+            f"({server.bytes_sent} bytes): gather {gather_seconds:.2f}s "
+            f"({catalog.dataset_count / gather_seconds:.1f} datasets/s), "
+            f"import {import_seconds:.2f}s "
+            f"({imported / import_seconds:.1f} datasets/s, "
+            f"{len(object_ids) - imported} failed), "
+            f"peak RSS {_peak_rss_mb():.0f} MB"
+        )
+        assert server.requests == catalog.pages
+        assert len(object_ids) == catalog.dataset_count
+        # Without the dataset schema of ckanext-switzerland, the datasets with
+        # all fields of catalog.xml do not pass validation
+        assert imported > 0
+        assert (
+            model.Session.query(model.Package)
+            .filter(model.Package.type == "dataset")
+            .count()
+            == imported
+        )
+
+
+class TestCatalogServer(object):
+    def test_pages(self):
+        catalog = SyntheticCatalog(3, 8)
+        identifiers = set()
+        with CatalogServer(catalog) as server:
+            next_page_url = server.url
+            while next_page_url:
+                parser = RDFParser(profiles=["swiss_dcat_ap"])
+                parser.parse(requests.get(next_page_url).text)
+                identifiers.update(d["identifier"] for d in parser.datasets())
+                next_page_url = parser.next_page()
+
+        assert identifiers == {catalog.identifier(i) for i in range(24)}
+
+    def test_conditional_requests(self):
+        with CatalogServer(SyntheticCatalog(1, 2)) as server:
+            response = requests.get(server.url)
+            etag_response = requests.get(
+                server.url, headers={"If-None-Match": response.headers["ETag"]}
+            )
+            date_response = requests.get(
+                server.url,
+                headers={"If-Modified-Since": response.headers["Last-Modified"]},
+            )
+
+        assert response.status_code == 200
+        assert etag_response.status_code == 304
+        assert date_response.status_code == 304
+
+    def test_errors(self):
+        with CatalogServer(SyntheticCatalog(1, 2), error_rate=1.0) as server:
+            response = requests.get(server.url)
+
+        assert response.status_code == 503
+        assert server.errors == 1
@@ -0,0 +1,82 @@
+import os
+import time
+
+from rdflib import Graph, URIRef
+
+from ckanext.dcatapchharvest.profiles import (
+    DCT,
+    SwissDCATAPProfile,
+    license_handler,
+)
+from ckanext.dcatapchharvest.tests.benchmarks import benchmark
+
+pytestmark = benchmark
+
+DISTRIBUTIONS = int(os.environ.get("DCATAPCH_BENCHMARK_DISTRIBUTIONS", 50000))
+# Generous upper bound for the license export of 50000 distributions, which
+# takes about 3 s, nearly all of it for adding the triples to the graph
+MAX_SECONDS_50K_DISTRIBUTIONS = 15.0
+
+
+def _lookup_license_ref(homepage_uri):
+    """The lookups done for every license and rights value before the
+    license refs were precomputed.
+    """
+    uri = license_handler.get_license_ref_uri_by_homepage_uri(homepage_uri)
+    if uri is not None:
+        return URIRef(uri)
+    name = license_handler.get_license_name_by_homepage_uri(homepage_uri)
+    if name is not None:
+        uri = license_handler.get_license_ref_uri_by_name(name)
+        if uri is not None:
+            return URIRef(uri)
+    return None
+
+
+def _resources(count):
+    homepage_uris = sorted(license_handler.get_license_refs_by_homepage_uri())
+    # Values that are not license homepages are not exported
+    homepage_uris.append("http://dcat-ap.ch/vocabulary/licenses/terms_by")
+    return [
+        {
+            "rights": homepage_uris[i % len(homepage_uris)],
+            "license": homepage_uris[(i + 1) % len(homepage_uris)],
+        }
+        for i in range(count)
+    ]
+
+
+class TestLicenseExportBenchmark(object):
+    def test_license_export_50k_distributions(self):
+        resources = _resources(DISTRIBUTIONS)
+        profile = SwissDCATAPProfile(Graph())
+
+        start = time.perf_counter()
+        for resource_dict in resources:
+            for property in ["rights", "license"]:
+                _lookup_license_ref(resource_dict[property])
+        lookup_seconds = time.perf_counter() - start
+
+        license_refs = license_handler.get_license_refs_by_homepage_uri()
+        start = time.perf_counter()
+        for resource_dict in resources:
+            for property in ["rights", "license"]:
+                license_refs.get(resource_dict[property])
+        table_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for i, resource_dict in enumerate(resources):
+            profile._rights_and_license_to_graph(
+                resource_dict, URIRef(f"https://example.org/distribution/{i}")
+            )
+        export_seconds = time.perf_counter() - start
+
+        print(
+            f"license export of {DISTRIBUTIONS} distributions: lookups "
+            f"{lookup_seconds * 1000:.0f} ms before, {table_seconds * 1000:.0f} ms "
+            f"with the precomputed table, export to the graph "
+            f"{export_seconds * 1000:.0f} ms"
+        )
+        assert len(list(profile.g.triples((None, DCT.license, None)))) > 0
+        assert table_seconds < lookup_seconds
+        assert export_seconds < MAX_SECONDS_50K_DISTRIBUTIONS
@@ -0,0 +1,63 @@
+import glob
+import os
+import re
+import time
+
+from ckanext.dcatapchharvest import dcat_helpers as dh
+from ckanext.dcatapchharvest.tests.benchmarks import benchmark
+
+pytestmark = benchmark
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), "..", "fixtures")
+URL_PATTERN = re.compile(r"https?://[^\s\"'<>]+")
+# Every URL is serialized this many times, like a catalog whose datasets
+# share landing pages and whose RDF endpoints are requested repeatedly
+REPETITIONS = 20
+
+
+def _fixture_urls():
+    urls = set()
+    for path in glob.glob(os.path.join(FIXTURES_DIR, "**", "*"), recursive=True):
+        if os.path.isfile(path):
+            with open(path, encoding="utf-8") as f:
+                urls.update(URL_PATTERN.findall(f.read()))
+    return sorted(urls)
+
+
+def _convert_all(convert, urls):
+    start = time.perf_counter()
+    for _ in range(REPETITIONS):
+        for url in urls:
+            try:
+                convert(url)
+            except ValueError:
+                pass
+    return time.perf_counter() - start
+
+
+def _uncached_uri_to_iri(uri):
+    iri, error = dh._convert_uri_to_iri.__wrapped__(uri)
+    if error:
+        raise ValueError(error)
+    return iri
+
+
+class TestUriToIriBenchmark(object):
+    def test_uri_to_iri_fixture_urls(self):
+        urls = _fixture_urls()
+        dh.iri_conversions.clear()
+
+        uncached_seconds = _convert_all(_uncached_uri_to_iri, urls)
+        cached_seconds = _convert_all(dh.uri_to_iri, urls)
+
+        conversions = REPETITIONS * len(urls)
+        print(
+            f"uri_to_iri with {len(urls)} fixture URLs, {REPETITIONS} times each: "
+            f"uncached {uncached_seconds / conversions * 1e6:.1f} us, "
+            f"cached {cached_seconds / conversions * 1e6:.1f} us per URL"
+        )
+        assert len(urls) > 50
+        assert dh.iri_conversions.misses == len(urls)
+        # The cached conversion is more than ten times faster, this is a
+        # generous bound
+        assert cached_seconds < uncached_seconds / 2
@@ -0,0 +1,275 @@
+"""A local HTTP server for harvest tests that serves a synthetic, Hydra-paginated
+DCAT-AP Switzerland catalog, generated from the dataset fixtures.
+"""
+
+import hashlib
+import os
+import random
+import threading
+import time
+from email.utils import formatdate, parsedate_to_datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from rdflib import BNode, Graph, Literal, URIRef
+from rdflib.namespace import RDF, Namespace
+
+DCAT = Namespace("http://www.w3.org/ns/dcat#")
+DCT = Namespace("http://purl.org/dc/terms/")
+HYDRA = Namespace("http://www.w3.org/ns/hydra/core#")
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), "fixtures")
+CONFORMANT_TEMPLATES = [
+    "catalog.xml",
+    "conformant/dataset-landing-page.xml",
+    "conformant/dataset-language.xml",
+    "conformant/dataset-publisher.xml",
+]
+DEPRECATED_TEMPLATES = [
+    "deprecated/dataset-landing-page.xml",
+    "deprecated/dataset-language.xml",
+    "deprecated/dataset-publisher.xml",
+]
+CATALOG_PATH = "/catalog.xml"
+
+
+def _load_templates(file_names):
+    """Returns the triples of every dataset in the given fixture files."""
+    templates = []
+    for file_name in file_names:
+        g = Graph()
+        g.parse(os.path.join(FIXTURES_DIR, file_name), format="xml")
+        for dataset_ref in g.subjects(RDF.type, DCAT.Dataset):
+            templates.append((dataset_ref, _dataset_triples(g, dataset_ref)))
+    return templates
+
+
+def _dataset_triples(g, dataset_ref):
+    """Returns the triples of the dataset and of every node it refers to, such
+    as its distributions and publisher.
+    """
+    triples = []
+    visited = set()
+    nodes = [dataset_ref]
+    while nodes:
+        node = nodes.pop()
+        if node in visited:
+            continue
+        visited.add(node)
+        for s, p, o in g.triples((node, None, None)):
+            triples.append((s, p, o))
+            if not isinstance(o, Literal):
+                nodes.append(o)
+    return triples
+
+
+class SyntheticCatalog(object):
+    """Generates the pages of a catalog with `pages` pages of
+    `datasets_per_page` datasets each. Datasets are copies of the fixture
+    datasets with unique URIs and identifiers of the form
+    `dataset-<number>@<organization>`. Every n-th dataset, as given by
+    `deprecated_every`, uses a deprecated shape.
+    """
+
+    def __init__(
+        self,
+        pages,
+        datasets_per_page,
+        organization="bundesamt-fur-statistik-bfs",
+        deprecated_every=4,
+    ):
+        self.pages = pages
+        self.datasets_per_page = datasets_per_page
+        self.organization = organization
+        self.deprecated_every = deprecated_every
+        self._conformant_templates = _load_templates(CONFORMANT_TEMPLATES)
+        self._deprecated_templates = _load_templates(DEPRECATED_TEMPLATES)
+
+    @property
+    def dataset_count(self):
+        return self.pages * self.datasets_per_page
+
+    def identifier(self, number):
+        return f"dataset-{number}@{self.organization}"
+
+    def page(self, page_number, base_url):
+        """Returns the given page (starting at 1) serialized as RDF/XML."""
+        g = Graph()
+        g.bind("dcat", DCAT)
+        g.bind("dct", DCT)
+        g.bind("hydra", HYDRA)
+        catalog_ref = URIRef(f"{base_url}{CATALOG_PATH}")
+        g.add((catalog_ref, RDF.type, DCAT.Catalog))
+
+        first = (page_number - 1) * self.datasets_per_page
+        for number in range(first, first + self.datasets_per_page):
+            dataset_ref = self._add_dataset(g, number)
+            g.add((catalog_ref, DCAT.dataset, dataset_ref))
+
+        self._add_pagination(g, page_number, base_url)
+        return g.serialize(format="xml").encode("utf-8")
+
+    def _add_dataset(self, g, number):
+        if self.deprecated_every and number % self.deprecated_every == 0:
+            templates = self._deprecated_templates
+        else:
+            templates = self._conformant_templates
+        template_ref, template = templates[number % len(templates)]
+
+        dataset_ref = URIRef(f"https://example.org/dataset/{number}")
+        bnodes = {}
+
+        def copy(node):
+            if node == template_ref:
+                return dataset_ref
+            if isinstance(node, BNode):
+                return bnodes.setdefault(node, BNode())
+            return node
+
+        for s, p, o in template:
+            if s == template_ref and p == DCT.identifier:
+                continue
+            g.add((copy(s), p, copy(o)))
+        g.add((dataset_ref, DCT.identifier, Literal(self.identifier(number))))
+        return dataset_ref
+
+    def _add_pagination(self, g, page_number, base_url):
+        def page_url(number):
+            return URIRef(f"{base_url}{CATALOG_PATH}?page={number}")
+
+        collection_ref = page_url(page_number)
+        g.add((collection_ref, RDF.type, HYDRA.PagedCollection))
+        g.add((collection_ref, HYDRA.totalItems, Literal(self.dataset_count)))
+        g.add((collection_ref, HYDRA.itemsPerPage, Literal(self.datasets_per_page)))
+        g.add((collection_ref, HYDRA.firstPage, page_url(1)))
+        g.add((collection_ref, HYDRA.lastPage, page_url(self.pages)))
+        if page_number < self.pages:
+            g.add((collection_ref, HYDRA.nextPage, page_url(page_number + 1)))
+
+
+class CatalogServer(object):
+    """Serves a SyntheticCatalog on localhost, in a background thread.
+
+    `latency` delays every response by that many seconds, and `error_rate` is
+    the share of requests that fail with a 503 error. Pages are served with an
+    ETag and a Last-Modified header, and conditional requests are answered with
+    304 Not Modified. Use it as a context manager:
+
+        with CatalogServer(SyntheticCatalog(10, 100)) as server:
+            harvest(server.url)
+    """
+
+    def __init__(self, catalog, latency=0.0, error_rate=0.0, seed=0):
+        self.catalog = catalog
+        self.latency = latency
+        self.error_rate = error_rate
+        self.last_modified = time.time()
+        self.requests = 0
+        self.errors = 0
+        self.not_modified = 0
+        self.bytes_sent = 0
+        self._random = random.Random(seed)
+        self._pages = {}
+        self._lock = threading.Lock()
+        self._server = None
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def url(self):
+        return f"{self.base_url}{CATALOG_PATH}"
+
+    def start(self):
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever)
+        self._thread.daemon = True
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+        self._thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *args):
+        self.stop()
+
+    def _get_page(self, page_number):
+        with self._lock:
+            if page_number not in self._pages:
+                content = self.catalog.page(page_number, self.base_url)
+                etag = f'"{hashlib.md5(content).hexdigest()}"'
+                self._pages[page_number] = (content, etag)
+            return self._pages[page_number]
+
+    def _should_fail(self):
+        with self._lock:
+            self.requests += 1
+            if self.error_rate and self._random.random() < self.error_rate:
+                self.errors += 1
+                return True
+            return False
+
+    def _is_not_modified(self, headers, etag):
+        if headers.get("If-None-Match"):
+            return headers["If-None-Match"] == etag
+        if headers.get("If-Modified-Since"):
+            try:
+                since = parsedate_to_datetime(headers["If-Modified-Since"])
+            except (TypeError, ValueError):
+                return False
+            return since.timestamp() >= int(self.last_modified)
+        return False
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if server.latency:
+                    time.sleep(server.latency)
+
+                url = urlparse(self.path)
+                page_number = int(parse_qs(url.query).get("page", ["1"])[0])
+                if url.path != CATALOG_PATH or not (
+                    1 <= page_number <= server.catalog.pages
+                ):
+                    self.send_error(404)
+                    return
+                if server._should_fail():
+                    self.send_error(503)
+                    return
+
+                content, etag = server._get_page(page_number)
+                if server._is_not_modified(self.headers, etag):
+                    with server._lock:
+                        server.not_modified += 1
+                    self.send_response(304)
+                    self.send_header("ETag", etag)
+                    self.end_headers()
+                    return
+
+                self.send_response(200)
+                self.send_header("Content-Type", "application/rdf+xml")
+                self.send_header("Content-Length", str(len(content)))
+                self.send_header("ETag", etag)
+                self.send_header(
+                    "Last-Modified", formatdate(server.last_modified, usegmt=True)
+                )
+                self.end_headers()
+                self.wfile.write(content)
+                with server._lock:
+                    server.bytes_sent += len(content)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
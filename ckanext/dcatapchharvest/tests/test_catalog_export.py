@@ -0,0 +1,156 @@
+import copy
+import io
+import json
+import logging
+import re
+import tracemalloc
+from unittest import mock
+
+import ckan.plugins.toolkit as tk
+import pytest
+from rdflib import Graph, Literal, URIRef
+from rdflib.compare import isomorphic
+
+from ckanext.dcat.processors import RDFSerializer
+from ckanext.dcat.profiles import DCT
+from ckanext.dcatapchharvest.catalog_export import (
+    CatalogWriter,
+    _xml_body,
+    iter_datasets,
+)
+from ckanext.dcatapchharvest.tests.base_test_classes import BaseSerializeTest
+
+RDFLIB_FORMATS = {"nt": "nt", "ttl": "turtle", "xml": "xml"}
+
+# The shape of the RDF/XML output of rdflib that _xml_body relies on: all
+# namespaces are declared on the root element, and every subject is a
+# top-level rdf:Description element.
+RDFLIB_XML_PATTERN = re.compile(
+    r'<\?xml version="1.0" encoding="utf-8"\?>\n'
+    r"<rdf:RDF\n"
+    r'(   xmlns:[\w.-]+="[^"]*"\n)+'
+    r">\n"
+    r"(  <rdf:Description [^\n]*>\n(    [^\n]*\n)*  </rdf:Description>\n)+"
+    r"</rdf:RDF>\n"
+)
+
+
+class TestCatalogWriter(BaseSerializeTest):
+    def _datasets(self, count):
+        dataset = json.loads(self._get_file_contents("dataset.json"))
+        for i in range(count):
+            dataset_dict = copy.deepcopy(dataset)
+            dataset_dict["id"] = f"dataset-{i}"
+            dataset_dict["name"] = f"dataset-{i}"
+            dataset_dict["identifier"] = f"dataset-{i}@bundesamt-fur-statistik-bfs"
+            yield dataset_dict
+
+    def _export(self, datasets, rdf_format):
+        output = io.StringIO()
+        CatalogWriter(output, rdf_format).write_catalog(datasets)
+        return Graph().parse(data=output.getvalue(), format=RDFLIB_FORMATS[rdf_format])
+
+    @pytest.mark.parametrize("rdf_format", ["nt", "ttl", "xml"])
+    def test_same_triples_as_serialize_catalog(self, rdf_format):
+        expected = RDFSerializer(profiles=["swiss_dcat_ap"]).serialize_catalog(
+            {}, list(self._datasets(3)), _format="nt"
+        )
+
+        g = self._export(self._datasets(3), rdf_format)
+
+        assert len(g) > 0
+        assert isomorphic(g, Graph().parse(data=expected, format="nt"))
+
+    @pytest.mark.parametrize("rdf_format", ["ttl", "xml"])
+    def test_undeclared_namespace(self, rdf_format):
+        output = io.StringIO()
+        writer = CatalogWriter(output, rdf_format)
+        writer.write_header()
+        for i in range(2):
+            writer.serializer.g.add(
+                (
+                    URIRef(f"http://example.org/{i}"),
+                    URIRef(f"http://example.org/ns{i}#label"),
+                    Literal(str(i)),
+                )
+            )
+            writer._flush()
+        writer.write_footer()
+
+        g = Graph().parse(data=output.getvalue(), format=RDFLIB_FORMATS[rdf_format])
+
+        assert set(g) == {
+            (
+                URIRef(f"http://example.org/{i}"),
+                URIRef(f"http://example.org/ns{i}#label"),
+                Literal(str(i)),
+            )
+            for i in range(2)
+        }
+
+    def test_rdflib_xml_shape(self):
+        (dataset_dict,) = self._datasets(1)
+        writer = CatalogWriter(io.StringIO(), "xml")
+        writer.serializer.graph_from_dataset(dataset_dict)
+
+        xml = writer.serializer.g.serialize(format="xml")
+
+        assert RDFLIB_XML_PATTERN.fullmatch(xml)
+
+    def test_xml_body(self):
+        writer = CatalogWriter(io.StringIO(), "xml")
+        g = writer.serializer.g
+        g.add((URIRef("http://example.org/1"), DCT.title, Literal("a")))
+        g.add(
+            (
+                URIRef("http://example.org/1"),
+                URIRef("http://example.org/ns#label"),
+                Literal("b"),
+            )
+        )
+
+        assert _xml_body(g.serialize(format="xml")) == (
+            '  <rdf:Description xmlns:ns1="http://example.org/ns#" '
+            'rdf:about="http://example.org/1">\n'
+            "    <dct:title>a</dct:title>\n"
+            "    <ns1:label>b</ns1:label>\n"
+            "  </rdf:Description>\n"
+        )
+
+    def test_constant_memory(self, caplog):
+        # Without the plugins, reading an undeclared config option logs a
+        # warning, which pytest keeps in memory
+        caplog.set_level(logging.ERROR, logger="ckan.common")
+
+        class NullOutput(object):
+            def write(self, text):
+                pass
+
+        def peak_memory(count):
+            writer = CatalogWriter(NullOutput(), "nt")
+            writer.datasets_per_graph = 10
+            tracemalloc.start()
+            writer.write_catalog(self._datasets(count))
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            return peak
+
+        # The first export loads the vocabularies
+        peak_memory(1)
+
+        assert peak_memory(80) < 1.2 * peak_memory(20)
+
+
+class TestIterDatasets(object):
+    def test_pages(self):
+        datasets = [{"name": f"dataset-{i}"} for i in range(5)]
+
+        def package_search(context, data_dict):
+            start = data_dict["start"]
+            return {
+                "count": len(datasets),
+                "results": datasets[start : start + data_dict["rows"]],
+            }
+
+        with mock.patch.object(tk, "get_action", return_value=package_search):
+            assert list(iter_datasets(page_size=2)) == datasets
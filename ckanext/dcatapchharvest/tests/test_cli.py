@@ -0,0 +1,186 @@
+import copy
+import json
+import os
+from unittest import mock
+
+import ckan.plugins as p
+import pytest
+from click.testing import CliRunner
+from rdflib import Graph, Literal
+from rdflib.compare import isomorphic
+from rdflib.namespace import RDF
+
+from ckanext.dcat import utils
+from ckanext.dcat.processors import RDFSerializer
+from ckanext.dcat.profiles import DCAT, DCT, SCHEMA
+from ckanext.dcatapchharvest.cli import export_catalog, rdf_to_jsonl
+from ckanext.dcatapchharvest.harvesters import (
+    SwissDCATI14YRDFHarvester,
+    SwissDCATRDFHarvester,
+)
+from ckanext.dcatapchharvest.plugins import OgdchDcatPlugin
+from ckanext.dcatapchharvest.profiles import SwissDCATAPProfile
+
+RDFLIB_FORMATS = {"nt": "nt", "ttl": "turtle", "xml": "xml"}
+
+
+def _fixture(file_name):
+    return os.path.join(os.path.dirname(__file__), "fixtures", file_name)
+
+
+class TestCommands(object):
+    def test_commands_registered_once(self):
+        commands = [command.name for command in OgdchDcatPlugin().get_commands()]
+
+        assert commands == ["dcat", "dcatapchharvest"]
+        assert not p.IClick.implemented_by(SwissDCATRDFHarvester)
+        assert not p.IClick.implemented_by(SwissDCATI14YRDFHarvester)
+
+
+class TestRdfToJsonl(object):
+    @pytest.mark.parametrize("jobs", ["1", "2"])
+    def test_rdf_to_jsonl(self, jobs):
+        result = CliRunner(mix_stderr=False).invoke(
+            rdf_to_jsonl,
+            [_fixture("catalog.xml"), _fixture("catalog-themes.xml"), "-j", jobs],
+        )
+
+        assert result.exit_code == 0, result.stderr
+        datasets = [json.loads(line) for line in result.stdout.splitlines()]
+        assert len(datasets) == 7
+        assert datasets[0]["identifier"] == "346252@bundesamt-fur-statistik-bfs"
+        assert "Converted 2 datasets" in result.stderr
+        assert "Converted 5 datasets" in result.stderr
+
+    def test_rdf_to_jsonl_output_file(self, tmp_path):
+        output = tmp_path / "datasets.jsonl"
+        result = CliRunner(mix_stderr=False).invoke(
+            rdf_to_jsonl, [_fixture("catalog.xml"), "-o", str(output)]
+        )
+
+        assert result.exit_code == 0, result.stderr
+        assert len(output.read_text().splitlines()) == 2
+
+    def test_rdf_to_jsonl_non_ascii(self):
+        result = CliRunner(mix_stderr=False).invoke(
+            rdf_to_jsonl, [_fixture("catalog-non-ascii.ttl")]
+        )
+
+        assert result.exit_code == 0, result.stderr
+        [dataset] = [json.loads(line) for line in result.stdout.splitlines()]
+        assert dataset["identifier"] == "bevölkerung@statistik-zürich"
+        assert dataset["title"]["de"] == "Bevölkerung der Stadt Zürich"
+        assert dataset["title"]["fr"] == "Population de la ville de Zurich – données"
+
+    def test_rdf_to_jsonl_parse_error(self, tmp_path):
+        broken = tmp_path / "broken.xml"
+        broken.write_text("<rdf:RDF")
+        result = CliRunner(mix_stderr=False).invoke(
+            rdf_to_jsonl, [str(broken), _fixture("catalog.xml"), "-j", "1"]
+        )
+
+        assert result.exit_code == 1
+        assert len(result.stdout.splitlines()) == 2
+        assert f"Error when converting {broken}" in result.stderr
+
+    @pytest.mark.parametrize("jobs", ["1", "2"])
+    def test_rdf_to_jsonl_profile_error(self, tmp_path, jobs):
+        failing = tmp_path / "failing.ttl"
+        failing.write_text(
+            "@prefix dcat: <http://www.w3.org/ns/dcat#> .\n"
+            "@prefix dct: <http://purl.org/dc/terms/> .\n"
+            '<http://example.org/dataset> a dcat:Dataset ; dct:identifier "fail" .\n'
+        )
+        parse_dataset = SwissDCATAPProfile.parse_dataset
+
+        def failing_parse_dataset(self, dataset_dict, dataset_ref):
+            if (dataset_ref, DCT.identifier, Literal("fail")) in self.g:
+                raise KeyError("title")
+            return parse_dataset(self, dataset_dict, dataset_ref)
+
+        with mock.patch.object(
+            SwissDCATAPProfile, "parse_dataset", failing_parse_dataset
+        ):
+            result = CliRunner(mix_stderr=False).invoke(
+                rdf_to_jsonl, [str(failing), _fixture("catalog.xml"), "-j", jobs]
+            )
+
+        assert result.exit_code == 1
+        assert len(result.stdout.splitlines()) == 2
+        assert f"Error when converting {failing}: 'title'" in result.stderr
+        assert "Converted 2 datasets" in result.stderr
+
+    def test_rdf_to_jsonl_unknown_profile(self):
+        result = CliRunner(mix_stderr=False).invoke(
+            rdf_to_jsonl, [_fixture("catalog.xml"), "-p", "unknown"]
+        )
+
+        assert result.exit_code == 2
+
+
+def _datasets(count):
+    with open(_fixture("dataset.json")) as f:
+        dataset = json.load(f)
+    datasets = []
+    for i in range(count):
+        dataset_dict = copy.deepcopy(dataset)
+        dataset_dict["id"] = f"dataset-{i}"
+        dataset_dict["name"] = f"dataset-{i}"
+        dataset_dict["identifier"] = f"dataset-{i}@bundesamt-fur-statistik-bfs"
+        datasets.append(dataset_dict)
+    return datasets
+
+
+@pytest.mark.usefixtures("with_request_context")
+class TestExportCatalog(object):
+    def _export(self, datasets, args):
+        with mock.patch(
+            "ckanext.dcatapchharvest.catalog_export.iter_datasets",
+            return_value=iter(datasets),
+        ):
+            return CliRunner(mix_stderr=False).invoke(export_catalog, args)
+
+    @pytest.mark.parametrize("rdf_format", ["nt", "ttl", "xml"])
+    @pytest.mark.parametrize("jobs", ["1", "3"])
+    def test_export_catalog(self, rdf_format, jobs):
+        datasets = _datasets(5)
+        expected = RDFSerializer(profiles=["swiss_dcat_ap"]).serialize_catalog(
+            {}, datasets, _format="nt"
+        )
+
+        result = self._export(
+            datasets, ["-f", rdf_format, "-j", jobs, "--chunk-size", "2"]
+        )
+
+        assert result.exit_code == 0, result.stderr
+        assert "Exported 5 datasets" in result.stderr
+        g = Graph().parse(data=result.stdout, format=RDFLIB_FORMATS[rdf_format])
+        # Blank nodes with the same label in different chunks would be merged
+        assert isomorphic(g, Graph().parse(data=expected, format="nt"))
+
+    def test_datasets_in_order(self):
+        datasets = _datasets(6)
+
+        result = self._export(datasets, ["-f", "nt", "-j", "3", "--chunk-size", "1"])
+
+        assert result.exit_code == 0, result.stderr
+        dataset_refs = [
+            line.split(" ")[0]
+            for line in result.stdout.splitlines()
+            if line.endswith(f"<{RDF.type}> <{DCAT.Dataset}> .")
+        ]
+        assert dataset_refs == [f"<{utils.dataset_uri(d)}>" for d in datasets]
+
+    def test_schemaorg_profile(self):
+        result = self._export(
+            _datasets(3), ["-f", "nt", "-j", "2", "-p", "swiss_schemaorg"]
+        )
+
+        assert result.exit_code == 0, result.stderr
+        g = Graph().parse(data=result.stdout, format="nt")
+        assert len(list(g.subjects(RDF.type, SCHEMA.Dataset))) == 3
+
+    def test_unknown_profile(self):
+        result = self._export(_datasets(1), ["-p", "unknown"])
+
+        assert result.exit_code == 2
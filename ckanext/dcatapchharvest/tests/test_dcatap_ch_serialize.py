@@ -1,13 +1,16 @@
 import json
 import logging
+from unittest import mock
 
 from rdflib import XSD, Literal, URIRef
 from rdflib.namespace import RDF
 
 import ckanext.dcatapchharvest.dcat_helpers as dh
+import ckanext.dcatapchharvest.profiles as profiles
 from ckanext.dcat import utils
 from ckanext.dcat.processors import RDFSerializer
 from ckanext.dcat.profiles import DCAT, DCT, FOAF, OWL, VCARD, XSD
+from ckanext.dcatapchharvest.profiles import namespaces
 from ckanext.dcatapchharvest.tests.base_test_classes import BaseSerializeTest
 
 log = logging.getLogger(__name__)
@@ -315,3 +318,132 @@ class TestDCATAPCHProfileSerializeDataset(BaseSerializeTest):
         assert self._triple(g, dataset_ref_changed, DCT.title, dataset["title"])
         assert self._triple(g, dataset_ref_changed, OWL.versionInfo, dataset["version"])
         assert self._triple(g, distribution, RDF.type, DCAT.Distribution)
+
+    def test_namespaces_bound_once_per_graph(self):
+        dataset = json.loads(self._get_file_contents("dataset.json"))
+
+        s = RDFSerializer(profiles=["swiss_dcat_ap"])
+        with mock.patch.object(s.g, "bind", wraps=s.g.bind) as bind_mock:
+            s.graph_from_catalog({})
+            for _ in range(3):
+                s.graph_from_dataset(dataset)
+
+        assert bind_mock.call_count == len(namespaces)
+        assert dict(s.g.namespaces())["dcat"] == URIRef(DCAT)
+
+        other_s = RDFSerializer(profiles=["swiss_dcat_ap"])
+        other_s.graph_from_dataset(dataset)
+        assert dict(other_s.g.namespaces())["dcat"] == URIRef(DCAT)
+
+    def test_vocabulary_terms(self):
+        dataset = json.loads(self._get_file_contents("dataset.json"))
+        dataset["accrual_periodicity"] = "http://purl.org/cld/freq/daily"
+        dataset["language"] = ["de"]
+        dataset["resources"] = [
+            {
+                "id": "resource-1",
+                "package_id": dataset["id"],
+                "format": "CSV",
+                "media_type": "text/csv",
+                "language": ["fr"],
+            }
+        ]
+
+        s = RDFSerializer(profiles=["swiss_dcat_ap"])
+        g = s.g
+        dataset_ref = s.graph_from_dataset(dataset)
+        distribution = next(g.objects(dataset_ref, DCAT.distribution))
+
+        # The serializers add the terms built by the vocabulary loaders
+        # The fixture has a frequency extra as well, which is added as a Literal
+        (accrual_periodicity,) = [
+            o
+            for o in g.objects(dataset_ref, DCT.accrualPeriodicity)
+            if isinstance(o, URIRef)
+        ]
+        assert accrual_periodicity == URIRef("http://purl.org/cld/freq/daily")
+        assert (
+            accrual_periodicity
+            is profiles.exported_frequencies["http://purl.org/cld/freq/daily"]
+        )
+        assert next(g.objects(dataset_ref, DCT.language)) is (
+            profiles.language_uri_map["de"]
+        )
+        assert next(g.objects(distribution, DCT.language)) is (
+            profiles.language_uri_map["fr"]
+        )
+        assert next(g.objects(distribution, DCT["format"])) is (
+            profiles.valid_formats["csv"]
+        )
+        assert next(g.objects(distribution, DCAT.mediaType)) == URIRef(
+            "http://www.iana.org/assignments/media-types/text/csv"
+        )
+        assert set(g.objects(dataset_ref, DCAT.theme)) >= {
+            URIRef(
+                "http://publications.europa.eu/resource/authority/data-theme/"
+                + group["name"].upper()
+            )
+            for group in dataset["groups"]
+        }
+
+    def test_completely_irregular_accrual_periodicity_is_not_exported(self):
+        dataset = json.loads(self._get_file_contents("dataset.json"))
+        dataset["accrual_periodicity"] = "http://purl.org/cld/freq/completelyIrregular"
+
+        s = RDFSerializer(profiles=["swiss_dcat_ap"])
+        dataset_ref = s.graph_from_dataset(dataset)
+
+        assert not any(
+            isinstance(o, URIRef)
+            for o in s.g.objects(dataset_ref, DCT.accrualPeriodicity)
+        )
+
+    def test_rights_and_license(self):
+        dataset = json.loads(self._get_file_contents("dataset.json"))
+        dataset["resources"] = [
+            {
+                "id": "resource-1",
+                "package_id": dataset["id"],
+                "rights": "https://opendata.swiss/terms-of-use#terms_by",
+                "license": "http://www.opendefinition.org/licenses/cc-by/",
+            },
+            {
+                "id": "resource-2",
+                "package_id": dataset["id"],
+                # Only license homepages are exported
+                "rights": "http://dcat-ap.ch/vocabulary/licenses/terms_by",
+            },
+        ]
+
+        s = RDFSerializer(profiles=["swiss_dcat_ap"])
+        g = s.g
+        s.graph_from_dataset(dataset)
+
+        distribution_1 = URIRef(dh.resource_uri(dataset["resources"][0]))
+        distribution_2 = URIRef(dh.resource_uri(dataset["resources"][1]))
+        rights_ref = URIRef("http://dcat-ap.ch/vocabulary/licenses/terms_by")
+        license_ref = URIRef("https://creativecommons.org/licenses/by/4.0/")
+        assert self._triple(g, distribution_1, DCT.rights, rights_ref)
+        assert self._triple(g, rights_ref, RDF.type, DCT.RightsStatement)
+        assert self._triple(g, distribution_1, DCT.license, license_ref)
+        assert self._triple(g, license_ref, RDF.type, DCT.LicenseDocument)
+        assert list(g.objects(distribution_2, DCT.rights)) == []
+
+    def test_license_refs_match_license_lookups(self):
+        license_handler = profiles.license_handler
+        homepage_uris = sorted(license_handler.get_license_refs_by_homepage_uri())
+        # Values that are not license homepages have no license ref
+        homepage_uris.append("http://dcat-ap.ch/vocabulary/licenses/terms_by")
+        license_refs = license_handler.get_license_refs_by_homepage_uri()
+
+        for homepage_uri in homepage_uris:
+            # The lookups done for every value before the table was precomputed
+            expected = None
+            uri = license_handler.get_license_ref_uri_by_homepage_uri(homepage_uri)
+            if uri is None:
+                name = license_handler.get_license_name_by_homepage_uri(homepage_uri)
+                if name is not None:
+                    uri = license_handler.get_license_ref_uri_by_name(name)
+            if uri is not None:
+                expected = URIRef(uri)
+            assert license_refs.get(homepage_uri) == expected
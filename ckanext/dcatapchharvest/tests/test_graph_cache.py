@@ -0,0 +1,143 @@
+import json
+import os
+
+import pytest
+from rdflib import BNode, Graph, Literal, URIRef
+from rdflib.compare import isomorphic
+from rdflib.namespace import DCTERMS as DCT
+from rdflib.namespace import RDF
+
+from ckanext.dcat.processors import RDFSerializer
+from ckanext.dcatapchharvest import graph_cache
+from ckanext.dcatapchharvest.profiles import SwissDCATAPProfile
+from ckanext.dcatapchharvest.tests.base_test_classes import BaseSerializeTest
+
+
+def _serialize(dataset):
+    s = RDFSerializer(profiles=["swiss_dcat_ap"])
+    s.graph_from_dataset(dataset)
+    return s.g
+
+
+def _triples(name):
+    return [(URIRef(f"http://example.org/{name}"), RDF.type, Literal(name))]
+
+
+SIZE = graph_cache._estimated_size(_triples("a"))
+
+
+class TestMemoryGraphCache(object):
+    def test_lru_eviction(self):
+        cache = graph_cache.MemoryGraphCache(max_size=2 * SIZE)
+        cache.set("a", _triples("a"))
+        cache.set("b", _triples("b"))
+        assert cache.get("a") == tuple(_triples("a"))
+        cache.set("c", _triples("c"))
+
+        assert cache.get("b") is None
+        assert cache.get("a") == tuple(_triples("a"))
+        assert cache.get("c") == tuple(_triples("c"))
+        assert cache.size == 2 * SIZE
+
+    def test_too_large_value(self):
+        cache = graph_cache.MemoryGraphCache(max_size=SIZE - 1)
+        cache.set("a", _triples("a"))
+
+        assert cache.get("a") is None
+        assert cache.size == 0
+
+
+class TestDiskGraphCache(object):
+    def test_get_and_set(self, tmp_path):
+        cache = graph_cache.DiskGraphCache(str(tmp_path))
+        triples = [(BNode(), DCT.title, Literal("Bevölkerung", lang="de"))]
+        cache.set("a", triples)
+
+        assert cache.get("a") == tuple(triples)
+        assert cache.get("b") is None
+        assert graph_cache.DiskGraphCache(str(tmp_path)).size == cache.size
+
+    @pytest.mark.parametrize("data", [b"garbage", b"", b"\x80\x05\x95"])
+    def test_unreadable_file(self, tmp_path, data):
+        cache = graph_cache.DiskGraphCache(str(tmp_path))
+        (tmp_path / "a.pickle").write_bytes(data)
+
+        assert cache.get("a") is None
+        assert not os.path.exists(tmp_path / "a.pickle")
+        triples = [(BNode(), DCT.title, Literal("Bevölkerung", lang="de"))]
+        cache.set("a", triples)
+        assert cache.get("a") == tuple(triples)
+
+    def test_lru_eviction(self, tmp_path):
+        cache = graph_cache.DiskGraphCache(str(tmp_path))
+        cache.set("a", _triples("a"))
+        # Evicting removes files until the cache is at most 90% full
+        cache.max_size = 2.5 * cache.size
+        cache.set("b", _triples("b"))
+        os.utime(tmp_path / "a.pickle", (1000, 1000))
+        os.utime(tmp_path / "b.pickle", (2000, 2000))
+        # Reading a makes it the most recently used entry
+        cache.get("a")
+        cache.set("c", _triples("c"))
+
+        assert cache.get("b") is None
+        assert cache.get("a") == tuple(_triples("a"))
+        assert cache.get("c") == tuple(_triples("c"))
+
+
+@pytest.mark.ckan_config(graph_cache.BACKEND_CONFIG, "memory")
+class TestCachedGraph(BaseSerializeTest):
+    @pytest.fixture(autouse=True)
+    def empty_cache(self, ckan_config):
+        graph_cache.get_graph_cache().clear()
+
+    def _dataset(self):
+        dataset = json.loads(self._get_file_contents("dataset.json"))
+        dataset["metadata_modified"] = "2024-01-01T00:00:00.000000"
+        return dataset
+
+    def test_cache_hit(self, monkeypatch):
+        dataset = self._dataset()
+        g = _serialize(dataset)
+
+        def fail(*args):
+            raise AssertionError("The graph should come from the cache")
+
+        monkeypatch.setattr(SwissDCATAPProfile, "_map_resource_to_graph", fail)
+        cached_g = _serialize(dataset)
+
+        assert len(g) > 0
+        assert isomorphic(g, cached_g)
+        assert dict(g.namespaces()) == dict(cached_g.namespaces())
+
+    def test_cached_blank_nodes_are_unique(self):
+        dataset = self._dataset()
+        g = Graph()
+        g += _serialize(dataset)
+        g += _serialize(dataset)
+
+        assert len(g) > len(_serialize(dataset))
+
+    def test_modified_dataset(self):
+        dataset = self._dataset()
+        _serialize(dataset)
+        dataset["metadata_modified"] = "2024-02-01T00:00:00.000000"
+        dataset["version"] = "2.0"
+
+        assert "2.0" in _serialize(dataset).serialize(format="nt")
+
+    def test_unsaved_dataset(self):
+        dataset = self._dataset()
+        del dataset["metadata_modified"]
+        _serialize(dataset)
+
+        assert graph_cache.get_graph_cache().size == 0
+
+    @pytest.mark.ckan_config("ckan.site_url", "http://other.example.com")
+    def test_key_contains_site_url(self):
+        dataset = self._dataset()
+        key = graph_cache.graph_cache_key("swiss_dcat_ap", dataset, None)
+
+        assert key != graph_cache.graph_cache_key("swiss_schemaorg", dataset, None)
+        dataset["groups"] = [{"name": "gove"}]
+        assert key != graph_cache.graph_cache_key("swiss_dcat_ap", dataset, None)
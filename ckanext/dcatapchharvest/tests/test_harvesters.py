@@ -0,0 +1,744 @@
+import datetime
+import json
+import os
+from unittest import mock
+
+import ckan.model as model
+import ckan.plugins as p
+import ckan.plugins.toolkit as tk
+import pytest
+
+from ckanext.activity.model import Activity
+from ckanext.dcat.harvesters.rdf import DCATRDFHarvester
+from ckanext.dcatapchharvest import metrics
+from ckanext.dcatapchharvest.harvest_helper import (
+    NOTIFICATION_USER,
+    ActivityBatch,
+    ExclusionFilter,
+    OrganizationCache,
+    get_notification_user_id,
+    load_package_snapshots,
+    map_resources_to_ids,
+)
+from ckanext.dcatapchharvest.harvesters import (
+    MAX_IMPORT_JOBS,
+    ExcludingRDFParser,
+    SwissDCATI14YRDFHarvester,
+    SwissDCATRDFHarvester,
+)
+from ckanext.harvest.model import HarvestJob, HarvestLog, HarvestObject, HarvestSource
+from ckanext.harvest.queue import fetch_and_import_stages
+
+
+def _new_harvester(harvester_class):
+    # Harvester plugins are singletons, and a subclass would get the instance of
+    # its parent class. Tests need a fresh instance of the exact class.
+    return object.__new__(harvester_class)
+
+
+def _create_package(name, identifier, state="active"):
+    package = model.Package(name=name, state=state)
+    model.Session.add(package)
+    model.Session.flush()
+    model.Session.add(
+        model.PackageExtra(package_id=package.id, key="identifier", value=identifier)
+    )
+    model.Session.commit()
+    return package
+
+
+@pytest.mark.usefixtures("clean_db")
+class TestSwissDCATRDFHarvesterGuidLookup(object):
+    def test_read_datasets_from_db_bulk(self):
+        existing = _create_package("existing", "existing@org")
+        _create_package("deleted", "deleted@org", state="deleted")
+
+        harvester = _new_harvester(SwissDCATRDFHarvester)
+        result = harvester._read_datasets_from_db_bulk(
+            ["existing@org", "deleted@org", "new@org", "existing@org"]
+        )
+
+        assert result == {
+            "existing@org": [(existing.id,)],
+            "deleted@org": [],
+            "new@org": [],
+        }
+
+    def test_read_datasets_from_db_uses_job_lookup(self):
+        harvester = _new_harvester(SwissDCATRDFHarvester)
+        harvester._import_job_id = "job-1"
+        harvester._guid_lookups = {
+            "job-1": mock.Mock(get={"existing@org": [("existing-id",)]}.get)
+        }
+
+        with mock.patch.object(harvester, "_read_datasets_from_db_bulk") as bulk_mock:
+            assert harvester._read_datasets_from_db("existing@org") == [
+                ("existing-id",)
+            ]
+
+        assert bulk_mock.call_count == 0
+
+    def test_read_datasets_from_db_finds_new_datasets(self):
+        harvester = _new_harvester(SwissDCATRDFHarvester)
+        harvester._import_job_id = "job-1"
+        harvester._guid_lookups = {"job-1": mock.Mock(get={}.get)}
+        # Created by another fetch worker after the import of the job started
+        new = _create_package("new", "new@org")
+
+        assert harvester._read_datasets_from_db("new@org") == [(new.id,)]
+        assert harvester._read_datasets_from_db("other@org") == []
+
+
+@pytest.mark.ckan_config("ckan.plugins", "harvest dcat_ch_rdf_harvester")
+class TestImportJobGuidLookups(object):
+    @pytest.fixture(autouse=True)
+    def harvest_tables(self, with_plugins, clean_db, migrate_db_for):
+        migrate_db_for("harvest")
+
+    def _job(self, harvest_source, name, count):
+        harvest_job = HarvestJob(source=harvest_source)
+        harvest_job.save()
+        objects = []
+        for i in range(count):
+            package = _create_package(f"{name}-{i}", f"{name}-{i}@org")
+            harvest_object = HarvestObject(
+                guid=f"{name}-{i}@org", job=harvest_job, state="WAITING"
+            )
+            harvest_object.save()
+            objects.append((harvest_object, package))
+        return harvest_job, objects
+
+    def _import(self, harvester, harvest_object, package):
+        harvest_object.state = "IMPORT"
+        harvest_object.save()
+        harvester._use_import_job(harvest_object.job)
+        assert harvester._read_datasets_from_db(harvest_object.guid) == [(package.id,)]
+
+    def test_alternating_jobs(self):
+        harvest_source = _create_harvest_source("http://example.com/catalog.xml", None)
+        _, objects_a = self._job(harvest_source, "a", 3)
+        _, objects_b = self._job(harvest_source, "b", 3)
+        harvester = _new_harvester(SwissDCATRDFHarvester)
+
+        with mock.patch.object(
+            harvester,
+            "_read_datasets_from_db_bulk",
+            wraps=harvester._read_datasets_from_db_bulk,
+        ) as bulk_mock:
+            for object_a, object_b in zip(objects_a, objects_b):
+                self._import(harvester, *object_a)
+                self._import(harvester, *object_b)
+
+        # One chunk per job
+        assert bulk_mock.call_count == 2
+
+    def test_chunks(self):
+        harvest_source = _create_harvest_source("http://example.com/catalog.xml", None)
+        harvest_job, objects = self._job(harvest_source, "a", 5)
+        harvester = _new_harvester(SwissDCATRDFHarvester)
+        harvester._use_import_job(harvest_job)
+        guid_lookup = harvester._guid_lookups[harvest_job.id]
+        guid_lookup.chunk_size = 2
+
+        for harvest_object, package in objects:
+            self._import(harvester, harvest_object, package)
+
+        assert guid_lookup.chunks_loaded == 3
+
+    def test_before_update_uses_chunk_snapshots(self):
+        harvest_source = _create_harvest_source("http://example.com/catalog.xml", None)
+        harvest_job, objects = self._job(harvest_source, "a", 3)
+        resource = _add_resource(objects[0][1], "http://example.org/resource", 0)
+        harvester = _new_harvester(SwissDCATRDFHarvester)
+        harvester._use_import_job(harvest_job)
+        guid_lookup = harvester._guid_lookups[harvest_job.id]
+        guid_lookup.chunk_size = 2
+        self._import(harvester, *objects[0])
+        assert len(guid_lookup._snapshots) == 2
+
+        harvest_object, package = objects[0]
+        dataset_dict = {
+            "id": package.id,
+            "resources": [{"url": "http://example.org/resource"}],
+        }
+        with mock.patch(
+            "ckanext.dcatapchharvest.harvest_helper.load_package_snapshots"
+        ) as load_mock:
+            harvester.before_update(harvest_object, dataset_dict, {})
+
+        assert load_mock.call_count == 0
+        assert dataset_dict["resources"][0]["id"] == resource.id
+        # Each snapshot is only used once
+        assert len(guid_lookup._snapshots) == 1
+
+    def test_lookups_of_old_jobs_are_evicted(self):
+        harvest_source = _create_harvest_source("http://example.com/catalog.xml", None)
+        jobs = [
+            self._job(harvest_source, f"job{i}", 1)[0]
+            for i in range(MAX_IMPORT_JOBS + 1)
+        ]
+        harvester = _new_harvester(SwissDCATRDFHarvester)
+
+        for harvest_job in jobs:
+            harvester._use_import_job(harvest_job)
+
+        assert list(harvester._guid_lookups) == [job.id for job in jobs[1:]]
+
+
+def _add_resource(package, url, position, state="active", **extras):
+    resource = model.Resource(package_id=package.id, url=url, extras=extras)
+    resource.position = position
+    resource.state = state
+    model.Session.add(resource)
+    model.Session.commit()
+    return resource
+
+
+@pytest.mark.usefixtures("clean_db")
+class TestPackageSnapshots(object):
+    def test_load_package_snapshots(self):
+        package = _create_package("package", "package@org")
+        package.url = "http://example.org/package"
+        model.Session.add(
+            model.PackageExtra(
+                package_id=package.id, key="modified", value="2024-01-01T00:00:00"
+            )
+        )
+        model.Session.commit()
+        second = _add_resource(
+            package,
+            "http://example.org/resource-2",
+            1,
+            download_url="http://example.org/download-2",
+        )
+        first = _add_resource(
+            package,
+            "http://example.org/resource-1",
+            0,
+            modified="2024-01-02T00:00:00",
+        )
+        _add_resource(package, "http://example.org/deleted", 2, state="deleted")
+        other = _create_package("other", "other@org")
+
+        snapshots = load_package_snapshots([package.id, other.id, "missing"])
+
+        assert snapshots == {
+            package.id: {
+                "id": package.id,
+                "url": "http://example.org/package",
+                "modified": "2024-01-01T00:00:00",
+                "resources": [
+                    {
+                        "id": first.id,
+                        "url": "http://example.org/resource-1",
+                        "download_url": None,
+                        "modified": "2024-01-02T00:00:00",
+                    },
+                    {
+                        "id": second.id,
+                        "url": "http://example.org/resource-2",
+                        "download_url": "http://example.org/download-2",
+                        "modified": None,
+                    },
+                ],
+            },
+            other.id: {
+                "id": other.id,
+                "url": None,
+                "modified": None,
+                "resources": [],
+            },
+        }
+
+    def test_map_resources_to_ids(self):
+        package = _create_package("package", "package@org")
+        resource = _add_resource(package, "http://example.org/resource", 0)
+        pkg_dict = {
+            "resources": [
+                {"url": "http://example.org/new", "resources": []},
+                {"url": "http://example.org/resource"},
+            ]
+        }
+
+        existing_package = map_resources_to_ids(pkg_dict, package.id)
+
+        assert existing_package["id"] == package.id
+        assert "id" not in pkg_dict["resources"][0]
+        assert pkg_dict["resources"][1]["id"] == resource.id
+
+    def test_map_resources_to_ids_missing_package(self):
+        with pytest.raises(tk.ObjectNotFound):
+            map_resources_to_ids({"resources": []}, "missing")
+
+
+@pytest.mark.usefixtures("clean_db")
+class TestOrganizationCache(object):
+    def test_get_id_by_name(self):
+        org = model.Group(name="org", is_organization=True, type="organization")
+        model.Session.add(org)
+        model.Session.commit()
+
+        cache = OrganizationCache()
+
+        assert cache.get_id_by_name("org") == org.id
+        assert cache.get_id_by_name("org") == org.id
+        assert cache.get_id_by_name("missing") is None
+        assert cache.get_id_by_name("missing") is None
+        assert (cache.hits, cache.misses) == (2, 2)
+        assert cache.stats() == "2 hits, 2 misses"
+
+
+@pytest.mark.usefixtures("clean_db")
+class TestSwissDCATI14YRDFHarvesterGuid(object):
+    def test_get_guid_page_of_datasets(self):
+        org = model.Group(name="i14y-org", is_organization=True, type="organization")
+        model.Session.add(org)
+        model.Session.commit()
+
+        harvester = _new_harvester(SwissDCATI14YRDFHarvester)
+        harvester._organization_cache = OrganizationCache()
+        get_action = tk.get_action
+
+        with mock.patch.object(tk, "get_action", wraps=get_action) as action_mock:
+            for i in range(1000):
+                dataset_dict = {"identifier": f"dataset-{i}", "owner_org": org.id}
+                guid = harvester._get_guid(dataset_dict)
+
+                assert guid == f"dataset-{i}@i14y-org"
+                assert dataset_dict["identifier_i14y"] == f"dataset-{i}"
+
+        assert action_mock.call_count == 0
+        assert harvester._organization_cache.misses == 1
+        assert harvester._organization_cache.hits == 999
+
+    def test_get_guid_missing_organization(self):
+        harvester = _new_harvester(SwissDCATI14YRDFHarvester)
+        harvester._organization_cache = OrganizationCache()
+
+        with pytest.raises(ValueError):
+            harvester._get_guid({"identifier": "dataset", "owner_org": "missing"})
+
+
+class TestExcludingRDFParser(object):
+    def test_datasets_skip_excluded(self):
+        rdf_parser = mock.Mock()
+        rdf_parser.datasets.return_value = iter(
+            [
+                {"identifier": "aaa@oevch", "resources": []},
+                {"identifier": "bbb@oevch", "resources": [{"license": "excluded"}]},
+                {"identifier": "ccc@oevch", "resources": [{"license": "allowed"}]},
+            ]
+        )
+        rdf_parser.next_page.return_value = "http://example.com/page/2"
+
+        harvester = _new_harvester(SwissDCATRDFHarvester)
+        harvester._exclusion_filter = ExclusionFilter(["aaa@oevch"], ["excluded"])
+        harvester._excluded_guids = set()
+        excluding_parser = ExcludingRDFParser(rdf_parser, harvester._is_excluded)
+
+        assert [d["identifier"] for d in excluding_parser.datasets()] == ["ccc@oevch"]
+        assert excluding_parser.next_page() == "http://example.com/page/2"
+        assert harvester._exclusion_filter.excluded_by_identifier == 1
+        assert harvester._exclusion_filter.excluded_by_license == 1
+        assert harvester._excluded_guids == {"aaa@oevch", "bbb@oevch"}
+
+
+@pytest.mark.ckan_config("ckan.plugins", "activity")
+@pytest.mark.ckan_config("ckan.activity_streams_enabled", True)
+class TestChangeActivities(object):
+    @pytest.fixture(autouse=True)
+    def activity_tables(self, with_plugins, clean_db, migrate_db_for):
+        migrate_db_for("activity")
+
+    def _activities(self, user):
+        return (
+            model.Session.query(
+                Activity.object_id, Activity.activity_type, Activity.data
+            )
+            .filter(Activity.user_id == user.id)
+            .order_by(Activity.object_id)
+            .all()
+        )
+
+    def test_before_update(self):
+        user = model.User(name=NOTIFICATION_USER)
+        model.Session.add(user)
+        model.Session.commit()
+        packages = [
+            _create_package(f"package-{i}", f"package-{i}@org") for i in range(2)
+        ]
+        for package in packages:
+            package.url = "http://example.org/old"
+        model.Session.commit()
+
+        harvester = _new_harvester(SwissDCATRDFHarvester)
+        harvester._import_job_id = "job-1"
+        harvest_object = mock.Mock(harvest_job_id="job-1")
+        with mock.patch(
+            "ckanext.dcatapchharvest.harvesters.get_notification_user_id",
+            wraps=get_notification_user_id,
+        ) as get_mock:
+            for package in packages:
+                harvester.before_update(
+                    harvest_object,
+                    {
+                        "id": package.id,
+                        "url": "http://example.org/new",
+                        "resources": [],
+                    },
+                    {},
+                )
+        assert harvester._activity_batch.write() == 2
+
+        assert get_mock.call_count == 1
+        assert self._activities(user) == sorted(
+            (
+                package.id,
+                "changed package",
+                {
+                    "message": "dataset url value changed from "
+                    "'http://example.org/old' to 'http://example.org/new'"
+                },
+            )
+            for package in packages
+        )
+
+    def test_failed_object_keeps_other_activities(self):
+        user = model.User(name=NOTIFICATION_USER)
+        model.Session.add(user)
+        model.Session.commit()
+        packages = [
+            _create_package(f"package-{i}", f"package-{i}@org") for i in range(3)
+        ]
+        model.Session.commit()
+
+        harvester = _new_harvester(SwissDCATRDFHarvester)
+        harvester._activity_batch = ActivityBatch(batch_size=2)
+        harvest_objects = [
+            mock.Mock(
+                id=f"object-{i}", harvest_job_id="job-1", job=mock.Mock(id="job-1")
+            )
+            for i in range(3)
+        ]
+
+        def import_stage(harvest_object):
+            package = packages[harvest_objects.index(harvest_object)]
+            harvester.before_update(
+                harvest_object,
+                {"id": package.id, "url": "http://example.org/new", "resources": []},
+                {},
+            )
+            if harvest_object is harvest_objects[1]:
+                model.Session.rollback()
+                return False
+            model.Session.commit()
+            return True
+
+        with mock.patch.object(
+            DCATRDFHarvester, "import_stage", side_effect=import_stage
+        ), mock.patch.object(
+            SwissDCATRDFHarvester, "_is_job_import_done", return_value=False
+        ):
+            # The second object fills the batch, but its import fails
+            assert harvester.import_stage(harvest_objects[0]) is True
+            assert harvester.import_stage(harvest_objects[1]) is False
+            assert self._activities(user) == []
+            # The third object fills the batch again and commits it
+            assert harvester.import_stage(harvest_objects[2]) is True
+
+        assert [activity[0] for activity in self._activities(user)] == sorted(
+            [packages[0].id, packages[2].id]
+        )
+        assert len(harvester._activity_batch) == 0
+
+    def test_activities_are_written_when_job_is_done(self):
+        user = model.User(name=NOTIFICATION_USER)
+        model.Session.add(user)
+        model.Session.commit()
+        package = _create_package("package", "package@org")
+        model.Session.commit()
+
+        harvester = _new_harvester(SwissDCATRDFHarvester)
+        harvest_object = mock.Mock(
+            id="object-1", harvest_job_id="job-1", job=mock.Mock(id="job-1")
+        )
+
+        def import_stage(harvest_object):
+            harvester.before_update(
+                harvest_object,
+                {"id": package.id, "url": "http://example.org/new", "resources": []},
+                {},
+            )
+            model.Session.commit()
+            return True
+
+        with mock.patch.object(
+            DCATRDFHarvester, "import_stage", side_effect=import_stage
+        ), mock.patch.object(
+            SwissDCATRDFHarvester, "_is_job_import_done", return_value=True
+        ):
+            harvester.import_stage(harvest_object)
+
+        assert [activity[0] for activity in self._activities(user)] == [package.id]
+        assert len(harvester._activity_batch) == 0
+
+    def test_before_update_of_other_harvester(self):
+        user = model.User(name=NOTIFICATION_USER)
+        model.Session.add(user)
+        model.Session.commit()
+        package = _create_package("package", "package@org")
+
+        harvester = _new_harvester(SwissDCATRDFHarvester)
+        harvester._import_job_id = "job-1"
+        harvester.before_update(
+            mock.Mock(harvest_job_id="job-2"),
+            {"id": package.id, "url": "http://example.org/new", "resources": []},
+            {},
+        )
+        model.Session.commit()
+
+        assert self._activities(user) == []
+
+    def test_before_update_without_notification_user(self):
+        package = _create_package("package", "package@org")
+
+        harvester = _new_harvester(SwissDCATRDFHarvester)
+        harvester._import_job_id = "job-1"
+        harvester.before_update(
+            mock.Mock(harvest_job_id="job-1"),
+            {"id": package.id, "url": "http://example.org/new", "resources": []},
+            {},
+        )
+
+        assert model.Session.query(Activity).count() == 0
+
+
+def _harvest_logs(prefix):
+    return [
+        json.loads(log.content.split(": ", 1)[1])
+        for log in model.Session.query(HarvestLog)
+        if log.content.startswith(prefix)
+    ]
+
+
+def _run_harvest_jobs(source_id):
+    # Resubmitting the queued jobs and objects needs the queue backend
+    with mock.patch("ckanext.harvest.logic.action.update.resubmit_jobs"), mock.patch(
+        "ckanext.harvest.logic.action.update.resubmit_objects"
+    ):
+        tk.get_action("harvest_jobs_run")(
+            {"ignore_auth": True, "session": model.Session}, {"source_id": source_id}
+        )
+
+
+def _create_harvest_source(url, owner_org, config=None):
+    source_dataset = model.Package(
+        name="harvest-source", type="harvest", url=url, owner_org=owner_org
+    )
+    model.Session.add(source_dataset)
+    model.Session.flush()
+    harvest_source = HarvestSource(
+        id=source_dataset.id, url=url, type="dcat_ch_rdf", config=config
+    )
+    model.Session.add(harvest_source)
+    model.Session.commit()
+    return harvest_source
+
+
+@pytest.mark.ckan_config("ckan.plugins", "harvest dcat_ch_rdf_harvester")
+class TestDryRun(object):
+    @pytest.fixture(autouse=True)
+    def harvest_tables(self, with_plugins, clean_db, migrate_db_for):
+        migrate_db_for("harvest")
+
+    def _setup_source(self, config=None):
+        org = model.Group(
+            name="bundesamt-fur-statistik-bfs",
+            is_organization=True,
+            type="organization",
+        )
+        model.Session.add(org)
+        model.Session.commit()
+        harvest_source = _create_harvest_source(
+            os.path.join(os.path.dirname(__file__), "fixtures", "catalog.xml"),
+            org.id,
+            config=config,
+        )
+
+        existing = _create_package("existing", "346252@bundesamt-fur-statistik-bfs")
+        _add_resource(existing, "http://example.org/other", 0)
+        HarvestObject(
+            guid="gone@bundesamt-fur-statistik-bfs",
+            source=harvest_source,
+            current=True,
+        ).save()
+        return harvest_source
+
+    def _counts(self):
+        return (
+            model.Session.query(HarvestObject).count(),
+            model.Session.query(model.Package).count(),
+        )
+
+    def test_dry_run(self):
+        harvest_source = self._setup_source()
+        counts_before = self._counts()
+
+        harvester = p.get_plugin("dcat_ch_rdf_harvester")
+        report = harvester.dry_run(harvest_source)
+
+        assert report.pages == 1
+        assert report.counts == {
+            "new": 1,
+            "changed": 1,
+            "unchanged": 0,
+            "deleted": 1,
+        }
+        assert report.errors == []
+        assert set(report.timings) == {"download", "parse", "gather", "diff"}
+        assert self._counts() == counts_before
+
+    def test_gather_stage_with_dry_run_config(self):
+        harvest_source = self._setup_source(config='{"dry_run": true}')
+        harvest_job = HarvestJob(source=harvest_source)
+        harvest_job.save()
+        counts_before = self._counts()
+
+        harvester = p.get_plugin("dcat_ch_rdf_harvester")
+
+        assert harvester.gather_stage(harvest_job) == []
+        assert self._counts() == counts_before
+
+
+@pytest.mark.ckan_config("ckan.plugins", "harvest dcat_ch_rdf_harvester")
+class TestExclusions(object):
+    @pytest.fixture(autouse=True)
+    def harvest_tables(self, with_plugins, clean_db, clean_index, migrate_db_for):
+        migrate_db_for("harvest")
+
+    def _setup_source(self):
+        org = model.Group(
+            name="bundesamt-fur-statistik-bfs",
+            is_organization=True,
+            type="organization",
+        )
+        model.Session.add(org)
+        model.Session.commit()
+        harvest_source = _create_harvest_source(
+            os.path.join(os.path.dirname(__file__), "fixtures", "catalog.xml"),
+            org.id,
+            config=json.dumps(
+                {"excluded_dataset_identifiers": ["346252@bundesamt-fur-statistik-bfs"]}
+            ),
+        )
+        # Harvested before the dataset was excluded
+        existing = _create_package("existing", "346252@bundesamt-fur-statistik-bfs")
+        HarvestObject(
+            guid="346252@bundesamt-fur-statistik-bfs",
+            source=harvest_source,
+            package_id=existing.id,
+            current=True,
+        ).save()
+        return harvest_source, existing
+
+    def test_excluded_dataset_is_not_deleted(self):
+        harvest_source, existing = self._setup_source()
+        harvest_job = HarvestJob(source=harvest_source)
+        harvest_job.save()
+        harvester = p.get_plugin("dcat_ch_rdf_harvester")
+
+        object_ids = harvester.gather_stage(harvest_job)
+        for object_id in object_ids:
+            harvest_object = HarvestObject.get(object_id)
+            harvest_object.state = "IMPORT"
+            harvest_object.save()
+            harvester.import_stage(harvest_object)
+
+        assert [HarvestObject.get(object_id).guid for object_id in object_ids] == [
+            "346266@bundesamt-fur-statistik-bfs"
+        ]
+        assert model.Package.get(existing.id).state == "active"
+
+    def test_dry_run_excluded_dataset_is_not_deleted(self):
+        harvest_source, _ = self._setup_source()
+
+        harvester = p.get_plugin("dcat_ch_rdf_harvester")
+        report = harvester.dry_run(harvest_source)
+
+        assert report.counts == {
+            "new": 1,
+            "changed": 0,
+            "unchanged": 0,
+            "deleted": 0,
+        }
+
+
+@pytest.mark.ckan_config("ckan.plugins", "harvest dcat_ch_rdf_harvester")
+class TestHarvestJobReport(object):
+    @pytest.fixture(autouse=True)
+    def harvest_tables(self, with_plugins, clean_db, clean_index, migrate_db_for):
+        migrate_db_for("harvest")
+
+    def test_reports(self):
+        org = model.Group(
+            name="bundesamt-fur-statistik-bfs",
+            is_organization=True,
+            type="organization",
+        )
+        model.Session.add(org)
+        model.Session.commit()
+        harvest_source = _create_harvest_source(
+            os.path.join(os.path.dirname(__file__), "fixtures", "catalog.xml"),
+            org.id,
+        )
+        harvest_job = HarvestJob(source=harvest_source)
+        harvest_job.save()
+        harvester = p.get_plugin("dcat_ch_rdf_harvester")
+        pages_before = metrics.HARVEST_PAGES.get(harvester="dcat_ch_rdf")
+
+        object_ids = harvester.gather_stage(harvest_job)
+        assert metrics.HARVEST_PAGES.get(harvester="dcat_ch_rdf") == pages_before + 1
+        for object_id in object_ids:
+            fetch_and_import_stages(harvester, HarvestObject.get(object_id))
+        assert not _harvest_logs("Performance report of the import stage")
+
+        harvest_job.status = "Running"
+        harvest_job.gather_finished = datetime.datetime.utcnow()
+        harvest_job.save()
+        _run_harvest_jobs(harvest_source.id)
+        assert HarvestJob.get(harvest_job.id).status == "Finished"
+
+        (gather_report,) = _harvest_logs("Performance report of the gather stage")
+        assert gather_report["job_id"] == harvest_job.id
+        assert gather_report["pages"] == 1
+        assert gather_report["bytes_downloaded"] > 0
+        assert gather_report["datasets"] == 2
+        assert set(gather_report["timings"]) == {"gather", "download", "parse"}
+        assert {d["identifier"] for d in gather_report["slowest_datasets"]} == {
+            "346252@bundesamt-fur-statistik-bfs",
+            "346266@bundesamt-fur-statistik-bfs",
+        }
+        assert gather_report["caches"]["organizations"]["hits"] == 1
+        assert gather_report["caches"]["organizations"]["misses"] == 1
+        assert gather_report["caches"]["vocabularies"]["hits"] > 0
+
+        (import_report,) = _harvest_logs("Performance report of the import stage")
+        assert import_report["job_id"] == harvest_job.id
+        assert import_report["created"] + import_report["failed"] == len(object_ids)
+        assert import_report["timings"]["import"] >= 0
+
+        # Jobs that were already finished are not reported again
+        _run_harvest_jobs(harvest_source.id)
+        assert len(_harvest_logs("Performance report of the import stage")) == 1
+
+    def test_does_not_report_unfinished_job(self):
+        harvest_source = _create_harvest_source("http://example.com/catalog.xml", None)
+        harvest_job = HarvestJob(source=harvest_source, status="Running")
+        harvest_job.gather_finished = datetime.datetime.utcnow()
+        harvest_job.save()
+        HarvestObject(guid="a", job=harvest_job, state="WAITING").save()
+
+        _run_harvest_jobs(harvest_source.id)
+
+        assert HarvestJob.get(harvest_job.id).status == "Running"
+        assert not _harvest_logs("Performance report of the import stage")
@@ -1,4 +1,23 @@
-from ckanext.dcatapchharvest.harvest_helper import check_package_change
+import pytest
+
+from ckanext.dcatapchharvest.dcat_helpers import (
+    TEST_ENV_URLS_CONFIG,
+    LookupStats,
+    dataset_uri,
+    iri_conversions,
+    resource_uri,
+    uri_to_iri,
+)
+from ckanext.dcatapchharvest.harvest_helper import (
+    ExclusionFilter,
+    HarvestJobReport,
+    _changes_in_date,
+    _parse_datetime,
+    check_package_change,
+    clear_datetime_cache,
+    get_package_changes,
+    reuse_resource_ids,
+)
 
 
 class TestHarvestHelpersUnit(object):
@@ -155,13 +174,14 @@ class TestHarvestHelpersUnit(object):
 
         assert check_package_change(existing_package, dataset_dict) == (
             True,
-            "resource count changed: 1",
+            "resource count changed: 1; "
+            "resource removed: http://example.org/resource-2",
         )
 
     def test_check_package_change_multiple_resources_changed(self):
         """All the urls, download urls and modified dates of the resources
-        have changed, but we should only get a message about the first
-        resource that is different.
+        have changed. Resources are matched by url, so we get a message about
+        the access url of every resource.
         """
         existing_package = {
             "resources": [
@@ -194,5 +214,372 @@ class TestHarvestHelpersUnit(object):
 
         assert check_package_change(existing_package, dataset_dict) == (
             True,
-            "resource access url changed: http://example.org/new/resource-1",
+            "resource access url changed: http://example.org/new/resource-1; "
+            "resource access url changed: http://example.org/new/resource-2",
+        )
+
+    def test_get_package_changes_all_changes(self):
+        existing_package = {
+            "url": "http://example.org/landing",
+            "modified": "2020-01-02T00:00:00",
+            "resources": [
+                {
+                    "url": "http://example.org/resource-1",
+                    "download_url": "http://example.org/resource-1/download",
+                    "modified": "2020-01-02T00:00:00",
+                },
+                {
+                    "url": "http://example.org/resource-2",
+                    "modified": "2020-01-02T00:00:00",
+                },
+                {
+                    "url": "http://example.org/resource-3",
+                },
+            ],
+        }
+        dataset_dict = {
+            "url": "http://example.org/landing",
+            "modified": "2020-01-03T00:00:00",
+            "resources": [
+                {
+                    "url": "http://example.org/resource-2",
+                    "modified": "2020-01-02T12:00:00",
+                },
+                {
+                    "url": "http://example.org/resource-1",
+                    "download_url": "http://example.org/new/resource-1/download",
+                    "modified": "2020-01-02T00:00:00",
+                },
+                {
+                    "url": "http://example.org/resource-4",
+                },
+                {
+                    "url": "http://example.org/resource-5",
+                },
+            ],
+        }
+
+        assert get_package_changes(existing_package, dataset_dict) == [
+            {
+                "type": "modified",
+                "message": "dataset modified date changed: 2020-01-03T00:00:00",
+            },
+            {"type": "resource_count", "message": "resource count changed: 4"},
+            {
+                "type": "resource_modified",
+                "message": "resource modified date changed: 2020-01-02T12:00:00",
+            },
+            {
+                "type": "resource_download_url",
+                "message": "resource download url changed: "
+                "http://example.org/new/resource-1/download",
+            },
+            {
+                "type": "resource_url",
+                "message": "resource access url changed: "
+                "http://example.org/resource-4",
+            },
+            {
+                "type": "resource_added",
+                "message": "resource added: http://example.org/resource-5",
+            },
+        ]
+
+    def test_get_package_changes_duplicate_urls(self):
+        existing_package = {
+            "resources": [
+                {"url": "http://example.org/resource", "modified": "2020-01-01"},
+                {"url": "http://example.org/resource", "modified": "2020-01-02"},
+            ],
+        }
+        dataset_dict = {
+            "resources": [
+                {"url": "http://example.org/resource", "modified": "2020-01-01"},
+                {"url": "http://example.org/resource", "modified": "2020-01-02"},
+            ],
+        }
+
+        assert get_package_changes(existing_package, dataset_dict) == []
+
+
+class TestExclusionFilterUnit(object):
+    def test_excluded_identifiers(self):
+        exclusion_filter = ExclusionFilter.from_source_config(
+            '{"excluded_dataset_identifiers": ["aaa@oevch", "glob:fahrtprognose-*", '
+            '"glob:*@test-org", "glob:ist-daten-20[0-9][0-9]@sbb"]}'
+        )
+
+        assert exclusion_filter.is_excluded("aaa@oevch", set())
+        assert exclusion_filter.is_excluded("fahrtprognose-2024@oevch", set())
+        assert exclusion_filter.is_excluded("dataset@test-org", set())
+        assert exclusion_filter.is_excluded("ist-daten-2021@sbb", set())
+        assert not exclusion_filter.is_excluded("aaa@oevch-2", set())
+        assert not exclusion_filter.is_excluded("fahrtprognose@oevch", set())
+        assert not exclusion_filter.is_excluded("ist-daten-21@sbb", set())
+        assert not exclusion_filter.is_excluded(None, set())
+        assert exclusion_filter.excluded_by_identifier == 4
+        assert exclusion_filter.excluded_by_license == 0
+
+    def test_excluded_license(self):
+        exclusion_filter = ExclusionFilter(
+            excluded_licenses=["https://opendata.swiss/terms-of-use#terms_by_ask"]
+        )
+
+        assert exclusion_filter.is_excluded(
+            "dataset@org",
+            {
+                "https://opendata.swiss/terms-of-use#terms_by",
+                "https://opendata.swiss/terms-of-use#terms_by_ask",
+            },
+        )
+        assert not exclusion_filter.is_excluded(
+            "dataset@org", {"https://opendata.swiss/terms-of-use#terms_by", None}
+        )
+        assert exclusion_filter.stats() == (
+            "0 excluded by identifier, 1 excluded by license"
+        )
+
+    def test_wildcards_without_prefix_are_exact(self):
+        exclusion_filter = ExclusionFilter(
+            ["dataset-*@org"],
+            ["https://example.org/license?lang=de", "https://example.org/[terms]"],
+        )
+
+        assert exclusion_filter.is_excluded("dataset-*@org", set())
+        assert not exclusion_filter.is_excluded("dataset-1@org", set())
+        assert exclusion_filter.is_excluded(
+            "dataset@org", {"https://example.org/license?lang=de"}
+        )
+        assert exclusion_filter.is_excluded(
+            "dataset@org", {"https://example.org/[terms]"}
         )
+        assert not exclusion_filter.is_excluded(
+            "dataset@org",
+            {"https://example.org/license_lang=de", "https://example.org/t"},
+        )
+
+    def test_empty_or_invalid_source_config(self):
+        for source_config in [None, "", "{}", "not json"]:
+            exclusion_filter = ExclusionFilter.from_source_config(source_config)
+
+            assert not exclusion_filter
+            assert not exclusion_filter.is_excluded("aaa@oevch", {"license"})
+
+
+class TestReuseResourceIdsUnit(object):
+    def test_reuse_resource_ids(self):
+        existing_resources = [
+            {"id": "id-1", "url": "http://example.org/resource-1"},
+            {"id": "id-2", "url": "http://example.org/resource-2"},
+        ]
+        resources = [
+            {"url": "http://example.org/resource-2"},
+            {"url": "http://example.org/resource-3"},
+            {"url": "http://example.org/resource-1"},
+        ]
+
+        reuse_resource_ids(resources, existing_resources)
+
+        assert [r.get("id") for r in resources] == ["id-2", None, "id-1"]
+
+    def test_reuse_resource_ids_duplicate_urls(self):
+        existing_resources = [
+            {"id": "id-1", "url": "http://example.org/resource"},
+            {"id": "id-2", "url": "http://example.org/other"},
+            {"id": "id-3", "url": "http://example.org/resource"},
+        ]
+        resources = [
+            {"url": "http://example.org/resource"},
+            {"url": "http://example.org/resource"},
+            {"url": "http://example.org/resource"},
+            {"url": "http://example.org/other"},
+        ]
+
+        reuse_resource_ids(resources, existing_resources)
+
+        assert [r.get("id") for r in resources] == ["id-1", "id-3", None, "id-2"]
+
+    def test_reuse_resource_ids_missing_urls(self):
+        existing_resources = [{"id": "id-1"}, {"id": "id-2", "url": None}]
+        resources = [{}, {"url": None}, {"url": ""}]
+
+        reuse_resource_ids(resources, existing_resources)
+
+        assert [r.get("id") for r in resources] == ["id-1", "id-2", None]
+
+
+class TestChangesInDateUnit(object):
+    def setup_method(self):
+        clear_datetime_cache()
+
+    def test_same_string_is_not_parsed(self):
+        assert not _changes_in_date("not a date", "not a date")
+        assert _parse_datetime.cache_info().currsize == 0
+
+    def test_iso_datetimes(self):
+        assert not _changes_in_date("2020-01-02T00:00:00", "2020-01-02T00:00:00.000")
+        assert not _changes_in_date("2020-01-02", "2020-01-02T00:00:00")
+        assert not _changes_in_date("2020-01-02T00:00:00", "2020-01-01T23:00:00+00:00")
+        assert _changes_in_date("2020-01-02T00:00:00", "2020-01-02T00:00:00+00:00")
+        assert _changes_in_date("2020-01-02T00:00:00", "2020-01-02T00:00:01")
+
+    def test_other_formats_fall_back_to_dateutil(self):
+        assert not _changes_in_date("2020-01-01T23:00:00Z", "2020-01-02T00:00:00")
+        assert not _changes_in_date("02.01.2020", "2020-02-01T00:00:00")
+
+    def test_unparseable_dates(self):
+        assert not _changes_in_date("2020-01-02T00:00:00", "not a date")
+        assert not _changes_in_date("2020-13-45", "2020-01-02T00:00:00")
+
+    def test_empty_dates(self):
+        assert not _changes_in_date(None, "")
+        assert _changes_in_date(None, "2020-01-02T00:00:00")
+        assert _changes_in_date("2020-01-02T00:00:00", "")
+
+    def test_parsed_values_are_cached(self):
+        for _ in range(3):
+            _changes_in_date("2020-01-02T00:00:00", "2020-01-03T00:00:00")
+
+        cache_info = _parse_datetime.cache_info()
+        assert (cache_info.hits, cache_info.misses) == (4, 2)
+
+
+class TestUriToIriUnit(object):
+    def setup_method(self):
+        iri_conversions.clear()
+
+    def test_uri_to_iri(self):
+        assert (
+            uri_to_iri("https://example.org/d%C3%A4tensatz?a=b")
+            == "https://example.org/d%C3%A4tensatz?a=b"
+        )
+
+    @pytest.mark.parametrize("uri", ["", None, "example.org/file.csv", "http://-/"])
+    def test_invalid_uri(self, uri):
+        with pytest.raises(ValueError):
+            uri_to_iri(uri)
+
+    def test_conversions_are_cached(self):
+        uris = ["https://example.org/a", "https://example.org/b", "not a uri"]
+        for uri in uris * 3:
+            try:
+                uri_to_iri(uri)
+            except ValueError:
+                pass
+
+        assert (iri_conversions.hits, iri_conversions.misses) == (6, 3)
+
+    def test_invalid_uri_is_cached(self):
+        for _ in range(2):
+            with pytest.raises(ValueError, match="valid schema or netloc"):
+                uri_to_iri("/relative/path")
+
+        assert (iri_conversions.hits, iri_conversions.misses) == (1, 1)
+
+
+@pytest.mark.ckan_config("ckan.site_url", "https://ckan.example.com")
+@pytest.mark.ckan_config(
+    TEST_ENV_URLS_CONFIG, "https://test.example.com,https://staging.example.com"
+)
+class TestTestEnvUrisUnit(object):
+    @pytest.fixture(autouse=True)
+    def config(self, ckan_config):
+        pass
+
+    def test_dataset_uri_of_test_env_is_replaced(self):
+        dataset_dict = {
+            "uri": "https://staging.example.com/perma/dataset@org",
+            "identifier": "dataset@org",
+        }
+
+        assert dataset_uri(dataset_dict) == "https://ckan.example.com/perma/dataset@org"
+
+    def test_dataset_uri_is_kept(self):
+        dataset_dict = {
+            "uri": "https://example.org/dataset/1",
+            "identifier": "dataset@org",
+        }
+
+        assert dataset_uri(dataset_dict) == "https://example.org/dataset/1"
+
+    def test_resource_uri_of_test_env_is_replaced(self):
+        resource_dict = {
+            "uri": "https://test.example.com/dataset/a/resource/b",
+            "package_id": "a",
+            "id": "b",
+        }
+
+        assert (
+            resource_uri(resource_dict)
+            == "https://ckan.example.com/dataset/a/resource/b"
+        )
+
+    def test_resource_uri_of_test_env_is_removed_before_saving(self):
+        resource_dict = {"uri": "https://test.example.com/dataset/a/resource/b"}
+
+        assert resource_uri(resource_dict) == ""
+
+    def test_config_change(self, ckan_config, monkeypatch):
+        resource_dict = {"uri": "https://example.org/resource/b"}
+        assert resource_uri(resource_dict) == "https://example.org/resource/b"
+
+        monkeypatch.setitem(ckan_config, TEST_ENV_URLS_CONFIG, "https://example.org")
+
+        assert resource_uri(resource_dict) == ""
+
+    def test_urls_are_not_regular_expressions(self, ckan_config, monkeypatch):
+        monkeypatch.setitem(
+            ckan_config, TEST_ENV_URLS_CONFIG, "https://test.example.c.m"
+        )
+        resource_dict = {"uri": "https://test.example.com/resource/b"}
+
+        assert resource_uri(resource_dict) == "https://test.example.com/resource/b"
+
+
+class TestHarvestJobReportUnit(object):
+    def test_slowest_datasets(self):
+        report = HarvestJobReport("job", "gather")
+        for i in range(25):
+            report.add_dataset_parse_time(f"dataset-{i}", i / 100)
+
+        slowest = report.slowest_datasets()
+
+        assert report.datasets == 25
+        assert [d["identifier"] for d in slowest] == [
+            f"dataset-{i}" for i in range(24, 14, -1)
+        ]
+        assert slowest[0]["parse_seconds"] == 0.24
+
+    def test_cache_stats_only_count_lookups_during_job(self):
+        lookups = LookupStats()
+        lookups.record(True)
+        lookups.record(False)
+        report = HarvestJobReport("job", "gather")
+        report.track_cache("vocabularies", lookups)
+        for found in [True, True, True, False]:
+            lookups.record(found)
+
+        assert report.cache_stats() == {
+            "vocabularies": {"hits": 3, "misses": 1, "hit_rate": 0.75}
+        }
+
+    def test_as_dict(self):
+        report = HarvestJobReport("job", "import")
+        report.add_time("import", 2.0)
+        report.created = 3
+        report.updated = 1
+        report.unchanged = 2
+        report.failed = 1
+
+        assert report.as_dict() == {
+            "job_id": "job",
+            "stage": "import",
+            "timings": {"import": 2.0},
+            "datasets_per_second": 3.0,
+            "caches": {},
+            "created": 3,
+            "updated": 1,
+            "unchanged": 2,
+            "deleted": 0,
+            "failed": 1,
+        }
@@ -0,0 +1,249 @@
+import json
+import os
+import socket
+import subprocess
+
+import pytest
+from ckan.tests import factories
+
+from ckanext.dcatapchharvest import metrics
+from ckanext.dcatapchharvest.dcat_helpers import LookupStats
+
+
+def _registry():
+    registry = metrics.MetricsRegistry()
+    counter = registry.counter("test_total", "A counter.", ["result"])
+    histogram = registry.histogram(
+        "test_seconds", "A histogram.", ["profile"], buckets=(0.1, 1.0)
+    )
+    return registry, counter, histogram
+
+
+def _registry_with_gauge():
+    registry = metrics.MetricsRegistry()
+    counter = registry.counter("test_total", "A counter.", ["result"])
+    gauge = registry.gauge("test_jobs", "A gauge.", ["harvester"])
+    return registry, counter, gauge
+
+
+def _write_other_process(directory, file_name):
+    other_registry, other_counter, other_gauge = _registry_with_gauge()
+    other_counter.inc(3, result="hit")
+    other_gauge.inc(2, harvester="dcat_ch_rdf")
+    with open(directory / file_name, "w") as f:
+        json.dump(other_registry.state(), f)
+
+
+class TestMetricsRegistry(object):
+    def test_text_format(self):
+        registry, counter, histogram = _registry()
+        counter.inc(result="hit")
+        counter.inc(2, result="miss")
+        histogram.observe(0.05, profile="swiss_dcat_ap")
+        histogram.observe(0.5, profile="swiss_dcat_ap")
+        histogram.observe(5, profile="swiss_dcat_ap")
+
+        assert registry.to_text().splitlines() == [
+            "# HELP test_total A counter.",
+            "# TYPE test_total counter",
+            'test_total{result="hit"} 1',
+            'test_total{result="miss"} 2',
+            "# HELP test_seconds A histogram.",
+            "# TYPE test_seconds histogram",
+            'test_seconds_bucket{profile="swiss_dcat_ap",le="0.1"} 1',
+            'test_seconds_bucket{profile="swiss_dcat_ap",le="1.0"} 2',
+            'test_seconds_bucket{profile="swiss_dcat_ap",le="+Inf"} 3',
+            'test_seconds_sum{profile="swiss_dcat_ap"} 5.55',
+            'test_seconds_count{profile="swiss_dcat_ap"} 3',
+        ]
+
+    def test_wrong_labels(self):
+        _, counter, _ = _registry()
+        with pytest.raises(ValueError):
+            counter.inc(profile="swiss_dcat_ap")
+
+    def test_collect_adds_up_processes(self, tmp_path):
+        registry, counter, histogram = _registry()
+        counter.inc(result="hit")
+        histogram.observe(0.05, profile="swiss_dcat_ap")
+        # The metrics file of another process
+        other_registry, other_counter, other_histogram = _registry()
+        other_counter.inc(3, result="hit")
+        other_counter.inc(result="miss")
+        other_histogram.observe(0.5, profile="swiss_dcat_ap")
+        with open(tmp_path / "metrics-1.json", "w") as f:
+            json.dump(other_registry.state(), f)
+
+        state = registry.collect(str(tmp_path))
+
+        assert sorted(state["test_total"]) == [[["hit"], 4], [["miss"], 1]]
+        assert state["test_seconds"] == [[["swiss_dcat_ap"], [1, 1, 0, 0.55, 2]]]
+        # Collecting only reads the metrics files
+        assert os.listdir(tmp_path) == ["metrics-1.json"]
+
+    def test_collect_skips_unreadable_files(self, tmp_path):
+        registry, counter, _ = _registry()
+        counter.inc(result="hit")
+        (tmp_path / "metrics-1.json").write_text("{")
+
+        state = registry.collect(str(tmp_path))
+
+        assert state["test_total"] == [[["hit"], 1]]
+
+    def test_persist_merges_ended_process(self, tmp_path):
+        registry, counter, gauge = _registry_with_gauge()
+        counter.inc(result="hit")
+        gauge.inc(harvester="dcat_ch_rdf")
+        process = subprocess.Popen(["true"])
+        process.wait()
+        _write_other_process(
+            tmp_path, f"metrics-{process.pid}-1@{socket.gethostname()}.json"
+        )
+
+        registry.persist(str(tmp_path))
+        state = registry.collect(str(tmp_path))
+
+        assert state["test_total"] == [[["hit"], 4]]
+        assert state["test_jobs"] == [[["dcat_ch_rdf"], 1]]
+        assert sorted(os.listdir(tmp_path)) == sorted(
+            [
+                metrics.ENDED_PROCESSES_FILE,
+                metrics.LOCK_FILE,
+                metrics.process_file_name(os.getpid()),
+            ]
+        )
+        # The counters of the ended process are neither lost nor added twice
+        registry.persist(str(tmp_path))
+        assert registry.collect(str(tmp_path)) == state
+
+    def test_persist_merges_process_with_reused_pid(self, tmp_path):
+        registry, counter, _ = _registry_with_gauge()
+        counter.inc(result="hit")
+        # An earlier process with the pid of this one
+        start_time = metrics._process_start_time(os.getpid())
+        file_name = (
+            f"metrics-{os.getpid()}-{start_time - 1}@{socket.gethostname()}.json"
+        )
+        _write_other_process(tmp_path, file_name)
+
+        registry.persist(str(tmp_path))
+        state = registry.collect(str(tmp_path))
+
+        assert state["test_total"] == [[["hit"], 4]]
+        assert state["test_jobs"] == []
+        assert not os.path.exists(tmp_path / file_name)
+        registry.persist(str(tmp_path))
+        assert registry.collect(str(tmp_path)) == state
+
+    def test_persist_keeps_running_process(self, tmp_path):
+        registry, _, _ = _registry_with_gauge()
+        # The parent of the test process is still running
+        file_name = metrics.process_file_name(os.getppid())
+        _write_other_process(tmp_path, file_name)
+
+        registry.persist(str(tmp_path))
+        state = registry.collect(str(tmp_path))
+
+        assert state["test_total"] == [[["hit"], 3]]
+        assert state["test_jobs"] == [[["dcat_ch_rdf"], 2]]
+        assert os.path.exists(tmp_path / file_name)
+        assert not os.path.exists(tmp_path / metrics.ENDED_PROCESSES_FILE)
+
+    def test_persist_keeps_process_of_other_host(self, tmp_path):
+        registry, counter, _ = _registry_with_gauge()
+        counter.inc(result="hit")
+        # A process on another host, whose pid has ended on this host
+        process = subprocess.Popen(["true"])
+        process.wait()
+        file_name = f"metrics-{process.pid}-1@other-host.json"
+        _write_other_process(tmp_path, file_name)
+
+        registry.persist(str(tmp_path))
+        state = registry.collect(str(tmp_path))
+
+        assert state["test_total"] == [[["hit"], 4]]
+        assert state["test_jobs"] == [[["dcat_ch_rdf"], 2]]
+        assert os.path.exists(tmp_path / file_name)
+        assert not os.path.exists(tmp_path / metrics.ENDED_PROCESSES_FILE)
+        # The counters of the other host are not added twice
+        registry.persist(str(tmp_path))
+        assert registry.collect(str(tmp_path)) == state
+
+    def test_maybe_persist(self, tmp_path, ckan_config, monkeypatch):
+        monkeypatch.setitem(ckan_config, metrics.METRICS_DIR_CONFIG, str(tmp_path))
+        registry, counter, _ = _registry()
+        counter.inc(result="hit")
+        registry.maybe_persist(force=True)
+        counter.inc(result="hit")
+        # Not written again before PERSIST_INTERVAL_SECONDS have passed
+        registry.maybe_persist()
+
+        with open(tmp_path / metrics.process_file_name(os.getpid())) as f:
+            assert json.load(f) == {"test_total": [[["hit"], 1]], "test_seconds": []}
+
+    def test_timed(self):
+        _, _, histogram = _registry()
+
+        @metrics.timed(histogram, profile="swiss_dcat_ap")
+        def parse():
+            return "parsed"
+
+        assert parse() == "parsed"
+        assert histogram.state()[0][1][-1] == 1
+
+    def test_lookup_stats(self):
+        _, counter, _ = _registry()
+        stats = LookupStats(counter)
+        stats.record(True)
+        stats.record(False)
+        stats.record(None)
+
+        assert (stats.hits, stats.misses) == (1, 2)
+        assert counter.get(result="hit") == 1
+        assert counter.get(result="miss") == 2
+
+
+@pytest.mark.ckan_config("ckan.plugins", "ogdch_dcat")
+@pytest.mark.usefixtures("with_plugins")
+class TestMetricsEndpoint(object):
+    def test_metrics(self, app, tmp_path, ckan_config, monkeypatch):
+        monkeypatch.setitem(ckan_config, metrics.METRICS_DIR_CONFIG, str(tmp_path))
+        monkeypatch.setitem(ckan_config, metrics.METRICS_TOKEN_CONFIG, "secret")
+        metrics.HARVEST_PAGES.inc(harvester="dcat_ch_rdf")
+
+        response = app.get(
+            "/dcatapch/metrics", headers={"Authorization": "Bearer secret"}
+        )
+
+        assert response.headers["Content-Type"].startswith("text/plain")
+        assert "# TYPE dcatapch_harvest_pages_total counter" in response.body
+        assert 'dcatapch_harvest_pages_total{harvester="dcat_ch_rdf"}' in response.body
+
+    @pytest.mark.usefixtures("clean_db")
+    def test_metrics_sysadmin(self, app, tmp_path, ckan_config, monkeypatch):
+        monkeypatch.setitem(ckan_config, metrics.METRICS_DIR_CONFIG, str(tmp_path))
+        sysadmin = factories.SysadminWithToken()
+
+        app.get(
+            "/dcatapch/metrics",
+            headers={"Authorization": sysadmin["token"]},
+            status=200,
+        )
+
+    @pytest.mark.usefixtures("clean_db")
+    def test_metrics_forbidden(self, app, tmp_path, ckan_config, monkeypatch):
+        monkeypatch.setitem(ckan_config, metrics.METRICS_DIR_CONFIG, str(tmp_path))
+        monkeypatch.setitem(ckan_config, metrics.METRICS_TOKEN_CONFIG, "secret")
+        user = factories.UserWithToken()
+
+        app.get("/dcatapch/metrics", status=403)
+        app.get(
+            "/dcatapch/metrics", headers={"Authorization": "Bearer wrong"}, status=403
+        )
+        app.get(
+            "/dcatapch/metrics", headers={"Authorization": user["token"]}, status=403
+        )
+
+    def test_metrics_not_configured(self, app, ckan_config, monkeypatch):
+        monkeypatch.setitem(ckan_config, metrics.METRICS_DIR_CONFIG, "")
+        app.get("/dcatapch/metrics", status=404)
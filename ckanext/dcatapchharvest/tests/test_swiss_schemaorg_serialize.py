@@ -1,12 +1,14 @@
 import json
+from unittest import mock
 
-from rdflib import Literal, URIRef
+from rdflib import Graph, Literal, URIRef
 from rdflib.namespace import RDF
 
 import ckanext.dcatapchharvest.dcat_helpers as dh
 from ckanext.dcat import utils
 from ckanext.dcat.processors import RDFSerializer
 from ckanext.dcat.profiles import SCHEMA, VCARD
+from ckanext.dcatapchharvest.profiles import SwissSchemaOrgProfile
 from ckanext.dcatapchharvest.tests.base_test_classes import BaseSerializeTest
 
 
@@ -95,3 +97,23 @@ class TestSchemaOrgProfileSerializeDataset(BaseSerializeTest):
         assert self._triple(g, dataset_ref_changed, SCHEMA.name, dataset["title"])
         assert self._triple(g, dataset_ref_changed, SCHEMA.version, dataset["version"])
         assert self._triple(g, distribution, RDF.type, SCHEMA.Distribution)
+
+    def test_every_keyword_is_added_once(self):
+        languages = ["de", "en", "fr", "it"]
+        dataset_dict = {
+            "keywords": {
+                lang: [f"keyword-{i}-{lang}" for i in range(10)] for lang in languages
+            }
+        }
+        profile = SwissSchemaOrgProfile(Graph())
+        dataset_ref = URIRef("https://example.org/dataset/0")
+
+        with mock.patch.object(profile.g, "add", wraps=profile.g.add) as add_mock:
+            profile._tags_graph(dataset_ref, dataset_dict)
+
+        assert add_mock.call_count == len(languages) * 10
+        assert (
+            dataset_ref,
+            SCHEMA.keywords,
+            Literal("keyword-0-fr", lang="fr"),
+        ) in profile.g
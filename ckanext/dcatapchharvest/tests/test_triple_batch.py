@@ -0,0 +1,99 @@
+import pytest
+from rdflib import ConjunctiveGraph, Graph, Literal, URIRef
+from rdflib.namespace import RDF, RDFS
+
+from ckanext.dcatapchharvest.triple_batch import (
+    TripleBatch,
+    batched_triples,
+    graph_of,
+)
+
+DATASET = URIRef("https://example.org/dataset/1")
+
+
+class Profile(object):
+    def __init__(self, g):
+        self.g = g
+        self.graphs = []
+
+    @batched_triples
+    def graph_from_dataset(self, label):
+        self.graphs.append(self.g)
+        self.g.bind("rdfs", RDFS)
+        self.g.add((DATASET, RDF.type, RDFS.Resource))
+        self.g.add((DATASET, RDFS.label, Literal(label)))
+        return DATASET
+
+
+class SubProfile(Profile):
+    @batched_triples
+    def graph_from_dataset(self, label):
+        self.g.add((DATASET, RDFS.comment, Literal(label)))
+        return super().graph_from_dataset(label)
+
+
+class TestTripleBatch(object):
+    def test_flush(self):
+        g = Graph()
+        batch = TripleBatch(g)
+        batch.add((DATASET, RDFS.label, Literal("a")))
+        batch.add((DATASET, RDFS.label, Literal("a")))
+
+        assert len(g) == 0
+        assert len(batch.triples) == 1
+
+        batch.flush()
+
+        assert list(g) == [(DATASET, RDFS.label, Literal("a"))]
+        assert batch.triples == {}
+
+    def test_flush_to_default_context(self):
+        g = ConjunctiveGraph()
+        batch = TripleBatch(g)
+        batch.add((DATASET, RDFS.label, Literal("a")))
+        batch.flush()
+
+        assert (DATASET, RDFS.label, Literal("a")) in g.default_context
+
+    def test_graph_of(self):
+        g = Graph()
+
+        assert graph_of(g) is g
+        assert graph_of(TripleBatch(g)) is g
+
+
+class TestBatchedTriples(object):
+    def test_triples_are_added_after_the_method(self):
+        g = Graph()
+        profile = Profile(g)
+
+        assert profile.graph_from_dataset("a") == DATASET
+
+        assert isinstance(profile.graphs[0], TripleBatch)
+        assert profile.g is g
+        assert len(g) == 2
+        assert dict(g.namespaces())["rdfs"] == URIRef(RDFS)
+
+    def test_methods_of_base_classes_use_the_same_batch(self):
+        g = Graph()
+        profile = SubProfile(g)
+
+        profile.graph_from_dataset("a")
+
+        assert len(g) == 3
+
+    def test_triples_are_added_on_errors(self):
+        class FailingProfile(Profile):
+            @batched_triples
+            def graph_from_dataset(self, label):
+                super().graph_from_dataset(label)
+                raise ValueError("Invalid dataset")
+
+        g = Graph()
+        profile = FailingProfile(g)
+
+        with pytest.raises(ValueError):
+            profile.graph_from_dataset("a")
+
+        assert profile.g is g
+        assert len(g) == 2
@@ -0,0 +1,67 @@
+"""Adding the triples of a dataset to the graph in one batch.
+
+Every call of Graph.add goes through the store of the graph on its own. The
+batched_triples decorator collects the triples that a profile adds while it
+builds the graph of a dataset and adds all of them to the graph with a single
+addN call.
+"""
+
+import functools
+
+
+class TripleBatch(object):
+    """Collects the triples added with add() and adds them to the graph with
+    a single addN call when flushed. Every other attribute is the one of the
+    graph, so namespaces can be bound as usual, but triples that have not been
+    flushed yet are not in the graph.
+    """
+
+    def __init__(self, graph):
+        self.graph = graph
+        # A dict keeps the order of the triples and drops duplicates, as a
+        # graph does
+        self.triples = {}
+
+    def add(self, triple):
+        self.triples[triple] = None
+        return self
+
+    def __getattr__(self, name):
+        return getattr(self.graph, name)
+
+    def flush(self):
+        """Adds the collected triples to the graph. Triples are added to the
+        default context of a ConjunctiveGraph, like Graph.add does.
+        """
+        default_graph = getattr(self.graph, "default_context", self.graph)
+        default_graph.addN((s, p, o, default_graph) for s, p, o in self.triples)
+        self.triples = {}
+
+
+def graph_of(g):
+    """Returns the graph that the triples are added to."""
+    return g.graph if isinstance(g, TripleBatch) else g
+
+
+def batched_triples(graph_from_dataset):
+    """Decorator for the graph_from_dataset method of a profile that adds
+    the triples of the dataset to the graph in one batch. The method must not
+    read triples from the graph. If the graph of the profile already is a
+    TripleBatch, e.g. when the method calls the one of its base class, the
+    triples are added to that batch.
+    """
+
+    @functools.wraps(graph_from_dataset)
+    def wrapper(self, *args, **kwargs):
+        if isinstance(self.g, TripleBatch):
+            return graph_from_dataset(self, *args, **kwargs)
+
+        batch = TripleBatch(self.g)
+        self.g = batch
+        try:
+            return graph_from_dataset(self, *args, **kwargs)
+        finally:
+            self.g = batch.graph
+            batch.flush()
+
+    return wrapper